@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Thống kê kỹ năng dùng chung cho dashboard và báo cáo PDF.
+# Dữ liệu vào là bảng dài (row, skill) của storage.read_skills / storage.explode_skills.
+# Dựng ma trận thưa job x kỹ năng X (0/1), rồi chỉ cần 1 phép nhân C = X^T X:
+#   - đường chéo C[i, i]  = số job yêu cầu kỹ năng i
+#   - C[i, j] (i < j)     = số job yêu cầu cùng lúc kỹ năng i và j
+# Top-k lấy bằng argpartition trên các phần tử khác 0, không tạo chuỗi "A + B" cho mọi cặp.
+
+
+def filter_rows(skills: pd.DataFrame, rows) -> pd.DataFrame:
+    """Giữ lại các dòng kỹ năng thuộc những job (row) được chọn."""
+    if rows is None:
+        return skills
+    return skills[skills["row"].isin(np.asarray(rows))]
+
+
+def incidence_matrix(skills: pd.DataFrame):
+    """Ma trận thưa CSR job x kỹ năng (giá trị 0/1) và tên các cột kỹ năng."""
+    codes = skills["skill"].cat.codes.to_numpy()
+    names = skills["skill"].cat.categories
+    # Đánh lại số thứ tự job cho liền mạch để ma trận không bị thừa dòng trống
+    job_idx, rows = np.unique(skills["row"].to_numpy(), return_inverse=True)
+    X = sparse.csr_matrix((np.ones(len(codes), dtype=np.int32), (rows, codes)),
+                          shape=(len(job_idx), len(names)))
+    # Kỹ năng lặp lại trong cùng 1 job chỉ tính 1 lần
+    X.sum_duplicates()
+    X.data[:] = 1
+    return X, names
+
+
+def top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Vị trí của k giá trị lớn nhất (đã sắp xếp giảm dần), không cần sort toàn bộ mảng."""
+    if k >= len(values):
+        return np.argsort(-values, kind="stable")
+    idx = np.argpartition(-values, k)[:k]
+    return idx[np.argsort(-values[idx], kind="stable")]
+
+
+def skill_stats(skills: pd.DataFrame, rows=None, k_pairs: int = 10):
+    """
+    Trả về (skill_counts, top_pairs):
+      - skill_counts: Series tên kỹ năng -> số job, sắp xếp giảm dần (đủ mọi kỹ năng có mặt)
+      - top_pairs:    Series "A + B" -> số job có cả 2 kỹ năng, top `k_pairs` cặp
+    """
+    skills = filter_rows(skills, rows)
+    if skills.empty:
+        return pd.Series(dtype=int), pd.Series(dtype=int)
+
+    X, names = incidence_matrix(skills)
+    C = (X.T @ X).tocoo()
+
+    diag = C.row == C.col
+    counts = np.zeros(len(names), dtype=np.int64)
+    counts[C.row[diag]] = C.data[diag]
+    present = np.flatnonzero(counts)
+    order = present[top_k(counts[present], len(present))]
+    skill_counts = pd.Series(counts[order], index=names[order].astype(str))
+
+    upper = C.row < C.col
+    pair_i, pair_j, pair_n = C.row[upper], C.col[upper], C.data[upper]
+    best = top_k(pair_n, k_pairs)
+    labels = [" + ".join(sorted((str(names[i]), str(names[j])))) for i, j in zip(pair_i[best], pair_j[best])]
+    top_pairs = pd.Series(pair_n[best].astype(np.int64), index=labels)
+    return skill_counts, top_pairs
+
+
+def pair_counts(skills: pd.DataFrame) -> pd.DataFrame:
+    """Số job có cả 2 kỹ năng cho mọi cặp xuất hiện cùng nhau: DataFrame (a, b, n) với a < b theo tên."""
+    if skills.empty:
+        return pd.DataFrame({"a": pd.Series(dtype=object), "b": pd.Series(dtype=object),
+                             "n": pd.Series(dtype=np.int64)})
+    X, names = incidence_matrix(skills)
+    C = sparse.triu(X.T @ X, k=1).tocoo()
+    a, b = names[C.row].astype(str).to_numpy(dtype=object), names[C.col].astype(str).to_numpy(dtype=object)
+    swap = a > b
+    a[swap], b[swap] = b[swap], a[swap]
+    return pd.DataFrame({"a": a, "b": b, "n": C.data.astype(np.int64)})
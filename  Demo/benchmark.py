@@ -0,0 +1,532 @@
+import argparse
+import ast
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import charts
+import chart_cache
+import cube
+import jobs_db
+import metrics
+import mock_api
+import search_index
+import storage
+from clean_data import clean_data_chunked, clean_frame
+from crawler import crawl_all, jobs_frame, parse_jobs, read_page
+from http_client import orjson
+from level_classifier import LevelClassifier, fold_accents
+from mock_api import TITLES, make_job
+from salary_parser import parse_salary
+
+# Các bài đo hiệu năng chạy offline trên dữ liệu giả lập:
+#   python benchmark.py storage --rows 100000
+#   python benchmark.py pipeline --rows 10000 100000 1000000 --latency 0.05 --error-rate 0.02
+#   python benchmark.py generate --rows 100000        (chỉ sinh dữ liệu giả ra thư mục synthetic_100000)
+#   python benchmark.py imports                       (thời gian import khi khởi động Dashboard)
+#   python benchmark.py search --rows 300000          (ô tìm kiếm: quét chuỗi vs chỉ mục đảo)
+#   python benchmark.py metrics --rows 200000         (chi phí ghi metrics)
+#   python benchmark.py all
+
+
+def timed(label: str, fn, *args, **kwargs):
+    """Chạy fn, in thời gian thực hiện. Trả về (kết quả, số giây)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<45} {elapsed:8.3f}s")
+    return result, elapsed
+
+
+def synthetic_pages(rows: int, page_size: int = 50):
+    """Các trang response API giả (bytes JSON đúng như server trả về) cho `rows` job."""
+    nb_pages = (rows + page_size - 1) // page_size
+    for page in range(nb_pages):
+        ids = range(page * page_size + 1, min((page + 1) * page_size, rows) + 1)
+        yield json.dumps({"meta": {"nbHits": rows, "nbPages": nb_pages, "page": page},
+                          "data": [make_job(i) for i in ids]}).encode("utf-8")
+
+
+def parse_pages(pages) -> pd.DataFrame:
+    """Giải mã các trang giống crawler: bytes -> 1 DataFrame mỗi trang (read_page) -> nối lại."""
+    return pd.concat([read_page(body)[1] for body in pages], ignore_index=True)
+
+
+def parse_pages_rows(pages) -> pd.DataFrame:
+    """Cách cũ: json chuẩn -> dict cho từng job (parse_jobs) -> 1 DataFrame ở cuối."""
+    jobs = []
+    for body in pages:
+        jobs.extend(parse_jobs(json.loads(body)))
+    return jobs_frame(jobs)
+
+
+def synthetic_raw_frame(rows: int) -> pd.DataFrame:
+    """Sinh `rows` job giả (giống response API) ở dạng dữ liệu thô của crawler."""
+    return parse_pages(synthetic_pages(rows))
+
+
+def synthetic_clean_frame(rows: int) -> pd.DataFrame:
+    """Sinh `rows` job giả (giống response API) rồi chạy qua bước làm sạch."""
+    return clean_frame(synthetic_raw_frame(rows))
+
+
+@contextlib.contextmanager
+def in_temp_dir():
+    """Chạy trong thư mục tạm (các file dữ liệu ghi ra không đụng tới dữ liệu thật)."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def generate(rows: int, out: str = None):
+    """Ghi dữ liệu giả ra thư mục `out`: các trang response API (JSONL) + dữ liệu thô CSV / Parquet."""
+    out = out or f"synthetic_{rows}"
+    os.makedirs(out, exist_ok=True)
+    frames = []
+    with open(os.path.join(out, "api_pages.jsonl"), "wb") as f:
+        for body in synthetic_pages(rows):
+            f.write(body + b"\n")
+            frames.append(read_page(body)[1])
+    raw = pd.concat(frames, ignore_index=True)
+    name = os.path.join(out, storage.RAW_DATASET)
+    storage.write_table(raw, name, fmt="csv")
+    if storage.pq is not None:
+        storage.write_table(raw, name, fmt="parquet")
+    print(f"🧪 Đã sinh {rows} job giả vào thư mục {out}/ (api_pages.jsonl, {storage.RAW_DATASET}.*)")
+
+
+# --- 1. LƯU TRỮ: CSV + XLSX (cũ) vs PARQUET ---
+def bench_storage(rows: int, excel_rows: int = 20_000):
+    df = synthetic_clean_frame(rows)
+    print(f"\n📦 Lưu trữ ({rows} dòng)")
+
+    def read_csv_like_dashboard(path):
+        data = pd.read_csv(path)
+        data["approvedOn"] = pd.to_datetime(data["approvedOn"], errors="coerce")
+        data["skills_list"] = data["skills_list"].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
+        return data
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            timed("CSV: ghi", df.to_csv, "bench.csv", index=False, encoding="utf-8-sig")
+            timed("CSV: đọc + parse ngày + literal_eval", read_csv_like_dashboard, "bench.csv")
+            n = min(rows, excel_rows)
+            timed(f"XLSX: ghi ({n} dòng đầu)", df.head(n).to_excel, "bench.xlsx", index=False)
+            if storage.pq is not None:
+                timed("Parquet: ghi", storage.write_table, df, "bench", fmt="parquet")
+                timed("Parquet: đọc (memory-map)", storage.read_table, "bench")
+                print(f"  Dung lượng: CSV {os.path.getsize('bench.csv') / 1e6:.1f}MB, "
+                      f"Parquet {os.path.getsize('bench.parquet') / 1e6:.1f}MB")
+            else:
+                print("  ⚠️ Chưa cài pyarrow, bỏ qua phần Parquet.")
+        finally:
+            os.chdir(cwd)
+
+
+# --- 2. ĐỌC KỸ NĂNG: literal_eval từng dòng (cũ) vs bảng dài vector hóa ---
+def bench_skills(rows: int):
+    df = synthetic_clean_frame(rows)
+    print(f"\n🧠 Đọc + đếm kỹ năng ({rows} dòng)")
+
+    def old_path(path):
+        data = pd.read_csv(path, usecols=["skills_list"])
+        lists = data["skills_list"].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
+        return Counter(s for skills in lists for s in skills)
+
+    def new_path(name):
+        return storage.read_skills(name)["skill"].value_counts()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            # File CSV kiểu cũ: skills_list ghi bằng repr của list Python
+            df.to_csv("old.csv", index=False)
+            storage.write_table(df, "bench")
+            old, _ = timed("CSV + ast.literal_eval + Counter", old_path, "old.csv")
+            new, _ = timed(f"storage.read_skills ({storage.STORAGE_FORMAT}) + value_counts", new_path, "bench")
+            assert dict(old) == {k: v for k, v in new.items() if v > 0}
+        finally:
+            os.chdir(cwd)
+
+
+# --- 3. COMBO KỸ NĂNG: vòng lặp lồng nhau + Counter (cũ) vs ma trận thưa ---
+def bench_pairs(rows: int):
+    df = synthetic_clean_frame(rows)
+    skills = storage.explode_skills(df["skills_list"])
+    print(f"\n🔗 Top kỹ năng + top 10 cặp kỹ năng ({rows} dòng)")
+
+    def old_path(lists):
+        flat = Counter(s for skills in lists for s in skills)
+        pairs = []
+        for skills in lists:
+            unique = sorted(set(skills))
+            for i in range(len(unique)):
+                for j in range(i + 1, len(unique)):
+                    pairs.append(f"{unique[i]} + {unique[j]}")
+        return flat, Counter(pairs).most_common(10)
+
+    (old_counts, old_pairs), _ = timed("Vòng lặp Python + Counter", old_path, df["skills_list"].tolist())
+    (new_counts, new_pairs), _ = timed("analytics.skill_stats (X^T X thưa)", analytics.skill_stats, skills)
+    assert dict(old_counts) == new_counts.to_dict()
+    assert sorted(v for _, v in old_pairs) == sorted(new_pairs.tolist())
+
+
+# --- 4. VẼ BIỂU ĐỒ: tuần tự vs song song trên process pool ---
+def bench_charts(rows: int):
+    df = synthetic_clean_frame(rows)
+    skills = storage.explode_skills(df["skills_list"])
+    print(f"\n🎨 Vẽ 6 biểu đồ báo cáo ({rows} dòng)")
+
+    summary = cube.AggregateCube(cube.build_cube(df, skills)).summarize()
+    _, top_pairs = analytics.skill_stats(skills)
+    tasks = charts.chart_inputs(summary, top_pairs)
+
+    serial, serial_total = timed("Tuần tự (1 process)", charts.render_many, tasks, parallel=False)
+    # Lần đầu tính cả thời gian khởi động pool, lần sau là pool đã sẵn sàng
+    timed("Song song (lần đầu, gồm khởi động pool)", charts.render_many, tasks)
+    parallel, _ = timed("Song song (pool đã sẵn sàng)", charts.render_many, tasks)
+    for name in charts.CHART_NAMES:
+        print(f"    {name:<12} tuần tự {serial[name][1]:6.3f}s | trong pool {parallel[name][1]:6.3f}s")
+    charts.shutdown_pool()
+
+
+# --- 5. TÁCH LƯƠNG: thông lượng của salary_parser.parse_salary ---
+def synthetic_salaries(rows: int, seed: int = 0) -> pd.Series:
+    """Sinh `rows` chuỗi lương đủ các dạng, số tiền ngẫu nhiên (gần như không trùng nhau)."""
+    rng = np.random.default_rng(seed)
+    lo = rng.integers(5, 60, rows)
+    hi = lo + rng.integers(1, 30, rows)
+    usd_lo, usd_hi = (lo * 100 + rng.integers(0, 100, rows)).astype(str), (hi * 100).astype(str)
+    lo_s, hi_s = lo.astype(str), hi.astype(str)
+    templates = [
+        np.full(rows, "Thương lượng", dtype=object),
+        "$" + usd_lo.astype(object) + "-$" + usd_hi,
+        "Tới " + hi_s.astype(object) + " triệu",
+        "Từ $" + usd_lo.astype(object),
+        lo_s.astype(object) + "-" + hi_s + " triệu",
+        "Up to " + usd_hi.astype(object) + " USD",
+        lo_s.astype(object) + ".000.000 - " + hi_s + ".000.000 VND",
+    ]
+    kind = rng.integers(0, len(templates), rows)
+    return pd.Series(np.stack(templates)[kind, np.arange(rows)])
+
+
+def bench_salary(rows: int):
+    print(f"\n💰 Tách lương ({rows} dòng)")
+    distinct = synthetic_salaries(rows)
+    # Dữ liệu thật lặp lại nhiều chuỗi lương giống nhau (vd "Thương lượng")
+    repeated = pd.Series(np.resize(distinct.head(1000).to_numpy(), rows))
+    for label, salary in [("hầu hết khác nhau", distinct), ("lặp lại (1000 giá trị)", repeated)]:
+        parsed, elapsed = timed(f"parse_salary: {label}", parse_salary, salary)
+        print(f"    -> {rows / elapsed:,.0f} dòng/giây, {parsed['currency'].notna().mean():.0%} có số tiền")
+    # Số nhỏ không đơn vị chỉ hiểu là triệu khi chuỗi chỉ có số hoặc có dấu hiệu là lương
+    check = parse_salary(pd.Series(["15 - 25", "Tới 30", "Lương tháng 13", "2 năm kinh nghiệm"]))
+    assert check["salary_vnd_mid"].tolist()[:2] == [20e6, 30e6] and check["salary_vnd_mid"].iloc[2:].isna().all()
+
+
+# --- 6. PHÂN LOẠI LEVEL: apply từng dòng (cũ) vs regex gộp + cache ---
+# Tiêu đề dễ phân loại sai khi so khớp không dấu (trường / trưởng, chuyển giao / chuyên gia)
+TRICKY_TITLES = ["Kỹ sư môi trường", "Phân tích thị trường", "Chuyên viên nghiên cứu THỊ TRƯỜNG",
+                 "Trưởng nhóm kinh doanh", "Kỹ sư trưởng", "Chuyên viên chuyển giao công nghệ",
+                 "Chuyên gia bảo mật", "Trưởng phòng quản lý dự án", "", None]
+
+
+def bench_levels(rows: int, distinct: int = 5000):
+    print(f"\n🏷️ Phân loại Level ({rows} dòng, ~{distinct} tiêu đề khác nhau)")
+
+    def categorize_level(title):
+        if pd.isna(title):
+            return 'Junior/Mid-level'
+        t = str(title).lower()
+        if any(x in t for x in ['intern', 'thực tập', 'fresh']): return 'Intern/Fresher'
+        if any(x in t for x in ['senior', 'trưởng', 'lead', 'chuyên gia']): return 'Senior/Lead'
+        if any(x in t for x in ['manager', 'giám đốc', 'head', 'quản lý']): return 'Manager/Director'
+        return 'Junior/Mid-level'
+
+    rng = np.random.default_rng(0)
+    names = np.array([f"{rng.choice(TITLES)} {i}" for i in range(distinct)] + TRICKY_TITLES, dtype=object)
+    titles = pd.Series(names[rng.integers(0, len(names), rows)])
+
+    old, _ = timed("Series.apply(categorize_level)", titles.apply, categorize_level)
+    classifier = LevelClassifier()
+    new, _ = timed("LevelClassifier.classify (lần đầu)", classifier.classify, titles)
+    timed("LevelClassifier.classify (cache nóng)", classifier.classify, titles)
+    assert (old == new).all()
+
+
+# --- 7. TOÀN BỘ PIPELINE: thời gian, thông lượng và bộ nhớ đỉnh của từng bước ---
+def profile_stage(results: list, stage: str, rows: int, fn, *args, **kwargs):
+    """
+    Chạy 1 bước, ghi lại thời gian, số dòng/giây và bộ nhớ đỉnh (tracemalloc, phần tăng thêm
+    so với lúc bắt đầu bước). Log của bước bị ẩn để bảng kết quả dễ đọc.
+    """
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = (tracemalloc.get_traced_memory()[1] - base) / 1e6
+    results.append({"stage": stage, "rows": rows, "seconds": round(elapsed, 4),
+                    "rows_per_sec": round(rows / elapsed) if elapsed else None, "peak_mb": round(peak, 1)})
+    print(f"  {stage:<10} {rows:>9} dòng {elapsed:9.3f}s {rows / elapsed:>12,.0f} dòng/s   peak {peak:8.1f}MB")
+    return result
+
+
+def bench_pipeline(rows: int, fetch_jobs: int = 5000, latency: float = 0.0, error_rate: float = 0.0):
+    print(f"\n🏭 Toàn bộ pipeline ({rows} dòng; fetch {fetch_jobs} job qua mock API, "
+          f"latency {latency * 1000:.0f}ms, lỗi {error_rate:.0%})")
+    import export_report
+
+    results = []
+    tracemalloc.start()
+    try:
+        with in_temp_dir():
+            # fetch: crawler thật gọi mock API qua HTTP (có độ trễ + lỗi giả lập)
+            server, url = mock_api.start_server(total_jobs=fetch_jobs, latency=latency, error_rate=error_rate)
+            try:
+                profile_stage(results, "fetch", fetch_jobs, crawl_all, max_workers=8, rate=0, api_url=url)
+            finally:
+                server.shutdown()
+                server.server_close()
+
+            # parse: giải mã JSON + parse các trang response (dữ liệu giả sinh trước, không tính giờ)
+            pages = list(synthetic_pages(rows))
+            raw = profile_stage(results, "parse", rows, parse_pages, pages)
+            del pages
+            storage.write_table(raw, storage.RAW_DATASET)
+            del raw
+
+            def clean():
+                df = clean_frame(storage.read_table(storage.RAW_DATASET)).reset_index(drop=True)
+                storage.write_table(df, storage.CLEAN_DATASET)
+                return df
+            df = profile_stage(results, "clean", rows, clean)
+
+            def aggregate():
+                skills = storage.explode_skills(df["skills_list"])
+                jobs_db.build_db(df, cube.build_cube(df, skills), skills)
+                db = jobs_db.JobsDB()
+                return db.summarize(), db.top_pairs()
+            summary, pairs = profile_stage(results, "aggregate", rows, aggregate)
+            del df
+
+            profile_stage(results, "chart", rows, charts.render_many,
+                          charts.chart_inputs(summary, pairs), parallel=False)
+            chart_cache.CHART_CACHE.clear()
+            pdf = profile_stage(results, "pdf", rows, export_report.create_pdf)
+            assert pdf, "Không tạo được PDF"
+
+            # clean theo chunk: chunk đầu không có kỹ năng nào vẫn phải ghi được các chunk sau
+            chunk = max(rows // 4, 1)
+            raw = storage.read_table(storage.RAW_DATASET)
+            raw.loc[:chunk - 1, "skills"] = ""
+            storage.write_table(raw, storage.RAW_DATASET)
+            profile_stage(results, "chunked", rows, clean_data_chunked, chunk)
+            clean, raw = storage.read_table(storage.CLEAN_DATASET), raw.drop_duplicates("jobUrl")
+            assert len(clean) == len(raw), "clean theo chunk bị mất dòng"
+            assert [list(v) for v in clean["skills_list"]] == [s.split(", ") if s else [] for s in raw["skills"]], \
+                "Sai skills_list"
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+# --- 8. KHỞI ĐỘNG: thời gian import (python -X importtime) ở tiến trình mới ---
+# Các module chỉ nên nạp khi thật sự cần (bấm xuất PDF, tab WordCloud, vẽ biểu đồ đầu tiên)
+IMPORT_TARGETS = {
+    "export_report": "export_report",
+    "reportlab": "reportlab.platypus",
+    "matplotlib": "matplotlib.figure",
+    "wordcloud": "wordcloud",
+}
+
+
+def dashboard_imports(path: str = "dashboard.py") -> str:
+    """Các module dashboard.py import ở cấp module (đọc thẳng từ mã nguồn)."""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), path), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return ", ".join(dict.fromkeys(names))
+
+
+def import_profile(modules: str, repeat: int = 3) -> dict:
+    """
+    Import `modules` trong tiến trình Python mới với -X importtime (lấy lần nhanh nhất trong `repeat` lần).
+    Trả về tổng thời gian import (giây) và thời gian của từng gói cấp cao nhất (numpy, pandas, ...).
+    """
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modules}"],
+                              cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        # Dòng dạng "import time:  self [us] | cumulative | gói", gói con thụt lề theo độ sâu
+        total, packages = 0.0, {}
+        for line in proc.stderr.splitlines():
+            parts = line.removeprefix("import time:").split("|")
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name, seconds = parts[2].strip(), int(parts[1]) / 1e6
+            if not parts[2].startswith("  "):
+                total += seconds
+            if "." not in name:
+                packages[name] = max(packages.get(name, 0.0), seconds)
+        if best is None or total < best[0]:
+            best = (total, packages)
+    return {"seconds": best[0], "packages": best[1]}
+
+
+def bench_imports(rows: int = None):
+    print("\n🚀 Thời gian import ở tiến trình mới (python -X importtime)")
+    # Server Streamlit đã nạp sẵn streamlit (+ pandas, numpy): chỉ tính phần dashboard.py nạp thêm
+    base = import_profile("streamlit")
+    full = import_profile(dashboard_imports())
+    extra = {name: sec for name, sec in full["packages"].items() if name not in base["packages"]}
+    heavy = ", ".join(f"{name} {sec:.2f}s" for name, sec in sorted(extra.items(), key=lambda kv: -kv[1])[:4])
+    print(f"  {'dashboard.py khởi động':<24} {full['seconds'] - base['seconds']:7.3f}s   ({heavy or 'không nạp gói nặng'})")
+    for label, modules in IMPORT_TARGETS.items():
+        print(f"  {label:<24} {import_profile(modules)['seconds']:7.3f}s")
+
+
+# --- 9. GIẢI MÃ RESPONSE: dict từng job (cũ) vs theo cột, 1 batch mỗi trang ---
+# Bộ nhớ đỉnh đo bằng tracemalloc: chỉ tính bộ nhớ do Python cấp phát, không tính buffer của Arrow
+def measure(fn, *args):
+    """(kết quả, số giây, bộ nhớ đỉnh MB theo tracemalloc) của fn(*args)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_decode(rows: int, page_size: int = 1000):
+    pages = list(synthetic_pages(rows, page_size=page_size))
+    size = sum(len(p) for p in pages) / 1e6
+    print(f"\n🧬 Giải mã {len(pages)} trang x {page_size} job ({rows} dòng, {size:.0f}MB JSON, "
+          f"orjson: {'có' if orjson is not None else 'không'})")
+
+    results = {}
+    for label, fn in [("json + dict từng job + 1 DataFrame (cũ)", parse_pages_rows),
+                      ("read_page theo cột, 1 batch / trang", parse_pages)]:
+        # Đo thời gian riêng (tracemalloc làm chậm code Python) rồi đo bộ nhớ đỉnh riêng
+        start = time.perf_counter()
+        results[label] = fn(pages)
+        elapsed = time.perf_counter() - start
+        _, _, peak = measure(fn, pages)
+        print(f"  {label:<45} {elapsed:8.3f}s {rows / elapsed:>12,.0f} dòng/s   peak {peak:8.1f}MB")
+    old, new = results.values()
+    assert old.equals(new), "Hai cách giải mã cho kết quả khác nhau"
+
+
+# --- 10. TÌM KIẾM: quét chuỗi từng dòng (cũ) vs chỉ mục đảo + bitmap ---
+def bench_search(rows: int):
+    print(f"\n🔎 Tìm kiếm trên bảng chi tiết ({rows} dòng)")
+    df = synthetic_clean_frame(rows).reset_index(drop=True)
+    with in_temp_dir():
+        with contextlib.redirect_stdout(io.StringIO()):
+            jobs_db.build_db(df, cube.build_cube(df))
+        index, _ = timed("Dựng chỉ mục (1 lần / phiên bản dữ liệu)", search_index.build_index)
+
+    # Cách cũ: bỏ dấu + tìm chuỗi con trên cả cột tiêu đề và kỹ năng ở mỗi lần rerun
+    text = fold_accents((df["jobTitle"].fillna("") + " " + df["skills"].fillna("")).astype("string"))
+    for query, pattern in [("senior java*", r"\bsenior\b.*\bjava|\bjava\w*.*\bsenior\b"),
+                           ("python OR golang", r"\bpython\b|\bgolang\b"),
+                           ("trưởng nhóm", r"\btruong nhom\b")]:
+        old, _ = timed(f"str.contains  \"{query}\"", text.str.contains, pattern)
+        new, _ = timed(f"SearchIndex   \"{query}\"", index.search, query)
+        assert old.sum() == new.sum(), "Hai cách tìm kiếm cho kết quả khác nhau"
+
+
+# --- 11. METRICS: chi phí mỗi lần ghi (để bật thường xuyên) ---
+def bench_metrics(rows: int):
+    print(f"\n📈 Chi phí ghi metrics ({rows} lần mỗi loại)")
+    registry = metrics.Registry()
+
+    def many(fn, *args, **labels):
+        for _ in range(rows):
+            fn(*args, **labels)
+
+    def many_timers():
+        for _ in range(rows):
+            with registry.timer("bench"):
+                pass
+
+    for label, fn, args, labels in [("counter inc", registry.inc, ("rows_total",), {"stage": "bench"}),
+                                    ("histogram observe", registry.observe, ("http_request_seconds", 0.03),
+                                     {"method": "POST"})]:
+        _, seconds = timed(label, many, fn, *args, **labels)
+        print(f"    -> {seconds / rows * 1e9:.0f} ns/lần")
+    _, seconds = timed("stage timer (kèm span)", many_timers)
+    print(f"    -> {seconds / rows * 1e9:.0f} ns/lần")
+    assert registry.value("rows_total", stage="bench") == rows
+
+
+BENCHMARKS = {
+    "storage": bench_storage,
+    "skills": bench_skills,
+    "pairs": bench_pairs,
+    "charts": bench_charts,
+    "salary": bench_salary,
+    "levels": bench_levels,
+    "pipeline": bench_pipeline,
+    "imports": bench_imports,
+    "decode": bench_decode,
+    "search": bench_search,
+    "metrics": bench_metrics,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Đo hiệu năng pipeline trên dữ liệu giả lập")
+    parser.add_argument("name", choices=list(BENCHMARKS) + ["all", "generate"])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000],
+                        help="Số job giả lập (nhiều giá trị thì chạy lần lượt, vd 10000 100000 1000000)")
+    parser.add_argument("--fetch-jobs", type=int, default=5000, help="pipeline: số job tải qua mock API")
+    parser.add_argument("--latency", type=float, default=0.0, help="pipeline: độ trễ mock API (giây)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="pipeline: tỷ lệ lỗi 503 của mock API")
+    parser.add_argument("--json", dest="json_out", help="pipeline: ghi kết quả ra file JSON")
+    parser.add_argument("--out", help="generate: thư mục ghi dữ liệu giả")
+    args = parser.parse_args()
+
+    profile = []
+    for rows in args.rows:
+        if args.name == "generate":
+            generate(rows, out=args.out)
+            continue
+        for name, bench in BENCHMARKS.items():
+            if args.name in (name, "all"):
+                if name == "pipeline":
+                    profile += bench(rows, fetch_jobs=args.fetch_jobs, latency=args.latency,
+                                     error_rate=args.error_rate)
+                else:
+                    bench(rows)
+    if args.json_out and profile:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+        print(f"💾 Đã ghi kết quả pipeline ra {args.json_out}")
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+import storage
+
+# Cache ảnh biểu đồ (PNG) dùng chung trong cả tiến trình: mọi phiên Dashboard và export_report.
+# Khóa = hash(phiên bản dữ liệu + bộ lọc + tên biểu đồ), giới hạn số ảnh theo kiểu LRU.
+
+MAX_ENTRIES = 128
+
+
+def dataset_version(name: str = storage.CLEAN_DATASET) -> str:
+    """Phiên bản dữ liệu: đổi mỗi khi file dữ liệu sạch được ghi lại."""
+    path = storage.find_path(name)
+    if path is None:
+        return "missing"
+    st = os.stat(path)
+    return hashlib.sha1(f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}".encode()).hexdigest()[:16]
+
+
+def filter_key(companies=None, start=None, end=None) -> dict:
+    """Chuẩn hóa bộ lọc để cùng 1 bộ lọc luôn ra cùng 1 khóa (không lọc -> {})."""
+    key = {}
+    if companies:
+        key["companies"] = sorted(companies)
+    if start is not None and end is not None:
+        key["start"], key["end"] = str(start), str(end)
+    return key
+
+
+def make_key(chart: str, version: str, filters: dict) -> str:
+    raw = json.dumps([chart, version, filters or {}], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def put(self, key: str, png: bytes):
+        with self._lock:
+            self._items[key] = png
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def get_or_render(self, chart: str, version: str, filters: dict, render, *args):
+        """Lấy ảnh từ cache, chưa có thì gọi render(*args) rồi lưu lại (kết quả None không được cache)."""
+        key = make_key(chart, version, filters)
+        png = self.get(key)
+        metrics.inc("chart_cache_total", result="miss" if png is None else "hit")
+        if png is None:
+            with metrics.timer(f"chart.{chart}", metric="chart_render_seconds", chart=chart):
+                png = render(*args)
+            if png is not None:
+                self.put(key, png)
+        return png
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# Cache dùng chung cho toàn tiến trình
+CHART_CACHE = ChartCache()
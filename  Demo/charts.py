@@ -0,0 +1,185 @@
+import io
+import multiprocessing
+import os
+import platform
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Các hàm vẽ biểu đồ dùng chung cho Dashboard và báo cáo PDF.
+# Mỗi hàm nhận số liệu đã tổng hợp (Series) và trả về ảnh PNG dạng bytes.
+# Dùng API hướng đối tượng của matplotlib (Figure riêng cho mỗi biểu đồ), không đụng tới
+# trạng thái toàn cục của pyplot nên vẽ song song giữa nhiều phiên Streamlit vẫn an toàn.
+# render_many() vẽ nhiều biểu đồ cùng lúc trên process pool, mỗi tác vụ chỉ nhận số liệu
+# tổng hợp nhỏ của biểu đồ đó (không gửi cả DataFrame sang process con).
+# matplotlib và wordcloud chỉ được import khi vẽ biểu đồ đầu tiên (không làm chậm lúc mở Dashboard),
+# cấu hình font chạy 1 lần cho mỗi tiến trình.
+
+CHART_NAMES = ["companies", "skills", "trend", "wordcloud", "level", "combo"]
+
+# Font hiển thị tiếng Việt cho biểu đồ theo hệ điều hành
+FONT_FAMILY = {"Windows": "Segoe UI", "Darwin": "AppleGothic"}.get(platform.system(), "Sans-serif")
+
+_setup_lock = threading.Lock()
+_figure_cls = None
+_local = threading.local()
+
+
+def _figure(figsize):
+    """Figure mới (import matplotlib + cấu hình font ở lần gọi đầu tiên của tiến trình)."""
+    global _figure_cls
+    if _figure_cls is None:
+        with _setup_lock:
+            if _figure_cls is None:
+                import matplotlib
+                from matplotlib.figure import Figure
+                matplotlib.rcParams["font.family"] = FONT_FAMILY
+                _figure_cls = Figure
+    return _figure_cls(figsize=figsize)
+
+
+def _wordcloud():
+    """WordCloud dựng sẵn, dùng lại trong cùng thread (generate_* ghi đè kết quả cũ)."""
+    if getattr(_local, "wordcloud", None) is None:
+        from wordcloud import WordCloud
+        _local.wordcloud = WordCloud(width=800, height=400, background_color="white", colormap="viridis")
+    return _local.wordcloud
+
+
+def _to_png(fig) -> bytes:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    FigureCanvasAgg(fig)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def render_companies(company_counts: pd.Series) -> bytes:
+    fig = _figure((10, 5))
+    ax = fig.add_subplot()
+    company_counts.head(10).sort_values().plot(kind='barh', color='#4CAF50', ax=ax)
+    ax.set_title("Top 10 Công ty tuyển dụng nhiều nhất")
+    ax.set_xlabel("Số lượng Job")
+    ax.set_ylabel("")
+    return _to_png(fig)
+
+
+def render_skills(skill_counts: pd.Series) -> bytes:
+    counts = skill_counts.head(10)
+    labels, values = counts.index.astype(str).tolist(), counts.tolist()
+    fig = _figure((10, 5))
+    ax = fig.add_subplot()
+    ax.barh(labels[::-1], values[::-1], color='#2196F3')
+    ax.set_title("Top 10 Kỹ năng lập trình phổ biến")
+    ax.set_xlabel("Số lần xuất hiện")
+    return _to_png(fig)
+
+
+def render_trend(daily: pd.Series) -> bytes:
+    fig = _figure((10, 4))
+    ax = fig.add_subplot()
+    daily.plot(kind='line', marker='o', color='orange', ax=ax)
+    ax.set_title("Xu hướng đăng tin tuyển dụng theo ngày")
+    ax.set_xlabel("")
+    ax.grid(True, linestyle='--', alpha=0.7)
+    return _to_png(fig)
+
+
+def render_wordcloud(skill_counts: pd.Series) -> bytes:
+    wc = _wordcloud().generate_from_frequencies({str(k): int(v) for k, v in skill_counts.items()})
+    fig = _figure((10, 5))
+    ax = fig.add_subplot()
+    ax.imshow(wc, interpolation='bilinear')
+    ax.axis("off")
+    ax.set_title("WordCloud Từ khóa Công nghệ")
+    return _to_png(fig)
+
+
+def render_level(level_counts: pd.Series) -> bytes:
+    fig = _figure((7, 7))
+    ax = fig.add_subplot()
+    ax.pie(level_counts, labels=level_counts.index, autopct='%1.1f%%', startangle=90,
+           colors=['#ff9999', '#66b3ff', '#99ff99', '#ffcc99'])
+    ax.set_title("Cơ cấu Cấp bậc (Level)")
+    return _to_png(fig)
+
+
+def render_combo(top_pairs: pd.Series) -> bytes:
+    labels, values = top_pairs.index.tolist(), top_pairs.tolist()
+    fig = _figure((10, 6))
+    ax = fig.add_subplot()
+    ax.barh(labels[::-1], values[::-1], color='purple')
+    ax.set_title("Top 10 Combo Kỹ năng thường đi cùng nhau")
+    ax.set_xlabel("Số lần xuất hiện")
+    return _to_png(fig)
+
+
+RENDERERS = {
+    "companies": render_companies,
+    "skills": render_skills,
+    "trend": render_trend,
+    "wordcloud": render_wordcloud,
+    "level": render_level,
+    "combo": render_combo,
+}
+
+
+def chart_inputs(summary: dict, top_pairs: pd.Series) -> dict:
+    """Số liệu cần cho từng biểu đồ, lấy từ kết quả cube.AggregateCube.summarize() + cặp kỹ năng."""
+    return {
+        "companies": summary["company_counts"],
+        "skills": summary["skill_counts"],
+        "trend": summary["daily"],
+        "wordcloud": summary["skill_counts"],
+        "level": summary["level_counts"],
+        "combo": top_pairs,
+    }
+
+
+def render(name: str, data: pd.Series):
+    """Vẽ 1 biểu đồ theo tên. Không có dữ liệu thì trả về None."""
+    if data is None or data.empty:
+        return None
+    return RENDERERS[name](data)
+
+
+def timed_render(name: str, data: pd.Series):
+    """Vẽ 1 biểu đồ, trả về (ảnh PNG hoặc None, số giây vẽ)."""
+    start = time.perf_counter()
+    png = render(name, data)
+    return png, time.perf_counter() - start
+
+
+_pool = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool dùng lại giữa các lần vẽ (khởi động process + import matplotlib chỉ 1 lần)."""
+    global _pool
+    if _pool is None:
+        # spawn thay vì fork: an toàn khi process cha (Streamlit) đang chạy nhiều thread
+        _pool = ProcessPoolExecutor(max_workers=min(len(CHART_NAMES), os.cpu_count() or 1),
+                                    mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def render_many(tasks: dict, parallel: bool = True) -> dict:
+    """
+    Vẽ nhiều biểu đồ: tasks là dict tên -> số liệu. Trả về dict tên -> (ảnh PNG hoặc None, số giây).
+    Chạy song song trên process pool khi có từ 2 biểu đồ trở lên và máy có nhiều nhân.
+    """
+    if not parallel or len(tasks) < 2 or (os.cpu_count() or 1) < 2:
+        return {name: timed_render(name, data) for name, data in tasks.items()}
+    pool = get_pool()
+    futures = {name: pool.submit(timed_render, name, data) for name, data in tasks.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,110 @@
+import json
+import os
+
+import pandas as pd
+
+# Checkpoint của 1 lần crawl: file JSONL chỉ ghi nối (append-only), mỗi dòng là kết quả 1 trang
+#   {"page": 3, "ok": true, "nbPages": 200, "frame": {"columns": [...], "data": [...]}}
+# (trang đã giải mã thành DataFrame được ghi bằng to_json dạng "split"; checkpoint cũ ghi "jobs": [...]
+# là danh sách dict vẫn đọc được)
+# Trang lỗi được ghi "ok": false để lần chạy --resume tải lại. Một trang có thể xuất hiện
+# nhiều lần (lỗi rồi tải lại thành công), dòng ghi sau cùng là dòng có hiệu lực.
+
+CHECKPOINT_FILE = "vnworks_crawl_checkpoint.jsonl"
+
+
+class CrawlCheckpoint:
+    def __init__(self, path: str = CHECKPOINT_FILE):
+        self.path = path
+        self.nb_pages = None
+        self.status = {}    # page -> True (đã xong) / False (lỗi)
+        self.offsets = {}   # page -> vị trí byte của dòng thành công mới nhất
+        self._file = None
+
+    def reset(self):
+        """Bỏ checkpoint cũ, bắt đầu lần crawl mới."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.nb_pages = None
+        self.status, self.offsets = {}, {}
+
+    def load(self):
+        """Đọc lại checkpoint (chỉ giữ trạng thái + vị trí dòng, không giữ dữ liệu job trong RAM)."""
+        self.nb_pages = None
+        self.status, self.offsets = {}, {}
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Dòng cuối bị ghi dở khi tiến trình bị ngắt
+                    continue
+                page = record["page"]
+                self.status[page] = record["ok"]
+                if record["ok"]:
+                    self.offsets[page] = offset
+                if record.get("nbPages") is not None:
+                    self.nb_pages = record["nbPages"]
+        return self
+
+    def pending_pages(self) -> list:
+        """Các trang chưa có hoặc đã lỗi, cần tải (lại)."""
+        if self.nb_pages is None:
+            return []
+        return [p for p in range(self.nb_pages) if not self.status.get(p)]
+
+    def record(self, page: int, jobs, ok: bool = True, nb_pages: int = None):
+        """Ghi kết quả 1 trang (DataFrame hoặc danh sách dict) xuống đĩa ngay lập tức."""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        head = {"page": page, "ok": ok, "nbPages": nb_pages}
+        if isinstance(jobs, pd.DataFrame):
+            line = (json.dumps(head, ensure_ascii=False)[:-1] + ', "frame": '
+                    + jobs.to_json(orient="split", index=False, force_ascii=False) + "}")
+        else:
+            line = json.dumps({**head, "jobs": jobs}, ensure_ascii=False)
+        self._file.write(line.encode("utf-8") + b"\n")
+        self._file.flush()
+
+        self.status[page] = ok
+        if ok:
+            self.offsets[page] = offset
+        if nb_pages is not None:
+            self.nb_pages = nb_pages
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def iter_pages(self):
+        """
+        Duyệt kết quả các trang thành công theo thứ tự trang (đọc từng dòng từ đĩa): DataFrame
+        (checkpoint mới) hoặc danh sách dict (checkpoint cũ).
+        """
+        self.close()
+        with open(self.path, "rb") as f:
+            for page in sorted(self.offsets):
+                f.seek(self.offsets[page])
+                record = json.loads(f.readline())
+                if "frame" in record:
+                    yield page, pd.DataFrame(record["frame"]["data"], columns=record["frame"]["columns"])
+                else:
+                    yield page, record["jobs"]
+
+    def compact(self, writer, to_frame=pd.DataFrame) -> int:
+        """Gộp checkpoint vào 1 storage.TableWriter, ghi từng trang một. Trả về số dòng đã ghi."""
+        total = 0
+        for _, jobs in self.iter_pages():
+            if len(jobs):
+                writer.write(to_frame(jobs))
+                total += len(jobs)
+        return total
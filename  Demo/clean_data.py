@@ -1,37 +1,37 @@
-import pandas as pd
+import argparse
 import os
+import pandas as pd
+import storage
+import cube
+import jobs_db
+import metrics
+import search_index
+import snapshots
+from dedup_index import DedupIndex
+from salary_parser import parse_salary
+from level_classifier import classify_levels
 
-INPUT_FILE = "vnworks_it_jobs.csv"
-OUTPUT_CSV = "vnworks_it_jobs_clean.csv"
-OUTPUT_XLSX = "vnworks_it_jobs_clean.xlsx"
-
-def categorize_level(title):
-    if pd.isna(title):
-        return 'Junior/Mid-level'
-    t = str(title).lower()
-    if any(x in t for x in ['intern', 'thực tập', 'fresh']): return 'Intern/Fresher'
-    if any(x in t for x in ['senior', 'trưởng', 'lead', 'chuyên gia', 'senior']): return 'Senior/Lead'
-    if any(x in t for x in ['manager', 'giám đốc', 'head', 'quản lý']): return 'Manager/Director'
-    # Mặc định còn lại coi là Junior/Mid
-    return 'Junior/Mid-level'
-
-def clean_data():
-    if not os.path.exists(INPUT_FILE):
-        print(f"❌ Không tìm thấy file {INPUT_FILE}")
-        return
-
-    # Đọc dữ liệu
-    df = pd.read_csv(INPUT_FILE)
+INPUT_DATASET = storage.RAW_DATASET
+OUTPUT_DATASET = storage.CLEAN_DATASET
+# Chỉ mục chống trùng tạm thời khi chạy theo chunk (xóa khi chạy xong)
+DEDUP_INDEX_FILE = OUTPUT_DATASET + ".dedup.sqlite"
 
+def clean_frame(df, verbose=True):
+    """Các bước làm sạch trên 1 DataFrame dữ liệu thô (không đọc/ghi file)."""
     # Xóa trùng lặp theo jobUrl
     if "jobUrl" in df.columns:
         df = df.drop_duplicates(subset=["jobUrl"])
 
     # Chuẩn hóa text
-    for col in ["jobTitle", "companyName", "salary", "skills"]:
+    for col in ["jobTitle", "companyName", "salary", "skills", "city"]:
         if col in df.columns:
             df[col] = df[col].fillna("").astype(str).str.strip()
 
+    # Tách lương dạng chữ thành số: salary_min, salary_max, currency, salary_vnd_mid
+    if "salary" in df.columns:
+        for col, values in parse_salary(df["salary"]).items():
+            df[col] = values
+
     # Thêm cột skills_list
     if "skills" in df.columns:
         df["skills_list"] = df["skills"].apply(lambda x: x.split(", ") if x else [])
@@ -44,20 +44,118 @@ def clean_data():
     if "approvedOn" in df.columns and "expiredOn" in df.columns:
         df["days_open"] = (df["expiredOn"] - df["approvedOn"]).dt.days
 
-    # Áp dụng hàm phân loại Level trực tiếp
+    # Phân loại Level cho cả cột (từ khóa cấu hình trong level_classifier.LEVEL_RULES)
     if "jobTitle" in df.columns:
-        print("⚙️ Đang phân loại Level...")
-        df["jobLevel_processed"] = df["jobTitle"].apply(categorize_level)
-    # -----------------------------
+        if verbose:
+            print("⚙️ Đang phân loại Level...")
+        df["jobLevel_processed"] = classify_levels(df["jobTitle"])
+    return df
+
+def add_lifecycle(df, store=None):
+    """
+    Thêm vòng đời tin từ kho lịch sử (snapshots.py): first_seen, last_seen (ngày crawl thấy lần
+    đầu / gần nhất) và days_listed (số ngày tin thực sự được thấy trên trang, tính cả 2 đầu).
+    Chưa có kho lịch sử thì giữ nguyên.
+    """
+    if "jobId" not in df.columns or not snapshots.exists():
+        return df
+    life = (store or snapshots.SnapshotStore()).lifecycle(df["jobId"])[["jobId", "first_seen", "last_seen"]]
+    df = df.drop(columns=["first_seen", "last_seen", "days_listed"], errors="ignore")
+    df = df.merge(life, on="jobId", how="left")
+    df["days_listed"] = (df["last_seen"] - df["first_seen"]).dt.days.add(1).astype("Int64")
+    return df
+
+def record_rows(total, kept):
+    """Metrics số dòng vào / ra của bước làm sạch và tỷ lệ dòng trùng bị bỏ."""
+    metrics.inc("rows_total", total, stage="clean_input")
+    metrics.inc("rows_total", kept, stage="clean_output")
+    metrics.set_gauge("dedup_ratio", (total - kept) / total if total else 0.0)
 
-    # Xuất file
-    df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8-sig")
-    df.to_excel(OUTPUT_XLSX, index=False)
+def clean_data(excel=False, chunk_size=None):
+    if not storage.exists(INPUT_DATASET):
+        print(f"❌ Không tìm thấy file {storage.path_for(INPUT_DATASET)}")
+        return
+    if chunk_size:
+        return clean_data_chunked(chunk_size, excel=excel)
+
+    # Đọc dữ liệu
+    with metrics.timer("clean.read"):
+        df = storage.read_table(INPUT_DATASET)
+    total = len(df)
+    with metrics.timer("clean.transform"):
+        df = add_lifecycle(clean_frame(df))
+    record_rows(total, len(df))
+
+    # Xuất file (Excel chỉ xuất khi được yêu cầu vì rất chậm với dữ liệu lớn)
+    df = df.reset_index(drop=True)
+    with metrics.timer("clean.write"):
+        output = storage.write_table(df, OUTPUT_DATASET)
+        if excel:
+            storage.export_excel(OUTPUT_DATASET)
 
-    print(f"✅ Đã làm sạch dữ liệu. Xuất ra: {OUTPUT_CSV}")
+    # Dựng sẵn bảng tổng hợp + file SQLite cho dashboard
+    with metrics.timer("clean.db"):
+        jobs_db.build_db(df, cube.build_cube(df))
+    with metrics.timer("clean.search_index"):
+        search_index.build_index()
+
+    print(f"✅ Đã làm sạch dữ liệu. Xuất ra: {output}")
     # In thử vài dòng để kiểm tra
     if "jobLevel_processed" in df.columns:
         print(df[["jobTitle", "jobLevel_processed"]].head())
 
+def clean_data_chunked(chunk_size, excel=False):
+    """
+    Làm sạch theo từng chunk cho dữ liệu lớn hơn RAM: đọc `chunk_size` dòng mỗi lần, bỏ trùng
+    bằng chỉ mục SQLite trên đĩa, làm sạch rồi ghi nối vào file kết quả + file SQLite của Dashboard
+    và cộng dồn cube.
+    Bộ nhớ tối đa phụ thuộc kích thước chunk, không phụ thuộc số dòng của dữ liệu.
+    """
+    print(f"⚙️ Đang làm sạch theo chunk ({chunk_size} dòng/chunk)...")
+    builder = cube.CubeBuilder()
+    store = snapshots.SnapshotStore() if snapshots.exists() else None
+    total = kept = 0
+    preview = None
+    # File SQLite đóng sau cùng để không bị coi là cũ hơn file dữ liệu sạch
+    with jobs_db.JobsDBWriter() as db, DedupIndex(DEDUP_INDEX_FILE, reset=True) as seen, \
+            storage.TableWriter(OUTPUT_DATASET, schema=storage.CLEAN_SCHEMA, row_group_size=chunk_size) as writer:
+        for chunk in storage.iter_table(INPUT_DATASET, chunk_size):
+            total += len(chunk)
+            with metrics.timer("clean.chunk"):
+                # Xóa trùng lặp theo jobUrl (không có thì theo jobId) trên toàn bộ dữ liệu
+                key = "jobUrl" if "jobUrl" in chunk.columns else "jobId"
+                if key in chunk.columns:
+                    chunk = chunk[seen.add_new(chunk[key])]
+                chunk = clean_frame(chunk, verbose=False).reset_index(drop=True)
+                if store is not None:
+                    chunk = add_lifecycle(chunk, store)
+                skills = storage.explode_skills(chunk["skills_list"]) if "skills_list" in chunk.columns else None
+                writer.write(chunk)
+                builder.add(chunk, skills)
+                db.append(chunk, skills)
+            kept += len(chunk)
+            if preview is None and not chunk.empty:
+                preview = chunk.head()
+        db.write_cube(builder.result())
+    with metrics.timer("clean.search_index"):
+        search_index.build_index()
+    os.remove(DEDUP_INDEX_FILE)
+    record_rows(total, kept)
+    print(f"🧹 Đã xử lý {total} dòng, giữ {kept} dòng (bỏ {total - kept} dòng trùng).")
+
+    if excel:
+        storage.export_excel(OUTPUT_DATASET)
+    print(f"🗄️ Đã ghi {db.rows} job vào {db.path}.")
+
+    print(f"✅ Đã làm sạch dữ liệu. Xuất ra: {writer.path}")
+    if preview is not None and "jobLevel_processed" in preview.columns:
+        print(preview[["jobTitle", "jobLevel_processed"]])
+
 if __name__ == "__main__":
-    clean_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Làm sạch dữ liệu việc làm đã crawl")
+    parser.add_argument("--excel", action="store_true", help="Xuất thêm file Excel (chậm)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Đọc và làm sạch theo từng chunk N dòng (cho dữ liệu lớn hơn RAM)")
+    args = parser.parse_args()
+    clean_data(excel=args.excel, chunk_size=args.chunk_size)
+    metrics.save_run("clean")
@@ -1,26 +1,51 @@
+import argparse
+import io
+import json
+import os
 import requests
 import pandas as pd
 from tqdm import tqdm
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http_client import FetchClient, RateLimiter, json_loads
+from checkpoint import CrawlCheckpoint
+import metrics
+import snapshots
+import storage
 
 # Cấu hình API và URL
 API_URL = "https://ms.vietnamworks.com/job-search/v1.0/search"
 BASE_URL = "https://www.vietnamworks.com"
 
+# Cấu hình crawl song song
+MAX_WORKERS = 8             # Số trang tải cùng lúc
+REQUESTS_PER_SECOND = 4.0   # Giới hạn tốc độ gửi request (thay cho sleep 0.5s cố định)
 
-def fetch_page(page: int, hits_per_page: int = 50, max_retries: int = 3):
+# Chỉ mục các job đã crawl (jobId -> approvedOn), dùng cho chế độ crawl tăng dần
+SEEN_INDEX_FILE = "vnworks_seen_jobs.json"
+# Sắp xếp tin mới duyệt lên trước để dừng sớm khi gặp tin đã biết
+ORDER_BY_APPROVED = [{"field": "approvedOn", "value": "desc"}]
+# Bộ lọc mặc định: ngành CNTT
+IT_FILTER = [{"field": "jobFunction", "value": '[{"parentId":5,"childrenIds":[-1]}]'}]
+
+
+def fetch_page(page: int, hits_per_page: int = 50, max_retries: int = 3,
+               api_url: str = API_URL, client: FetchClient = None, order: list = None,
+               filters: list = None, query: str = "", parse=json_loads):
 
 #   Gửi request đến API VietnamWorks để lấy dữ liệu job của 1 trang.
-#   Có retry nếu lỗi mạng hoặc API tạm ngắt.
+#   Retry (backoff + jitter, Retry-After) và giới hạn tốc độ do FetchClient đảm nhận.
+#   Nên truyền chung 1 client cho cả lần crawl để tái sử dụng kết nối.
+#   Trả về None nếu bỏ cuộc, để nơi gọi đánh dấu trang lỗi (không lẫn với trang rỗng).
+#   filters/query: bộ lọc và từ khóa tìm kiếm (mặc định ngành CNTT, không từ khóa).
+#   parse: hàm giải mã bytes response (mặc định trả về dict JSON; read_page trả về (nbPages, DataFrame)).
 
     payload = {
         "userId": 0,
-        "query": "",
-        "filter": [
-            {"field": "jobFunction", "value": '[{"parentId":5,"childrenIds":[-1]}]'}  # ngành CNTT
-        ],
+        "query": query,
+        "filter": IT_FILTER if filters is None else filters,
         "ranges": [],
-        "order": [],
+        "order": order or [],
         "page": page,
         "hitsPerPage": hits_per_page,
         "retrieveFields": [
@@ -29,73 +54,395 @@ def fetch_page(page: int, hits_per_page: int = 50, max_retries: int = 3):
         ]
     }
 
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/vnd.api+json",
-        # Thêm dòng này để giả lập trình duyệt, tránh lỗi 403 Forbidden
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
+    if client is None:
+        client = get_default_client()
+    try:
+        data = client.post_json(api_url, payload, max_retries=max_retries, parse=parse)
+    except requests.RequestException as e:
+        print(f"❌ Bỏ qua trang {page}: {e}")
+        metrics.inc("crawl_pages_total", result="failed")
+        return None
+    metrics.inc("crawl_pages_total", result="ok")
+    return data
+
+
+_default_client = None
+
+
+def get_default_client() -> FetchClient:
+    """Client dùng chung khi gọi fetch_page lẻ (không qua crawl_all)."""
+    global _default_client
+    if _default_client is None:
+        _default_client = FetchClient()
+    return _default_client
+
+
+def parse_jobs(data: dict) -> list:
+    """Chuyển mảng `data` của 1 trang API thành danh sách dict (mỗi dict là 1 job)."""
+    jobs = []
+    for job in data.get("data", []):
+        jobTitle = job.get("jobTitle", "").strip()
+        companyName = job.get("companyName", "").strip()
+        prettySalary = job.get("prettySalary", "Thương lượng")
+        skills = ", ".join([s.get("skillName", "") for s in job.get("skills", [])]) if job.get("skills") else ""
 
-    for attempt in range(max_retries):
+        alias = job.get("alias", "")
+        jobId = job.get("jobId", "")
+        jobUrl = f"{BASE_URL}/{alias}-{jobId}-jv" if alias and jobId else ""
+
+        approvedOn = job.get("approvedOn", "")
+        expiredOn = job.get("expiredOn", "")
+
+        jobs.append({
+            "jobId": jobId,
+            "jobTitle": jobTitle,
+            "companyName": companyName,
+            "salary": prettySalary,
+            "skills": skills,
+            "jobUrl": jobUrl,
+            "approvedOn": approvedOn,
+            "expiredOn": expiredOn
+        })
+    return jobs
+
+
+# Schema của response 1 trang cho pyarrow.json (chỉ đọc các trường cần, trường khác bỏ qua).
+# Các cột ngày giữ nguyên dạng chuỗi như API trả về.
+if storage.pa is not None:
+    import pyarrow.json as pa_json
+    _JOB_TYPE = storage.pa.struct(
+        [("jobId", storage.pa.int64())]
+        + [(name, storage.pa.string()) for name in ["jobTitle", "companyName", "prettySalary", "alias",
+                                                     "approvedOn", "expiredOn"]]
+        + [("skills", storage.pa.list_(storage.pa.struct([("skillName", storage.pa.string())])))])
+    PAGE_PARSE_OPTIONS = pa_json.ParseOptions(
+        explicit_schema=storage.pa.schema([("meta", storage.pa.struct([("nbPages", storage.pa.int64())])),
+                                           ("data", storage.pa.list_(_JOB_TYPE))]),
+        unexpected_field_behavior="ignore")
+
+
+def read_page(body: bytes):
+    """
+    Giải mã bytes response của 1 trang thành (nbPages, DataFrame các job), 1 batch mỗi trang.
+    pyarrow.json đọc thẳng từ bytes vào các mảng theo cột (không tạo dict Python cho từng job);
+    response có kiểu dữ liệu lạ hoặc máy chưa cài pyarrow thì giải mã JSON rồi dùng decode_page.
+    JSON hỏng ném ValueError (FetchClient coi như lỗi mạng và thử lại).
+    """
+    if storage.pa is not None:
         try:
-            r = requests.post(API_URL, json=payload, headers=headers, timeout=10)
-            r.raise_for_status()
-            return r.json()
-        except requests.RequestException as e:
-            print(f"Lỗi khi tải trang {page}: {e}. Thử lại ({attempt + 1}/{max_retries})...")
-            time.sleep(2)
-    print(f"❌ Bỏ qua trang {page} sau {max_retries} lần thử thất bại.")
-    return {"data": []}
+            table = pa_json.read_json(io.BytesIO(body), parse_options=PAGE_PARSE_OPTIONS)
+            meta = table.column("meta").combine_chunks()
+            data = table.column("data").combine_chunks()
+            if len(data) == 1 and data.null_count == 0:
+                nb_pages = meta.field("nbPages")[0].as_py() if meta.null_count == 0 else None
+                return nb_pages or 1, _decode_arrow(data.flatten())
+        except storage.pa.ArrowException:
+            pass
+    data = json_loads(body)
+    return data.get("meta", {}).get("nbPages", 1), decode_page(data)
+
+
+def decode_page(data: dict) -> pd.DataFrame:
+    """
+    Mảng `data` của 1 trang API (đã giải mã JSON) -> DataFrame, cùng kết quả với
+    jobs_frame(parse_jobs(data)) nhưng xử lý theo cột bằng pyarrow.
+    Máy chưa cài pyarrow hoặc trang có kiểu dữ liệu lạ thì quay về cách parse từng job.
+    """
+    items = data.get("data") or []
+    if storage.pa is not None and items:
+        try:
+            return _decode_arrow(storage.pa.array(items))
+        except (storage.pa.ArrowException, KeyError, TypeError):
+            pass
+    return jobs_frame(parse_jobs(data))
+
+
+def _decode_arrow(jobs) -> pd.DataFrame:
+    """Mảng struct các job -> DataFrame: cắt khoảng trắng, nối tên kỹ năng, ghép jobUrl bằng phép tính vector."""
+    pa, pc = storage.pa, storage.pc
+    names = {f.name for f in jobs.type}
+
+    def text(name, default=""):
+        values = jobs.field(name) if name in names else pa.nulls(len(jobs), pa.string())
+        return pc.fill_null(pc.cast(values, pa.string()), default)
+
+    # skills: list<struct<skillName, ...>> -> "A, B, C"
+    if "skills" in names and pa.types.is_list(jobs.field("skills").type) \
+            and pa.types.is_struct(jobs.field("skills").type.value_type):
+        lists = jobs.field("skills")
+        skill_names = lists.values  # offsets của lists trỏ vào mảng values (kể cả khi lists là lát cắt)
+        skill_names = skill_names.field("skillName") if "skillName" in {f.name for f in skill_names.type} \
+            else pa.nulls(len(skill_names), pa.string())
+        skills = pa.ListArray.from_arrays(lists.offsets, pc.fill_null(skill_names, ""))
+        skills = pc.fill_null(pc.binary_join(skills, ", "), "")
+    elif "skills" in names and jobs.field("skills").null_count < len(jobs):
+        raise TypeError("Cột skills không đúng dạng list<struct>")
+    else:
+        skills = pa.array([""] * len(jobs), pa.string())
+
+    job_id = jobs.field("jobId") if "jobId" in names else pa.nulls(len(jobs), pa.int64())
+    id_text, alias = text("jobId"), text("alias")
+    has_url = pc.and_(pc.not_equal(alias, ""), pc.not_equal(id_text, ""))
+    url = pc.binary_join_element_wise(f"{BASE_URL}/", alias, "-", id_text, "-jv", "")
+
+    df = pa.table({
+        "jobId": job_id,
+        "jobTitle": pc.utf8_trim_whitespace(text("jobTitle")),
+        "companyName": pc.utf8_trim_whitespace(text("companyName")),
+        "salary": text("prettySalary", "Thương lượng"),
+        "skills": skills,
+        "jobUrl": pc.if_else(has_url, url, ""),
+        "approvedOn": text("approvedOn"),
+        "expiredOn": text("expiredOn"),
+    }).to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    if df["jobId"].dtype != "Int64":
+        df["jobId"] = pd.to_numeric(df["jobId"], errors="coerce").astype("Int64")
+    return df
+
+
+def make_client(max_workers: int, rate: float) -> FetchClient:
+    """Tạo 1 client dùng chung cho cả lần crawl, pool đủ lớn cho số thread."""
+    return FetchClient(pool_size=max_workers, limiter=RateLimiter(rate, burst=max_workers))
+
+
+def close_client(client: FetchClient):
+    """Đóng client và in thống kê request."""
+    stats = client.summary()
+    client.close()
+    metrics.set_gauge("http_requests_per_second", stats["requests_per_second"])
+    print(f"🌐 {stats['requests']} request ({stats['requests_per_second']:.1f}/s), "
+          f"{stats['retries']} lần retry, {stats['failures']} lỗi, "
+          f"{stats['breaker_trips']} lần ngắt mạch. Latency TB {stats['latency_avg'] * 1000:.0f}ms, "
+          f"p95 {stats['latency_p95'] * 1000:.0f}ms, max {stats['latency_max'] * 1000:.0f}ms.")
+
+
+def fetch_all_pages(checkpoint: CrawlCheckpoint, max_workers: int = MAX_WORKERS,
+                    rate: float = REQUESTS_PER_SECOND, api_url: str = API_URL) -> list:
+    """
+    Tải các trang còn thiếu trong checkpoint, ghi kết quả từng trang xuống đĩa ngay khi xong.
+    Trang 0 dùng để đọc nbPages và được tái sử dụng luôn (không tải lại).
+    Các trang còn lại được tải song song bởi thread pool, chung 1 token bucket.
+    Trả về danh sách các trang bị lỗi.
+    """
+    client = make_client(max_workers, rate)
+
+    # Lấy trang đầu để biết tổng số trang
+    if checkpoint.nb_pages is None:
+        first_page = fetch_page(0, api_url=api_url, client=client, parse=read_page)
+        if first_page is None:
+            checkpoint.record(0, [], ok=False)
+            close_client(client)
+            return [0]
+        nb_pages, jobs = first_page
+        checkpoint.record(0, jobs, nb_pages=nb_pages)
+
+    nb_pages = checkpoint.nb_pages
+    pending = checkpoint.pending_pages()
+    failed = []
+    with tqdm(total=nb_pages, initial=nb_pages - len(pending), desc="Đang crawl dữ liệu") as pbar:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(fetch_page, page, api_url=api_url, client=client, parse=read_page): page
+                for page in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    page, data = futures[future], future.result()
+                    # Chỉ thread chính ghi checkpoint nên không cần khóa
+                    if data is None:
+                        checkpoint.record(page, [], ok=False)
+                        failed.append(page)
+                    else:
+                        _, jobs = data
+                        checkpoint.record(page, jobs)
+                    pbar.update(1)
+            except KeyboardInterrupt:
+                executor.shutdown(wait=False, cancel_futures=True)
+                print("\n⛔ Đã dừng. Chạy lại với --resume để tiếp tục từ các trang còn thiếu.")
+                raise
+
+    close_client(client)
+    return sorted(failed)
+
+
+# --- CHỈ MỤC JOB ĐÃ CRAWL ---
+def load_seen_index(path: str = SEEN_INDEX_FILE) -> dict:
+    """Đọc chỉ mục jobId -> approvedOn của các lần crawl trước (rỗng nếu chưa có)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_seen_index(df: pd.DataFrame, path: str = SEEN_INDEX_FILE):
+    """Ghi lại chỉ mục từ toàn bộ dataset hiện có."""
+    index = {str(job_id): str(approved) for job_id, approved in zip(df["jobId"], df["approvedOn"])}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def jobs_frame(jobs: list) -> pd.DataFrame:
+    """Danh sách job (dict) -> DataFrame, jobId ép về số nguyên để khớp schema lưu trữ."""
+    df = pd.DataFrame(jobs)
+    if "jobId" in df.columns:
+        df["jobId"] = pd.to_numeric(df["jobId"], errors="coerce").astype("Int64")
+    return df
+
+
+def save_jobs(df: pd.DataFrame):
+    storage.write_table(df, storage.RAW_DATASET)
+    save_seen_index(df)
+
+
+def load_existing_jobs() -> pd.DataFrame:
+    """Đọc dataset đã crawl trước đó. File cũ chưa có cột jobId thì lấy lại từ jobUrl."""
+    df = storage.read_table(storage.RAW_DATASET)
+    if "jobId" not in df.columns:
+        df.insert(0, "jobId", df["jobUrl"].astype(str).str.extract(r"-(\d+)-jv$")[0])
+    df["jobId"] = pd.to_numeric(df["jobId"], errors="coerce").astype("Int64")
+    return df
+
 
 # Crawl
-def crawl_all():
+def crawl_all(max_workers: int = MAX_WORKERS, rate: float = REQUESTS_PER_SECOND, api_url: str = API_URL,
+              resume: bool = False):
     print("🚀 Bắt đầu crawl dữ liệu...")
     start = time.time()
 
-    # Lấy trang đầu để biết tổng số trang
-    first_page = fetch_page(0)
-    meta = first_page.get("meta", {})
-    nb_pages = meta.get("nbPages", 1)
-
-    all_jobs = []
-
-    for page in tqdm(range(nb_pages), desc="Đang crawl dữ liệu"):
-        data = fetch_page(page)
-        # Sleep nhẹ để an toàn
-        time.sleep(0.5)
-
-        for job in data.get("data", []):
-            jobTitle = job.get("jobTitle", "").strip()
-            companyName = job.get("companyName", "").strip()
-            prettySalary = job.get("prettySalary", "Thương lượng")
-            skills = ", ".join([s.get("skillName", "") for s in job.get("skills", [])]) if job.get("skills") else ""
-
-            alias = job.get("alias", "")
-            jobId = job.get("jobId", "")
-            jobUrl = f"{BASE_URL}/{alias}-{jobId}-jv" if alias and jobId else ""
-
-            approvedOn = job.get("approvedOn", "")
-            expiredOn = job.get("expiredOn", "")
-
-            all_jobs.append({
-                "jobTitle": jobTitle,
-                "companyName": companyName,
-                "salary": prettySalary,
-                "skills": skills,
-                "jobUrl": jobUrl,
-                "approvedOn": approvedOn,
-                "expiredOn": expiredOn
-            })
-
-    df = pd.DataFrame(all_jobs)
-    df.to_csv("vnworks_it_jobs.csv", index=False, encoding="utf-8-sig")
-    df.to_excel("vnworks_it_jobs.xlsx", index=False)
-
-    print(f"\n✅ Đã crawl {len(df)} jobs từ {nb_pages} trang vào file vnworks_it_jobs.csv.")
+    checkpoint = CrawlCheckpoint()
+    if resume:
+        checkpoint.load()
+        if checkpoint.nb_pages is not None:
+            done = checkpoint.nb_pages - len(checkpoint.pending_pages())
+            print(f"♻️ Tiếp tục từ checkpoint: {done}/{checkpoint.nb_pages} trang đã xong.")
+    else:
+        checkpoint.reset()
+
+    try:
+        with metrics.timer("crawl.fetch"):
+            failed = fetch_all_pages(checkpoint, max_workers=max_workers, rate=rate, api_url=api_url)
+    finally:
+        checkpoint.close()
+
+    if checkpoint.nb_pages is None:
+        print("❌ Không tải được trang đầu tiên. Chạy lại với --resume.")
+        return None
+    nb_pages = checkpoint.nb_pages
+
+    # Gộp checkpoint thành file dữ liệu (ghi từng trang, không giữ toàn bộ job trong RAM)
+    with metrics.timer("crawl.compact"):
+        with storage.TableWriter(storage.RAW_DATASET, schema=storage.RAW_SCHEMA) as writer:
+            checkpoint.compact(writer, to_frame=jobs_frame)
+        save_seen_index(storage.read_table(storage.RAW_DATASET, columns=["jobId", "approvedOn"]))
+        df = storage.read_table(storage.RAW_DATASET)
+    metrics.inc("rows_total", len(df), stage="crawl")
+    # Nạp vào kho lịch sử (snapshot theo ngày crawl + vòng đời tin + xu hướng theo ngày)
+    with metrics.timer("crawl.snapshot"):
+        snapshots.land_crawl(df)
+
+    if failed:
+        print(f"⚠️ Còn {len(failed)} trang lỗi: {failed[:10]}... Chạy lại với --resume để tải bù.")
+    else:
+        os.remove(checkpoint.path)
+
+    print(f"\n✅ Đã crawl {len(df)} jobs từ {nb_pages} trang vào file {writer.path}.")
     print(f"⏱ Thời gian thực hiện: {time.time() - start:.2f} giây.")
     print(df.head())
     return df
 
 
+def crawl_incremental(max_workers: int = MAX_WORKERS, rate: float = REQUESTS_PER_SECOND, api_url: str = API_URL):
+    """
+    Crawl tăng dần: sắp xếp theo ngày duyệt (mới nhất trước), tải từng đợt `max_workers` trang
+    song song và dừng ở trang đầu tiên chỉ toàn job đã biết (cùng jobId và approvedOn).
+    Job mới / thay đổi được gộp vào dataset cũ. Chưa có dữ liệu cũ thì crawl toàn bộ.
+    """
+    seen = load_seen_index()
+    if not seen or not storage.exists(storage.RAW_DATASET):
+        print("ℹ️ Chưa có dữ liệu cũ, chuyển sang crawl toàn bộ.")
+        return crawl_all(max_workers=max_workers, rate=rate, api_url=api_url)
+
+    print(f"🚀 Bắt đầu crawl tăng dần ({len(seen)} job đã biết)...")
+    start = time.time()
+    client = make_client(max_workers, rate)
+
+    new_jobs, seen_now = [], []  # job mới/thay đổi; mọi job thấy được ở lần này (cho kho lịch sử)
+    page, nb_pages, fetched, done = 0, None, 0, False
+    with metrics.timer("crawl.fetch"), ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while not done:
+            # Đợt đầu chỉ tải trang 0 để biết nbPages
+            batch = range(0, 1) if nb_pages is None else range(page, min(page + max_workers, nb_pages))
+            pages = list(executor.map(
+                lambda p: fetch_page(p, api_url=api_url, client=client, order=ORDER_BY_APPROVED, parse=read_page),
+                batch))
+
+            for p, data in zip(batch, pages):
+                fetched += 1
+                if data is None:
+                    # Không biết trang lỗi có job mới hay không, tải tiếp thay vì dừng
+                    print(f"⚠️ Trang {p} lỗi, job trên trang này sẽ được lấy ở lần crawl sau.")
+                    continue
+                page_count, jobs = data
+                if nb_pages is None:
+                    nb_pages = page_count
+                if len(jobs):
+                    seen_now.append(jobs)
+                fresh = jobs[jobs["jobId"].astype(str).map(seen) != jobs["approvedOn"].astype(str)] \
+                    if len(jobs) else jobs
+                if len(fresh):
+                    new_jobs.append(fresh)
+                # Trang rỗng hoặc toàn job đã biết: các trang sau (cũ hơn) cũng đã có
+                if fresh.empty:
+                    done = True
+                    break
+            page = batch.stop
+            if nb_pages is None or page >= nb_pages:
+                done = True
+    close_client(client)
+
+    with metrics.timer("crawl.merge"):
+        old_df = load_existing_jobs()
+        new_df = pd.concat(new_jobs, ignore_index=True) if new_jobs else pd.DataFrame()
+        if len(new_df):
+            # Job thay đổi thì giữ bản mới nhất
+            df = pd.concat([new_df, old_df], ignore_index=True).drop_duplicates(subset=["jobId"], keep="first")
+            save_jobs(df)
+        else:
+            df = old_df
+    metrics.inc("rows_total", len(new_df), stage="crawl")
+    # Kho lịch sử chỉ nhận các job thực sự thấy trên API ở lần này (không gồm dữ liệu cũ đã gộp)
+    if seen_now:
+        with metrics.timer("crawl.snapshot"):
+            snapshots.land_crawl(pd.concat(seen_now, ignore_index=True))
+
+    print(f"\n✅ Crawl tăng dần: {len(new_df)} job mới/thay đổi sau {fetched} trang. Tổng {len(df)} jobs.")
+    print(f"⏱ Thời gian thực hiện: {time.time() - start:.2f} giây.")
+    return df
+
+
 if __name__ == "__main__":
-    crawl_all()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Crawl dữ liệu việc làm IT từ VietnamWorks")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Số trang tải song song")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="Số request tối đa mỗi giây")
+    parser.add_argument("--api-url", default=API_URL, help="URL API (dùng mock_api.py để chạy thử offline)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Tiếp tục lần crawl bị dừng/lỗi, chỉ tải lại các trang còn thiếu")
+    parser.add_argument("--excel", action="store_true", help="Xuất thêm file Excel sau khi crawl (chậm)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Chỉ tải job mới/thay đổi từ lần crawl trước rồi gộp vào dữ liệu cũ")
+    parser.add_argument("--enrich", action="store_true",
+                        help="Tải thêm chi tiết job (thành phố, cấp bậc, phúc lợi) sau khi crawl, xem enrich.py")
+    args = parser.parse_args()
+
+    if args.incremental:
+        crawl_incremental(max_workers=args.workers, rate=args.rate, api_url=args.api_url)
+    else:
+        crawl_all(max_workers=args.workers, rate=args.rate, api_url=args.api_url, resume=args.resume)
+    if args.enrich:
+        import enrich
+        enrich.enrich_dataset(max_workers=args.workers, rate=args.rate)
+    if args.excel and storage.exists(storage.RAW_DATASET):
+        storage.export_excel(storage.RAW_DATASET)
+    metrics.save_run("crawl")
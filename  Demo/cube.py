@@ -0,0 +1,132 @@
+import pandas as pd
+
+import storage
+
+# Bảng tổng hợp dựng sẵn (aggregate cube) theo khóa (công ty, ngày), chạy sau clean_data:
+#   - jobs:   companyName, day, n              (số job)
+#   - skills: companyName, day, skill, n       (số job yêu cầu kỹ năng)
+#   - levels: companyName, day, level, n       (số job theo cấp bậc)
+# Dashboard và báo cáo chỉ cần cộng các lát cắt nhỏ này thay vì quét lại toàn bộ DataFrame mỗi lần lọc.
+# clean_data lưu cube vào file SQLite của Dashboard (jobs_db.py, các bảng cube_*).
+
+CUBE_KEYS = ["jobs", "skills", "levels"]
+
+
+def build_cube(df: pd.DataFrame, skills: pd.DataFrame = None) -> dict:
+    """Dựng cube từ dữ liệu sạch và bảng dài (row, skill). Thiếu skills thì tự tách từ skills_list."""
+    keys = pd.DataFrame({
+        "companyName": df["companyName"].to_numpy(),
+        "day": pd.to_datetime(df["approvedOn"], errors="coerce").dt.normalize().to_numpy(),
+    })
+    group = ["companyName", "day"]
+
+    jobs = keys.groupby(group, dropna=False).size().rename("n").reset_index()
+
+    if "jobLevel_processed" in df.columns:
+        lv = keys.assign(level=df["jobLevel_processed"].to_numpy())
+        levels = lv.groupby(group + ["level"], dropna=False).size().rename("n").reset_index()
+    else:
+        levels = pd.DataFrame(columns=group + ["level", "n"])
+
+    if skills is None and "skills_list" in df.columns:
+        skills = storage.explode_skills(df["skills_list"].reset_index(drop=True))
+    elif skills is None:
+        skills = pd.DataFrame({"row": pd.Series(dtype=int), "skill": pd.Categorical([])})
+    # Mỗi kỹ năng chỉ tính 1 lần trong 1 job (giống analytics.skill_stats)
+    skills = skills.drop_duplicates(["row", "skill"])
+    rows = skills["row"].to_numpy()
+    sk = pd.DataFrame({
+        "companyName": keys["companyName"].to_numpy()[rows],
+        "day": keys["day"].to_numpy()[rows],
+        "skill": skills["skill"].astype(str).to_numpy(),
+    })
+    skill_cube = sk.groupby(group + ["skill"], dropna=False).size().rename("n").reset_index()
+
+    return {"jobs": jobs, "skills": skill_cube, "levels": levels}
+
+
+def filter_mask(df: pd.DataFrame, companies=None, start=None, end=None):
+    """Mặt nạ các dòng thỏa bộ lọc công ty + khoảng ngày (tính cả 2 đầu mút), cùng quy ước với cube."""
+    mask = pd.Series(True, index=df.index)
+    if companies:
+        mask &= df["companyName"].isin(companies)
+    if start is not None and end is not None:
+        day = df["approvedDay"] if "approvedDay" in df.columns else pd.to_datetime(
+            df["approvedOn"], errors="coerce").dt.normalize()
+        mask &= (day >= pd.Timestamp(start)) & (day <= pd.Timestamp(end))
+    return mask.to_numpy()
+
+
+def sorted_counts(table: pd.DataFrame, by: str) -> pd.Series:
+    counts = table.groupby(by)["n"].sum()
+    counts = counts[counts > 0]
+    return counts.sort_values(ascending=False, kind="stable")
+
+
+class AggregateCube:
+    """Truy vấn cube theo bộ lọc công ty + khoảng ngày. Không lọc thì trả luôn tổng toàn cục."""
+
+    def __init__(self, cube: dict):
+        self.jobs = cube["jobs"]
+        self.skills = cube["skills"]
+        self.levels = cube["levels"]
+        self.totals = self._summarize(self.jobs, self.skills, self.levels)
+
+    @staticmethod
+    def _summarize(jobs, skills, levels) -> dict:
+        company_counts = sorted_counts(jobs, "companyName")
+        return {
+            "total_jobs": int(jobs["n"].sum()),
+            "n_companies": len(company_counts),
+            "company_counts": company_counts,
+            "daily": jobs.dropna(subset=["day"]).groupby("day")["n"].sum().sort_index(),
+            "skill_counts": sorted_counts(skills, "skill"),
+            "level_counts": sorted_counts(levels, "level"),
+        }
+
+    def _slice(self, table, companies, start, end):
+        mask = pd.Series(True, index=table.index)
+        if companies:
+            mask &= table["companyName"].isin(companies)
+        if start is not None and end is not None:
+            mask &= (table["day"] >= pd.Timestamp(start)) & (table["day"] <= pd.Timestamp(end))
+        return table[mask]
+
+    def summarize(self, companies=None, start=None, end=None) -> dict:
+        """start/end là ngày (date), tính cả 2 đầu mút."""
+        if not companies and (start is None or end is None):
+            return self.totals
+        return self._summarize(self._slice(self.jobs, companies, start, end),
+                               self._slice(self.skills, companies, start, end),
+                               self._slice(self.levels, companies, start, end))
+
+
+class CubeBuilder:
+    """
+    Dựng cube theo từng phần dữ liệu (clean_data chạy theo chunk): mỗi chunk cho 1 cube nhỏ,
+    các cube nhỏ được cộng dồn theo khóa nên bộ nhớ chỉ phụ thuộc số ô, không phụ thuộc số dòng.
+    """
+    COMPACT_EVERY = 20   # Gộp các cube nhỏ sau mỗi chừng này chunk
+
+    def __init__(self):
+        self._parts = {key: [] for key in CUBE_KEYS}
+
+    def add(self, df: pd.DataFrame, skills: pd.DataFrame = None):
+        for key, table in build_cube(df, skills).items():
+            self._parts[key].append(table)
+            if len(self._parts[key]) >= self.COMPACT_EVERY:
+                self._parts[key] = [self._merge(self._parts[key])]
+
+    @staticmethod
+    def _merge(tables: list) -> pd.DataFrame:
+        non_empty = [t for t in tables if not t.empty]
+        if len(non_empty) <= 1:
+            return non_empty[0] if non_empty else tables[0]
+        table = pd.concat(non_empty, ignore_index=True)
+        keys = [c for c in table.columns if c != "n"]
+        return table.groupby(keys, dropna=False)["n"].sum().reset_index()
+
+    def result(self) -> dict:
+        if not self._parts["jobs"]:
+            return build_cube(pd.DataFrame({"companyName": [], "approvedOn": []}))
+        return {key: self._merge(tables) for key, tables in self._parts.items()}
@@ -1,45 +1,89 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from collections import Counter
-import ast
-import platform
-from export_report import create_pdf
+import math
 import time
+import streamlit as st
+import storage
+import cube
+import charts
+import chart_cache
+import jobs_db
+import metrics
+import search_index
+import snapshots
+from report_jobs import REPORT_QUEUE
+
+PAGE_SIZE = 50  # Số job mỗi trang của bảng chi tiết
+RERUN_START = time.perf_counter()
 
 # --- CẤU HÌNH TRANG ---
 st.set_page_config(page_title="VietnamWorks IT Job Dashboard", layout="wide")
 
-# --- CẤU HÌNH FONT TIẾNG VIỆT ---
-system_name = platform.system()
-if system_name == "Windows":
-    plt.rcParams['font.family'] = 'Segoe UI'
-elif system_name == "Darwin":
-    plt.rcParams['font.family'] = 'AppleGothic'
-else:
-    plt.rcParams['font.family'] = 'Sans-serif'
+# Font tiếng Việt cho biểu đồ do charts.py cấu hình 1 lần khi vẽ biểu đồ đầu tiên; matplotlib, wordcloud
+# và ReportLab (export_report) chỉ được nạp khi cần nên mở trang / mỗi lần rerun không phải import lại.
+
+
+# Metrics (metrics.py): endpoint Prometheus mở 1 lần cho cả tiến trình nếu có VNWORKS_METRICS_PORT
+@st.cache_resource
+def start_metrics_server():
+    return metrics.serve_from_env()
+
+
+start_metrics_server()
 
 
 # --- LOAD DỮ LIỆU ---
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv("vnworks_it_jobs_clean.csv")
-        # Chuyển đổi ngày tháng
-        df["approvedOn"] = pd.to_datetime(df["approvedOn"], errors='coerce')
-
-        # Parse skills_list từ chuỗi thành list thật
-        if "skills_list" in df.columns:
-            df["skills_list"] = df["skills_list"].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
-        return df
-    except FileNotFoundError:
+# Dữ liệu nằm trong file SQLite (jobs_db.py): mỗi lần lọc chỉ gửi câu SQL và nhận kết quả nhỏ,
+# không giữ cả DataFrame trong RAM. Các hàm cache nhận `version` (phiên bản file dữ liệu)
+# để tự nạp lại khi clean_data chạy lại.
+@st.cache_resource
+def get_db(version):
+    if not storage.exists(storage.CLEAN_DATASET):
         return None
+    # File SQLite do clean_data ghi; chưa có hoặc cũ hơn dữ liệu sạch thì dựng lại tại chỗ
+    if not jobs_db.is_fresh():
+        df = storage.read_table(storage.CLEAN_DATASET)
+        skills = storage.read_skills(storage.CLEAN_DATASET)
+        jobs_db.build_db(df, cube.build_cube(df, skills), skills)
+    return jobs_db.JobsDB()
+
+
+# Chỉ mục tìm kiếm (search_index.py) chỉ được nạp khi có người tìm kiếm lần đầu
+@st.cache_resource
+def get_search(version):
+    get_db(version)  # File SQLite phải có và mới trước khi dựng chỉ mục từ nó
+    return search_index.load_index()
+
+
+@st.cache_data(max_entries=64)
+def get_summary(version, companies, start, end):
+    with metrics.timer("dashboard.query"):
+        return get_db(version).summarize(list(companies), start, end)
+
+
+@st.cache_data(max_entries=64)
+def get_top_pairs(version, companies, start, end):
+    with metrics.timer("dashboard.query"):
+        return get_db(version).top_pairs(list(companies), start, end, k=10)
+
 
+# Lịch sử các lần crawl (snapshots.py): khóa cache là phiên bản file lịch sử, đổi sau mỗi lần crawl
+@st.cache_data(max_entries=16)
+def get_history(version, companies):
+    store = snapshots.SnapshotStore()
+    return store.trend(list(companies)), store.skill_trend(top=5)
 
-df = load_data()
 
-if df is None:
+def show_chart(name, data):
+    # Ảnh lấy từ cache dùng chung (khóa: phiên bản dữ liệu + bộ lọc), chỉ vẽ khi chưa có
+    png = chart_cache.CHART_CACHE.get_or_render(name, DATA_VERSION, FILTER_KEY, charts.render, name, data)
+    if png is not None:
+        st.image(png)
+    return png is not None
+
+
+DATA_VERSION = chart_cache.dataset_version()
+db = get_db(DATA_VERSION)
+
+if db is None:
     st.error("❌ Không tìm thấy file dữ liệu. Hãy chạy clean_data.py trước!")
     st.stop()
 
@@ -47,14 +91,13 @@ if df is None:
 st.sidebar.header("🔍 Bộ lọc")
 
 # 1. Bộ lọc Công ty
-all_companies = sorted(df["companyName"].unique().tolist())
+all_companies = db.companies()
 selected_companies = st.sidebar.multiselect("Chọn công ty", all_companies)
 
 # 2. Bộ lọc Thời gian
-min_date = df["approvedOn"].min().date()
-max_date = df["approvedOn"].max().date()
+min_date, max_date = db.date_range()
 
-if pd.isnull(min_date) or pd.isnull(max_date):
+if min_date is None or max_date is None:
     st.sidebar.warning("Dữ liệu ngày tháng bị lỗi.")
     start_date, end_date = None, None
 else:
@@ -69,98 +112,79 @@ else:
     else:
         start_date, end_date = min_date, max_date
 
-# --- ÁP DỤNG BỘ LỌC ---
-filtered_df = df.copy()
+# 3. Tìm kiếm theo từ khóa / kỹ năng (áp dụng cho bảng dữ liệu chi tiết)
+search_text = st.sidebar.text_input("Tìm theo từ khóa", placeholder="vd: senior java* OR golang",
+                                    help="Các từ cách nhau là AND, OR ngăn các nhóm, * ở cuối để tìm theo tiền tố. "
+                                         "Không phân biệt dấu và chữ hoa.")
+search_skills = st.sidebar.multiselect("Kỹ năng", get_summary(DATA_VERSION, (), None, None)["skill_counts"].index)
+skills_all = st.sidebar.radio("Khớp kỹ năng", ["Tất cả (AND)", "Bất kỳ (OR)"], horizontal=True,
+                              label_visibility="collapsed") == "Tất cả (AND)"
 
-if selected_companies:
-    filtered_df = filtered_df[filtered_df["companyName"].isin(selected_companies)]
+# --- ÁP DỤNG BỘ LỌC ---
+# Khoảng ngày mặc định (toàn bộ dữ liệu) coi như không lọc theo ngày
+if start_date and end_date and (start_date, end_date) != (min_date, max_date):
+    date_filter = (start_date, end_date)
+else:
+    date_filter = (None, None)
+FILTER_KEY = chart_cache.filter_key(selected_companies, *date_filter)
 
-if start_date and end_date:
-    filtered_df = filtered_df[
-        (filtered_df["approvedOn"].dt.date >= start_date) &
-        (filtered_df["approvedOn"].dt.date <= end_date)
-        ]
+# Các số liệu tổng hợp tính bằng SQL trên bảng cube (không lọc thì là tổng toàn cục)
+query_key = (DATA_VERSION, tuple(sorted(selected_companies)), *date_filter)
+summary = get_summary(*query_key)
+skill_counts = summary["skill_counts"]
+common_pairs = get_top_pairs(*query_key)
 
 # --- GIAO DIỆN CHÍNH ---
 st.title("📊 Dashboard Phân Tích Tuyển Dụng IT")
 col1, col2, col3 = st.columns(3)
-col1.metric("Tổng số Job", len(filtered_df))
-col2.metric("Số công ty", filtered_df['companyName'].nunique())
+col1.metric("Tổng số Job", summary["total_jobs"])
+col2.metric("Số công ty", summary["n_companies"])
 
-all_skills_temp = [s for skills in filtered_df["skills_list"] for s in skills]
-top_skill = Counter(all_skills_temp).most_common(1)[0][0] if all_skills_temp else "N/A"
+top_skill = skill_counts.index[0] if not skill_counts.empty else "N/A"
 col3.metric("Kỹ năng Hot nhất", top_skill)
 
 # --- TABS ---
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+# Chỉ vẽ tab đang được chọn (st.tabs sẽ chạy code của cả 6 tab ở mỗi lần rerun)
+TAB_NAMES = [
     "🏢 Top Công Ty", "🧠 Top Kỹ Năng", "📈 Xu Hướng",
     "☁ WordCloud", "Bg Cấp Bậc", "🔗 Combo Kỹ Năng"
-])
-
-with tab1:  # Top Công Ty
-    st.subheader("Top 10 Công ty tuyển dụng nhiều nhất")
-    if not filtered_df.empty:
-        top_companies = filtered_df['companyName'].value_counts().head(10).sort_values()
-        fig, ax = plt.subplots(figsize=(10, 6))
-        top_companies.plot(kind='barh', color='#4CAF50', ax=ax)
-        ax.set_xlabel("Số lượng Job")
-        st.pyplot(fig)
-
-with tab2:  # Top Kỹ Năng
-    st.subheader("Top 10 Kỹ năng Hot nhất")
-    if all_skills_temp:
-        counts = Counter(all_skills_temp).most_common(10)
-        skills, nums = zip(*counts)
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.barh(skills[::-1], nums[::-1], color="#2196F3")
-        ax.set_xlabel("Số lượng")
-        st.pyplot(fig)
-
-with tab3:  # Xu Hướng
-    st.subheader("Xu hướng đăng tin theo ngày")
-    if not filtered_df.empty:
-        daily = filtered_df.groupby(filtered_df["approvedOn"].dt.date).size()
-        st.line_chart(daily)
-
-with tab4:  # WordCloud
-    st.subheader("WordCloud")
-    if all_skills_temp:
-        wc = WordCloud(width=800, height=400, background_color="white").generate(" ".join(all_skills_temp))
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wc, interpolation='bilinear')
-        ax.axis("off")
-        st.pyplot(fig)
-
-with tab5:  # Cấp Bậc
-    st.subheader("Phân bố Cấp bậc (Level)")
-    if "jobLevel_processed" in filtered_df.columns:
-        counts = filtered_df['jobLevel_processed'].value_counts()
-        fig, ax = plt.subplots(figsize=(6, 6))
-        ax.pie(counts, labels=counts.index, autopct='%1.1f%%', startangle=90,
-               colors=['#ff9999', '#66b3ff', '#99ff99', '#ffcc99'])
-        st.pyplot(fig)
-    else:
-        st.warning("Chưa có dữ liệu Cấp bậc.")
-
-with tab6:  # Combo Kỹ Năng
-    st.subheader("Các cặp kỹ năng thường đi cùng nhau")
-    pairs_list = []
-    for skills in filtered_df["skills_list"]:
-        unique_skills = sorted(list(set(skills)))
-        if len(unique_skills) < 2: continue
-        for i in range(len(unique_skills)):
-            for j in range(i + 1, len(unique_skills)):
-                pairs_list.append(f"{unique_skills[i]} + {unique_skills[j]}")
-
-    if pairs_list:
-        common_pairs = Counter(pairs_list).most_common(10)
-        labels, values = zip(*common_pairs)
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.barh(labels[::-1], values[::-1], color='purple')
-        ax.set_xlabel("Số lần xuất hiện cùng nhau")
-        st.pyplot(fig)
-    else:
-        st.info("Không đủ dữ liệu để phân tích combo.")
+]
+# Tên ngắn của từng tab cho metrics (thời gian vẽ mỗi tab)
+TAB_KEYS = ["companies", "skills", "trend", "wordcloud", "level", "combo"]
+tab = st.radio("Biểu đồ", TAB_NAMES, horizontal=True, label_visibility="collapsed")
+chart_data = charts.chart_inputs(summary, common_pairs)
+
+with metrics.timer("dashboard.tab", tab=TAB_KEYS[TAB_NAMES.index(tab)]):
+    if tab == TAB_NAMES[0]:  # Top Công Ty
+        show_chart("companies", chart_data["companies"])
+
+    elif tab == TAB_NAMES[1]:  # Top Kỹ Năng
+        show_chart("skills", chart_data["skills"])
+
+    elif tab == TAB_NAMES[2]:  # Xu Hướng
+        st.subheader("Xu hướng đăng tin theo ngày")
+        if not summary["daily"].empty:
+            st.line_chart(summary["daily"])
+        if snapshots.exists():
+            history, skill_history = get_history(snapshots.history_version(), tuple(sorted(selected_companies)))
+            st.subheader("Số tin mới / đang đăng theo ngày crawl")
+            if len(history) >= 2:
+                st.line_chart(history.rename(columns={"new_postings": "Tin mới", "active_postings": "Đang đăng"}))
+                st.subheader("Nhu cầu kỹ năng theo ngày crawl (mọi công ty)")
+                st.line_chart(skill_history)
+            else:
+                st.info("Cần ít nhất 2 ngày crawl để vẽ xu hướng theo lịch sử.")
+
+    elif tab == TAB_NAMES[3]:  # WordCloud
+        show_chart("wordcloud", chart_data["wordcloud"])
+
+    elif tab == TAB_NAMES[4]:  # Cấp Bậc
+        if not show_chart("level", chart_data["level"]):
+            st.warning("Chưa có dữ liệu Cấp bậc.")
+
+    elif tab == TAB_NAMES[5]:  # Combo Kỹ Năng
+        if not show_chart("combo", chart_data["combo"]):
+            st.info("Không đủ dữ liệu để phân tích combo.")
 
 # Xem dữ liệu chi tiết
 st.markdown("---")
@@ -173,37 +197,81 @@ with st.expander("Xem danh sách Job (Table) chi tiết"):
         "city", "approvedOn", "skills", "jobUrl"
     ]
     # Chỉ hiển thị những cột thực sự tồn tại trong file của bạn
-    final_cols = [c for c in cols_to_show if c in filtered_df.columns]
-
-    # Hiển thị bảng
+    final_cols = [c for c in cols_to_show if c in db.columns()]
+
+    # Có tìm kiếm: bitmap kết quả & bitmap bộ lọc công ty + ngày trên chỉ mục, rồi chỉ lấy đúng các dòng
+    # của trang đang xem từ SQLite. Không tìm kiếm thì phân trang thẳng bằng SQL như cũ.
+    if search_text.strip() or search_skills:
+        index = get_search(DATA_VERSION)
+        with metrics.timer("dashboard.search"):
+            mask = index.filter(selected_companies, *date_filter)
+            if search_text.strip():
+                mask &= index.search(search_text)
+            if search_skills:
+                mask &= index.skills(search_skills, match_all=skills_all)
+            matched = index.ordered_rows(mask)
+        total = len(matched)
+    else:
+        matched, total = None, summary["total_jobs"]
+
+    # Chỉ tải 1 trang từ SQLite thay vì gửi toàn bộ bảng xuống trình duyệt
+    n_pages = max(1, math.ceil(total / PAGE_SIZE))
+    page = st.number_input("Trang", min_value=1, max_value=n_pages, value=1, step=1)
+    with metrics.timer("dashboard.table"):
+        if matched is None:
+            table = db.page(selected_companies, *date_filter, page=page - 1, page_size=PAGE_SIZE,
+                            columns=final_cols)
+        else:
+            table = db.rows(matched[(page - 1) * PAGE_SIZE:page * PAGE_SIZE], columns=final_cols)
     st.dataframe(
-        filtered_df[final_cols],
+        table,
         use_container_width=True,
         height=500  # Chiều cao bảng (có thanh cuộn)
     )
-    st.caption(f"Đang hiển thị {len(filtered_df)} job theo bộ lọc.")
+    st.caption(f"Trang {page}/{n_pages}, tổng {total} job theo bộ lọc"
+               f"{' và tìm kiếm' if matched is not None else ''}.")
 
 # Tải PDF
 st.sidebar.markdown("---")
 st.sidebar.header("🖨️ Xuất báo cáo")
 
+# Báo cáo tạo ở hàng đợi chạy nền (report_jobs.py): phiên này không bị chặn trong lúc tạo PDF,
+# báo cáo cùng dữ liệu + bộ lọc đã có thì nhận ngay từ cache.
 if st.sidebar.button("Tạo & Tải Báo Cáo PDF"):
-    with st.spinner("Đang tạo file PDF... Vui lòng đợi..."):
-        # Gọi hàm tạo PDF từ file export_report.py
-        create_pdf()
-        time.sleep(1)
-
-    # Đọc file PDF dạng binary để cho phép tải về
-    try:
-        with open("report_it_full.pdf", "rb") as pdf_file:
-            PDFbyte = pdf_file.read()
-
-        st.sidebar.download_button(
-            label="📥 Nhấn để tải file PDF",
-            data=PDFbyte,
-            file_name="VietnamWorks_IT_Report.pdf",
-            mime='application/octet-stream'
-        )
-        st.sidebar.success("Đã tạo xong! Hãy bấm nút trên để tải.")
-    except FileNotFoundError:
-        st.sidebar.error("Có lỗi khi tạo file PDF.")
\ No newline at end of file
+    st.session_state["report_job"] = REPORT_QUEUE.submit(FILTER_KEY, version=DATA_VERSION)
+
+
+def show_report_status():
+    job = REPORT_QUEUE.get(st.session_state.get("report_job"))
+    if job is None:
+        return
+    if job.pending:
+        st.progress(job.progress, text=job.message)
+    elif job.status == "done":
+        PDFbyte = REPORT_QUEUE.result(job.id)
+        if PDFbyte:
+            st.download_button(
+                label="📥 Nhấn để tải file PDF",
+                data=PDFbyte,
+                file_name="VietnamWorks_IT_Report.pdf",
+                mime='application/octet-stream'
+            )
+            st.success("Đã tạo xong! Hãy bấm nút trên để tải.")
+        else:
+            st.error("File PDF không còn trong cache, hãy tạo lại.")
+    else:
+        st.error(f"Có lỗi khi tạo file PDF: {job.error}")
+    # Job vừa xong: chạy lại cả trang để dừng việc tự cập nhật
+    if st.session_state.get("report_polling") and not job.pending:
+        st.session_state["report_polling"] = False
+        st.rerun()
+
+
+# Đang có job chưa xong thì tự cập nhật tiến độ mỗi giây (chỉ chạy lại phần này, không chạy lại cả trang)
+report_job = REPORT_QUEUE.get(st.session_state.get("report_job"))
+st.session_state["report_polling"] = report_job is not None and report_job.pending
+with st.sidebar:
+    st.fragment(show_report_status, run_every=1.0 if st.session_state["report_polling"] else None)()
+
+# Thời gian chạy lại cả trang (không tính phần tự cập nhật tiến độ PDF chạy riêng trong fragment)
+metrics.observe("stage_seconds", time.perf_counter() - RERUN_START, stage="dashboard.rerun")
@@ -0,0 +1,47 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# Chỉ mục chống trùng lặp lưu trên đĩa (SQLite) cho clean_data chạy theo chunk:
+# tập các khóa (jobUrl / jobId) đã gặp nằm trong file, không nằm trong RAM, nên bộ nhớ
+# chỉ phụ thuộc kích thước 1 chunk dù dữ liệu lịch sử có hàng chục triệu dòng.
+
+
+class DedupIndex:
+    def __init__(self, path: str, reset: bool = False):
+        if reset and os.path.exists(path):
+            os.remove(path)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        # Chỉ mục có thể dựng lại bất cứ lúc nào, không cần ghi đồng bộ xuống đĩa
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.conn.execute("CREATE TEMP TABLE batch (key TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def add_new(self, keys: pd.Series) -> np.ndarray:
+        """
+        Mặt nạ các dòng có khóa chưa từng gặp (trong chunk chỉ giữ lần xuất hiện đầu tiên,
+        giống drop_duplicates), đồng thời ghi các khóa mới vào chỉ mục.
+        """
+        keys = keys.fillna("").astype(str)
+        first = ~keys.duplicated().to_numpy()
+        with self.conn:
+            self.conn.execute("DELETE FROM batch")
+            self.conn.executemany("INSERT INTO batch VALUES (?)", ((k,) for k in keys[first]))
+            seen = {k for (k,) in self.conn.execute("SELECT key FROM batch WHERE key IN (SELECT key FROM seen)")}
+            self.conn.execute("INSERT OR IGNORE INTO seen SELECT key FROM batch")
+        return first & ~keys.isin(seen).to_numpy()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,176 @@
+import argparse
+import json
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+import requests
+from tqdm import tqdm
+
+import metrics
+import storage
+from http_client import FetchClient, RateLimiter
+
+# Bước bổ sung (tùy chọn) sau khi crawl: tải trang chi tiết của từng job để lấy thêm
+# thành phố, cấp bậc, phúc lợi và mô tả công việc, rồi gộp vào bộ dữ liệu thô.
+#   - Cache HTTP trên đĩa (SQLite) theo khóa (jobId, approvedOn): chạy lại chỉ tải job mới hoặc
+#     job đã được duyệt lại (approvedOn thay đổi), tin không đổi lấy lại từ cache.
+#   - Tải song song bằng thread pool có giới hạn số request đang chờ, chung 1 token bucket.
+#   python enrich.py --workers 8 --rate 4
+#   python enrich.py --detail-url "http://127.0.0.1:8765/job-search/v1.0/job/{job_id}"   (mock_api.py)
+
+# URL chi tiết job, {job_id} được thay bằng jobId (đổi bằng --detail-url nếu API thay đổi)
+DETAIL_URL = "https://ms.vietnamworks.com/job-search/v1.0/job/{job_id}"
+DETAIL_CACHE_FILE = "vnworks_detail_cache.sqlite"
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 4.0
+
+# Các cột được thêm vào bộ dữ liệu
+DETAIL_COLUMNS = ["city", "jobLevel", "benefits", "description"]
+
+
+class DetailCache:
+    """Cache response chi tiết job: jobId -> (approvedOn, nội dung JSON)."""
+
+    def __init__(self, path: str = DETAIL_CACHE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS detail (job_id TEXT PRIMARY KEY, approved_on TEXT, body TEXT)")
+        self.conn.execute("CREATE TEMP TABLE wanted (job_id TEXT PRIMARY KEY, approved_on TEXT)")
+
+    def get_many(self, keys: pd.DataFrame) -> dict:
+        """Nội dung đã cache của các job (jobId, approvedOn) còn đúng phiên bản: jobId -> body."""
+        with self.conn:
+            self.conn.execute("DELETE FROM wanted")
+            self.conn.executemany("INSERT OR REPLACE INTO wanted VALUES (?, ?)",
+                                  zip(keys["jobId"].astype(str), keys["approvedOn"].astype(str)))
+            rows = self.conn.execute("SELECT d.job_id, d.body FROM detail d JOIN wanted w "
+                                     "ON d.job_id = w.job_id AND d.approved_on = w.approved_on")
+            return dict(rows.fetchall())
+
+    def put_many(self, items: list):
+        """items: danh sách (jobId, approvedOn, body). Bản cũ của cùng jobId bị thay thế."""
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO detail VALUES (?, ?, ?)", items)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def parse_detail(data: dict) -> dict:
+    """Lấy các cột DETAIL_COLUMNS từ response chi tiết của 1 job."""
+    job = data.get("data", {}) or {}
+    cities = [loc.get("cityName", "") for loc in job.get("workingLocations") or []]
+    benefits = [b.get("benefitName", "") for b in job.get("benefits") or []]
+    return {
+        "jobId": job.get("jobId"),
+        "city": ", ".join(dict.fromkeys(c for c in cities if c)),
+        "jobLevel": job.get("jobLevelVI") or job.get("jobLevel") or "",
+        "benefits": ", ".join(b for b in benefits if b),
+        "description": job.get("jobDescription", ""),
+    }
+
+
+def fetch_details(keys: list, client: FetchClient, detail_url: str = DETAIL_URL,
+                  max_workers: int = MAX_WORKERS, on_result=None) -> int:
+    """
+    Tải chi tiết các job keys = [(jobId, approvedOn), ...]. Chỉ giữ tối đa 2 * max_workers
+    request đang chờ (không tạo sẵn future cho hàng triệu job). Mỗi job tải xong gọi
+    on_result(jobId, approvedOn, body) ở thread chính. Trả về số job bị lỗi.
+    """
+    def fetch(job_id):
+        try:
+            return json.dumps(client.get_json(detail_url.format(job_id=job_id)), ensure_ascii=False)
+        except requests.RequestException as e:
+            print(f"❌ Bỏ qua chi tiết job {job_id}: {e}")
+            return None
+
+    failed = 0
+    todo = iter(keys)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor, \
+            tqdm(total=len(keys), desc="Đang tải chi tiết job") as pbar:
+        pending = {}
+        while True:
+            while len(pending) < 2 * max_workers:
+                key = next(todo, None)
+                if key is None:
+                    break
+                pending[executor.submit(fetch, key[0])] = key
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                (job_id, approved), body = pending.pop(future), future.result()
+                pbar.update(1)
+                if body is None:
+                    failed += 1
+                elif on_result is not None:
+                    on_result(job_id, approved, body)
+    return failed
+
+
+def enrich_dataset(name: str = storage.RAW_DATASET, detail_url: str = DETAIL_URL,
+                   max_workers: int = MAX_WORKERS, rate: float = REQUESTS_PER_SECOND,
+                   cache_path: str = DETAIL_CACHE_FILE) -> pd.DataFrame:
+    """Bổ sung DETAIL_COLUMNS cho bộ dữ liệu `name` (ghi đè lại file)."""
+    if not storage.exists(name):
+        print(f"❌ Không tìm thấy file {storage.path_for(name)}")
+        return None
+    start = time.time()
+    df = storage.read_table(name)
+    keys = df[["jobId", "approvedOn"]].dropna(subset=["jobId"]).drop_duplicates("jobId", keep="first")
+
+    with DetailCache(cache_path) as cache:
+        bodies = cache.get_many(keys)
+        missing = [(str(j), str(a)) for j, a in zip(keys["jobId"], keys["approvedOn"]) if str(j) not in bodies]
+        print(f"🔎 Chi tiết job: {len(bodies)} có sẵn trong cache, cần tải {len(missing)} job mới/thay đổi.")
+
+        batch = []
+
+        def on_result(job_id, approved, body):
+            bodies[job_id] = body
+            batch.append((job_id, approved, body))
+            # Ghi cache theo lô để không mất kết quả khi bị dừng giữa chừng
+            if len(batch) >= 500:
+                cache.put_many(batch)
+                batch.clear()
+
+        client = FetchClient(pool_size=max_workers, limiter=RateLimiter(rate, burst=max_workers))
+        try:
+            failed = fetch_details(missing, client, detail_url=detail_url, max_workers=max_workers,
+                                   on_result=on_result) if missing else 0
+        finally:
+            cache.put_many(batch)
+            client.close()
+
+    details = pd.DataFrame([parse_detail(json.loads(b)) for b in bodies.values()],
+                           columns=["jobId"] + DETAIL_COLUMNS)
+    details["jobId"] = pd.to_numeric(details["jobId"], errors="coerce").astype("Int64")
+    details = details.dropna(subset=["jobId"]).drop_duplicates("jobId")
+    # Chạy lại thì thay các cột chi tiết cũ bằng kết quả mới
+    df = df.drop(columns=DETAIL_COLUMNS, errors="ignore").merge(details, on="jobId", how="left")
+    output = storage.write_table(df, name)
+
+    # Chỉ tính các job có ít nhất 1 cột chi tiết khác rỗng (response rỗng vẫn cho city = "")
+    enriched = df[DETAIL_COLUMNS].fillna("").astype(str).ne("").any(axis=1).sum()
+    print(f"✅ Đã bổ sung chi tiết cho {enriched}/{len(df)} job vào {output}"
+          f"{f' ({failed} job lỗi, chạy lại để tải bù)' if failed else ''}.")
+    print(f"⏱ Thời gian thực hiện: {time.time() - start:.2f} giây.")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tải chi tiết job (thành phố, cấp bậc, phúc lợi, mô tả)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Số job tải song song")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="Số request tối đa mỗi giây")
+    parser.add_argument("--detail-url", default=DETAIL_URL, help="URL chi tiết job, chứa {job_id}")
+    args = parser.parse_args()
+    enrich_dataset(detail_url=args.detail_url, max_workers=args.workers, rate=args.rate)
+    metrics.save_run("enrich")
@@ -0,0 +1,296 @@
+import json
+import multiprocessing
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Client HTTP dùng chung cho cả lần crawl:
+#   - 1 Session có connection pool (keep-alive, không bắt tay TCP/TLS lại mỗi request)
+#   - Retry với exponential backoff + jitter, tôn trọng header Retry-After (429/503)
+#   - Circuit breaker: lỗi liên tiếp quá nhiều thì tạm ngắt, không dội request lên server
+#   - Thống kê latency và số lần retry của từng request (kèm metrics: mã trạng thái, số byte tải về)
+#   - Giải mã JSON thẳng từ bytes của response, dùng orjson nếu đã cài (nhanh hơn json chuẩn)
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/vnd.api+json",
+    # Giả lập trình duyệt, tránh lỗi 403 Forbidden
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}   # Các mã lỗi nên thử lại
+BACKOFF_BASE = 0.5                         # Giây, chờ lần đầu
+BACKOFF_MAX = 30.0                         # Giây, chờ tối đa giữa 2 lần thử
+RETRY_AFTER_MAX = 60.0                     # Giây, chờ tối đa theo Retry-After (server trả số quá lớn)
+BREAKER_THRESHOLD = 5                      # Số lỗi liên tiếp để ngắt mạch
+BREAKER_COOLDOWN = 30.0                    # Giây, thời gian ngắt mạch
+
+
+def json_loads(body: bytes):
+    """Giải mã JSON từ bytes (orjson nếu có, không thì json chuẩn)."""
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Mạch đang ngắt: bỏ qua request thay vì tiếp tục gọi lên server đang lỗi."""
+
+
+class RateLimiter:
+    """Token bucket: cho phép tối đa `rate` request/giây, dồn được tối đa `burst` request."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Chờ tới khi có token, dùng chung được giữa nhiều thread
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedRateLimiter:
+    """
+    Token bucket như RateLimiter nhưng trạng thái nằm trong shared memory, nên nhiều process
+    (vd scheduler.py) cùng chia 1 giới hạn `rate` request/giây chung.
+    Chỉ truyền được sang process con lúc khởi tạo (initargs của pool), không qua submit().
+    """
+
+    def __init__(self, rate: float, burst: int = 1, ctx=None):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.rate = rate
+        self.capacity = max(1, burst)
+        # [số token, thời điểm cập nhật]; time.time() vì cần cùng 1 đồng hồ giữa các process
+        self._state = ctx.Array("d", [float(self.capacity), time.time()])
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._state.get_lock():
+                now = time.time()
+                tokens = min(self.capacity, self._state[0] + (now - self._state[1]) * self.rate)
+                self._state[1] = now
+                if tokens >= 1:
+                    self._state[0] = tokens - 1
+                    return
+                self._state[0] = tokens
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Ngắt mạch sau `threshold` lỗi liên tiếp, mở lại (cho thử 1 request) sau `cooldown` giây.
+    Trong lúc request thử đó chưa có kết quả, các request khác vẫn bị chặn.
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return not self.probing
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # Half-open: cho 1 request đi thử, lỗi tiếp thì ngắt lại ngay
+                self.opened_at = None
+                self.probing = True
+                self.failures = self.threshold - 1
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                print(f"⚡ Ngắt mạch {self.cooldown:.0f}s sau {self.failures} lỗi liên tiếp.")
+
+
+def parse_retry_after(value) -> float:
+    """Đọc header Retry-After (số giây hoặc ngày giờ HTTP), trả về số giây cần chờ."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Exponential backoff kiểu 'full jitter': random trong [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class FetchClient:
+    """Client POST JSON dùng chung 1 Session cho toàn bộ lần crawl (an toàn khi gọi từ nhiều thread)."""
+
+    def __init__(self, pool_size: int = 10, limiter: RateLimiter = None, breaker: CircuitBreaker = None,
+                 timeout: float = 10, retry_after_max: float = RETRY_AFTER_MAX):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        self.limiter = limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout = timeout
+        self.retry_after_max = retry_after_max
+
+        # Thống kê
+        self.created = time.perf_counter()
+        self.stats_lock = threading.Lock()
+        self.latencies = []
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _record(self, latency: float, retries: int, failed: bool):
+        with self.stats_lock:
+            self.latencies.append(latency)
+            self.requests += 1
+            self.retries += retries
+            self.failures += int(failed)
+        if failed:
+            metrics.inc("http_failures_total")
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Gửi 1 lần (không retry), ghi metrics: mã trạng thái (error = lỗi mạng), latency, số byte."""
+        start = time.perf_counter()
+        status = "error"
+        try:
+            r = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            status = r.status_code
+            metrics.inc("http_response_bytes_total", len(r.content))
+            return r
+        finally:
+            metrics.observe("http_request_seconds", time.perf_counter() - start, method=method)
+            metrics.inc("http_requests_total", method=method, status=status)
+
+    def post_json(self, url: str, payload: dict, max_retries: int = 3, parse=json_loads) -> dict:
+        """
+        Gửi POST và trả về JSON. Ném requests.RequestException khi hết lượt thử
+        hoặc khi mạch đang ngắt. `parse` nhận bytes của response (mặc định json_loads), ném
+        ValueError nếu nội dung hỏng.
+        """
+        return self.request_json("POST", url, max_retries=max_retries, parse=parse, json=payload)
+
+    def get_json(self, url: str, max_retries: int = 3) -> dict:
+        """Gửi GET và trả về JSON, retry / ngắt mạch giống post_json."""
+        return self.request_json("GET", url, max_retries=max_retries)
+
+    def request_json(self, method: str, url: str, max_retries: int = 3, parse=json_loads, **kwargs) -> dict:
+        if max_retries < 1:
+            raise ValueError(f"max_retries phải >= 1 (nhận {max_retries})")
+        start = time.perf_counter()
+        last_error = None
+        for attempt in range(max_retries):
+            if not self.breaker.allow():
+                self._record(time.perf_counter() - start, attempt, True)
+                raise CircuitOpenError("Mạch đang ngắt do server lỗi liên tục")
+            if self.limiter is not None:
+                self.limiter.acquire()
+
+            wait = None
+            try:
+                r = self._send(method, url, **kwargs)
+                if r.status_code in RETRY_STATUS:
+                    wait = parse_retry_after(r.headers.get("Retry-After")) if r.status_code in (429, 503) else None
+                    raise requests.HTTPError(f"{r.status_code} Error for url: {url}", response=r)
+                r.raise_for_status()
+                try:
+                    data = parse(r.content)
+                except ValueError as e:
+                    # Response hỏng / bị cắt giữa chừng: thử lại như lỗi mạng
+                    raise requests.RequestException(f"JSON không hợp lệ từ {url}: {e}")
+            except requests.HTTPError as e:
+                # Lỗi 4xx khác 429 là lỗi của request, thử lại cũng vô ích
+                if e.response is not None and e.response.status_code not in RETRY_STATUS:
+                    self.breaker.record_failure()
+                    self._record(time.perf_counter() - start, attempt, True)
+                    raise
+                last_error = e
+            except requests.RequestException as e:
+                last_error = e
+            else:
+                self.breaker.record_success()
+                self._record(time.perf_counter() - start, attempt, False)
+                return data
+
+            self.breaker.record_failure()
+            if attempt + 1 < max_retries:
+                delay = min(wait, self.retry_after_max) if wait is not None else backoff_delay(attempt)
+                metrics.inc("http_retries_total")
+                print(f"Lỗi: {last_error}. Thử lại sau {delay:.1f}s ({attempt + 1}/{max_retries})...")
+                time.sleep(delay)
+
+        self._record(time.perf_counter() - start, max_retries - 1, True)
+        raise last_error
+
+    def summary(self) -> dict:
+        """Tổng hợp thống kê: số request, retry, lỗi, latency trung bình / p50 / p95 / max (giây)."""
+        with self.stats_lock:
+            lat = sorted(self.latencies)
+            n = len(lat)
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "breaker_trips": self.breaker.trips,
+                "requests_per_second": self.requests / max(time.perf_counter() - self.created, 1e-9),
+                "latency_avg": sum(lat) / n if n else 0.0,
+                "latency_p50": lat[n // 2] if n else 0.0,
+                "latency_p95": lat[min(n - 1, int(n * 0.95))] if n else 0.0,
+                "latency_max": lat[-1] if n else 0.0,
+            }
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
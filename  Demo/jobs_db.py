@@ -0,0 +1,234 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import storage
+
+# Lớp truy vấn SQLite cho Dashboard: clean_data ghi dữ liệu sạch vào 1 file SQLite có index, Dashboard
+# chỉ gửi câu SQL theo bộ lọc (công ty, khoảng ngày) và nhận về kết quả nhỏ, không giữ cả DataFrame
+# trong RAM cho mỗi phiên. Các bảng:
+#   - jobs:        mỗi dòng 1 job (row = số thứ tự dòng trong file dữ liệu sạch), index (companyName, approvedDay)
+#   - job_skills:  (row, skill), mỗi kỹ năng chỉ 1 lần trong 1 job
+#   - skill_pairs: (a, b, n) số job có cả 2 kỹ năng, tính sẵn lúc ghi cho Dashboard khi không lọc
+#   - cube_jobs / cube_skills / cube_levels: bảng tổng hợp theo (công ty, ngày) của cube.build_cube
+# Ngày lưu dạng chuỗi 'YYYY-MM-DD' nên so sánh khoảng ngày dùng được index.
+
+DB_FILE = "vnworks_jobs.sqlite"
+
+# Các cột của bảng jobs (cột nào không có trong dữ liệu thì bỏ qua)
+JOB_COLUMNS = ["jobId", "jobTitle", "companyName", "salary", "jobLevel_processed", "city",
+               "approvedOn", "skills", "jobUrl"]
+CUBE_TABLES = {"jobs": "cube_jobs", "skills": "cube_skills", "levels": "cube_levels"}
+INDEXES = [
+    "CREATE INDEX idx_jobs_company_day ON jobs (companyName, approvedDay)",
+    "CREATE INDEX idx_jobs_day ON jobs (approvedDay)",
+    "CREATE INDEX idx_job_skills_row ON job_skills (row)",
+    "CREATE INDEX idx_cube_jobs ON cube_jobs (companyName, day)",
+    "CREATE INDEX idx_cube_skills ON cube_skills (companyName, day)",
+    "CREATE INDEX idx_cube_levels ON cube_levels (companyName, day)",
+]
+
+
+def _day_strings(values) -> pd.Series:
+    day = pd.to_datetime(pd.Series(values), errors="coerce")
+    return day.dt.strftime("%Y-%m-%d").astype(object).where(day.notna(), None)
+
+
+class JobsDBWriter:
+    """
+    Ghi file SQLite theo từng phần (dùng được cho clean_data chạy theo chunk): append() mỗi phần
+    dữ liệu sạch, write_cube() 1 lần, close() mới tạo index và thay file cũ.
+    """
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        self.conn = sqlite3.connect(self.tmp_path)
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("CREATE TABLE job_skills (row INTEGER, skill TEXT)")
+        self.rows = 0
+        self._pairs = analytics.pair_counts(pd.DataFrame({"row": [], "skill": pd.Categorical([])}))
+
+    def append(self, df: pd.DataFrame, skills: pd.DataFrame = None):
+        """Thêm 1 phần dữ liệu sạch; số dòng (row) được đánh tiếp theo các phần trước."""
+        rows = np.arange(self.rows, self.rows + len(df))
+        jobs = pd.DataFrame({"row": rows})
+        for col in JOB_COLUMNS:
+            if col in df.columns:
+                values = df[col].to_numpy()
+                if col == "approvedOn":
+                    on = pd.to_datetime(df[col], errors="coerce")
+                    values = on.dt.strftime("%Y-%m-%d %H:%M:%S").astype(object).where(on.notna(), None)
+                jobs[col] = values
+        if "approvedOn" in df.columns:
+            jobs["approvedDay"] = _day_strings(df["approvedOn"]).to_numpy()
+        jobs.to_sql("jobs", self.conn, if_exists="append", index=False)
+
+        if skills is None and "skills_list" in df.columns:
+            skills = storage.explode_skills(df["skills_list"].reset_index(drop=True))
+        if skills is not None and not skills.empty:
+            pairs = pd.DataFrame({"row": skills["row"].to_numpy() + self.rows,
+                                  "skill": skills["skill"].astype(str).to_numpy()}).drop_duplicates()
+            pairs.to_sql("job_skills", self.conn, if_exists="append", index=False)
+            # Mỗi job chỉ nằm trong 1 phần nên số cặp của các phần cộng dồn được
+            pairs["skill"] = pairs["skill"].astype("category")
+            self._pairs = (pd.concat([self._pairs, analytics.pair_counts(pairs)])
+                           .groupby(["a", "b"], as_index=False)["n"].sum())
+        self.rows += len(df)
+
+    def write_cube(self, cube_data: dict):
+        for key, table in CUBE_TABLES.items():
+            data = cube_data[key].copy()
+            data["day"] = _day_strings(data["day"]).to_numpy()
+            data.to_sql(table, self.conn, if_exists="replace", index=False)
+
+    def close(self):
+        if self.rows == 0:
+            # Chưa có dòng nào: vẫn tạo bảng rỗng để truy vấn không lỗi
+            self.conn.execute("CREATE TABLE IF NOT EXISTS jobs (row INTEGER, companyName TEXT, "
+                              "approvedOn TEXT, approvedDay TEXT)")
+        self._pairs.to_sql("skill_pairs", self.conn, if_exists="replace", index=False)
+        for sql in INDEXES:
+            self.conn.execute(sql)
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+        self.conn.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.conn.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def build_db(df: pd.DataFrame, cube_data: dict, skills: pd.DataFrame = None, path: str = DB_FILE) -> str:
+    """Ghi cả bộ dữ liệu sạch + cube vào file SQLite một lần."""
+    with JobsDBWriter(path) as writer:
+        writer.append(df, skills)
+        writer.write_cube(cube_data)
+    print(f"🗄️ Đã ghi {writer.rows} job vào {path}.")
+    return path
+
+
+def is_fresh(path: str = DB_FILE) -> bool:
+    """File SQLite đã có, không cũ hơn file dữ liệu sạch và đủ các bảng (file cũ chưa có skill_pairs)."""
+    clean = storage.find_path(storage.CLEAN_DATASET)
+    if clean is None or not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(clean):
+        return False
+    with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as conn:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'skill_pairs'").fetchone() is not None
+
+
+def _where(companies=None, start=None, end=None, day_col: str = "day", prefix: str = ""):
+    """Điều kiện WHERE + tham số cho bộ lọc công ty + khoảng ngày (tính cả 2 đầu mút)."""
+    clauses, params = [], []
+    if companies:
+        clauses.append(f"{prefix}companyName IN ({', '.join('?' * len(companies))})")
+        params += list(companies)
+    if start is not None and end is not None:
+        clauses.append(f"{prefix}{day_col} BETWEEN ? AND ?")
+        params += [str(start), str(end)]
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class JobsDB:
+    """Truy vấn chỉ đọc. Mỗi thread (mỗi phiên Streamlit) dùng 1 kết nối riêng."""
+
+    def __init__(self, path: str = DB_FILE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if getattr(self._local, "conn", None) is None:
+            self._local.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        return self._local.conn
+
+    def query(self, sql: str, params=()) -> list:
+        return self.conn.execute(sql, params).fetchall()
+
+    def _counts(self, table: str, by: str, companies, start, end) -> pd.Series:
+        where, params = _where(companies, start, end)
+        rows = self.query(f"SELECT {by}, SUM(n) AS total FROM {table}{where} GROUP BY {by} "
+                          f"HAVING total > 0 ORDER BY total DESC, {by}", params)
+        return pd.Series([n for _, n in rows], index=[k for k, _ in rows], dtype="int64")
+
+    def companies(self) -> list:
+        return [c for (c,) in self.query("SELECT DISTINCT companyName FROM cube_jobs "
+                                         "WHERE companyName IS NOT NULL ORDER BY companyName")]
+
+    def date_range(self):
+        """(ngày nhỏ nhất, ngày lớn nhất) của dữ liệu, dạng date; (None, None) nếu không có."""
+        lo, hi = self.query("SELECT MIN(day), MAX(day) FROM cube_jobs")[0]
+        if lo is None:
+            return None, None
+        return pd.Timestamp(lo).date(), pd.Timestamp(hi).date()
+
+    def summarize(self, companies=None, start=None, end=None) -> dict:
+        """Cùng kết quả với cube.AggregateCube.summarize, nhưng tính bằng SQL trên các bảng cube_*."""
+        where, params = _where(companies, start, end)
+        total = self.query(f"SELECT COALESCE(SUM(n), 0) FROM cube_jobs{where}", params)[0][0]
+        day_where = where + (" AND " if where else " WHERE ") + "day IS NOT NULL"
+        daily = self.query(f"SELECT day, SUM(n) FROM cube_jobs{day_where} GROUP BY day ORDER BY day", params)
+        company_counts = self._counts("cube_jobs", "companyName", companies, start, end)
+        return {
+            "total_jobs": int(total),
+            "n_companies": len(company_counts),
+            "company_counts": company_counts,
+            "daily": pd.Series([n for _, n in daily], index=pd.DatetimeIndex([d for d, _ in daily], name="day"),
+                               dtype="int64", name="n"),
+            "skill_counts": self._counts("cube_skills", "skill", companies, start, end),
+            "level_counts": self._counts("cube_levels", "level", companies, start, end),
+        }
+
+    def top_pairs(self, companies=None, start=None, end=None, k: int = 10) -> pd.Series:
+        """
+        Top k cặp kỹ năng cùng xuất hiện trong 1 job. Không lọc thì đọc bảng skill_pairs tính sẵn;
+        có lọc thì SQL chỉ lấy các dòng (row, skill) theo bộ lọc, đếm cặp bằng analytics.skill_stats
+        như báo cáo PDF (không self-join job_skills trong SQL).
+        """
+        where, params = _where(companies, start, end, day_col="approvedDay", prefix="j.")
+        if not where:
+            rows = self.query("SELECT a, b, n FROM skill_pairs ORDER BY n DESC, a, b LIMIT ?", [k])
+            return pd.Series([n for _, _, n in rows], index=[f"{a} + {b}" for a, b, _ in rows], dtype="int64")
+        skills = pd.read_sql_query(f"SELECT s.row, s.skill FROM job_skills s JOIN jobs j ON j.row = s.row{where}",
+                                   self.conn, params=params)
+        skills["skill"] = skills["skill"].astype("category")
+        return analytics.skill_stats(skills, k_pairs=k)[1]
+
+    def columns(self) -> list:
+        return [r[1] for r in self.query("PRAGMA table_info(jobs)")]
+
+    def page(self, companies=None, start=None, end=None, page: int = 0, page_size: int = 50,
+             columns: list = None) -> pd.DataFrame:
+        """1 trang của bảng chi tiết (tin mới nhất trước)."""
+        where, params = _where(companies, start, end, day_col="approvedDay")
+        cols = ", ".join(columns or ["*"])
+        return pd.read_sql_query(f"SELECT {cols} FROM jobs{where} ORDER BY approvedOn DESC, row "
+                                 f"LIMIT ? OFFSET ?", self.conn, params=params + [page_size, page * page_size])
+
+    def rows(self, rows, columns: list = None) -> pd.DataFrame:
+        """Các job theo danh sách số thứ tự dòng (kết quả của search_index), giữ đúng thứ tự đã cho."""
+        rows = [int(r) for r in rows]
+        cols = ", ".join(columns or ["*"])
+        df = pd.read_sql_query(f"SELECT row AS _row, {cols} FROM jobs WHERE row IN ({', '.join('?' * len(rows))})",
+                               self.conn, params=rows)
+        return df.set_index("_row").reindex(rows).reset_index(drop=True)
@@ -0,0 +1,83 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Phân loại cấp bậc (Level) từ tiêu đề công việc, xử lý cả cột một lần.
+# Từ khóa (tiếng Việt + tiếng Anh) được bỏ dấu rồi ghép thành 1 regex duy nhất: mỗi cấp bậc là
+# 1 lookahead tùy chọn có nhóm bắt riêng, nên chỉ cần 1 lần str.extract là biết tiêu đề chứa
+# những cấp bậc nào, sau đó np.select chọn theo đúng thứ tự ưu tiên của LEVEL_RULES.
+# Regex chạy trên "tiêu đề chữ thường + xuống dòng + tiêu đề đã bỏ dấu": từ khóa thường khớp phần
+# bỏ dấu, từ khóa trong ACCENTED_KEYWORDS khớp nguyên dấu ở phần đầu.
+# Tiêu đề lặp lại rất nhiều giữa các tin nên kết quả được nhớ lại theo tiêu đề đã chuẩn hóa.
+
+# Thứ tự ưu tiên từ trên xuống: tiêu đề khớp nhiều cấp thì lấy cấp đứng trước
+LEVEL_RULES = [
+    ("Intern/Fresher", ["intern", "thực tập", "fresh"]),
+    ("Senior/Lead", ["senior", "trưởng", "lead", "chuyên gia"]),
+    ("Manager/Director", ["manager", "giám đốc", "head", "quản lý"]),
+]
+# Từ khóa bỏ dấu sẽ trùng với từ khác nghĩa ("trưởng" / "trường" -> "truong",
+# "chuyên gia" / "chuyển giao" -> "chuyen gia") nên phải khớp đúng dấu như categorize_level cũ
+ACCENTED_KEYWORDS = {"trưởng", "chuyên gia"}
+# Mặc định còn lại (kể cả tiêu đề trống) coi là Junior/Mid
+DEFAULT_LEVEL = "Junior/Mid-level"
+MAX_CACHE = 200_000
+
+
+def normalize(text: pd.Series) -> pd.Series:
+    """Chữ thường, dạng Unicode NFC (dấu dựng sẵn), gộp khoảng trắng."""
+    return text.str.lower().str.normalize("NFC").str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def fold_accents(text: pd.Series) -> pd.Series:
+    """Chữ thường, bỏ dấu tiếng Việt ("Thực tập" -> "thuc tap"), gộp khoảng trắng."""
+    s = text.str.lower().str.normalize("NFD").str.replace("[\u0300-\u036f]", "", regex=True)
+    return s.str.replace("đ", "d").str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+class LevelClassifier:
+    def __init__(self, rules=LEVEL_RULES, default: str = DEFAULT_LEVEL, max_cache: int = MAX_CACHE,
+                 accented=ACCENTED_KEYWORDS):
+        self.levels = [level for level, _ in rules]
+        self.default = default
+        self.max_cache = max_cache
+        self._cache = {}
+        groups = []
+        accented = set(normalize(pd.Series(list(accented), dtype="string")))
+        for i, (_, keywords) in enumerate(rules):
+            keywords = normalize(pd.Series(list(dict.fromkeys(keywords)), dtype="string"))
+            exact = keywords.isin(accented)
+            folded = pd.concat([keywords[exact], fold_accents(keywords[~exact])])
+            alternation = "|".join(re.escape(k) for k in folded.drop_duplicates())
+            groups.append(f"(?=.*?(?P<g{i}>{alternation}))?")
+        self.pattern = re.compile("^" + "".join(groups), re.DOTALL)
+
+    def _classify(self, titles: pd.Series) -> np.ndarray:
+        """Phân loại các tiêu đề (dạng "chữ thường\\nbỏ dấu", không trùng nhau)."""
+        found = titles.str.extract(self.pattern).notna().to_numpy()
+        return np.select([found[:, i] for i in range(len(self.levels))], self.levels, default=self.default)
+
+    def classify(self, titles: pd.Series) -> pd.Series:
+        """Cấp bậc cho từng tiêu đề, cùng index với `titles`."""
+        # Chỉ chuẩn hóa + phân loại các tiêu đề khác nhau rồi ánh xạ lại cho cả cột
+        codes, raw = pd.factorize(titles.fillna("").astype(str))
+        lower = normalize(pd.Series(raw, dtype="string"))
+        uniques = (lower + "\n" + fold_accents(lower)).fillna("").to_numpy(dtype=object)
+        levels = np.array([self._cache.get(t) for t in uniques], dtype=object)
+        todo = np.flatnonzero(pd.isna(levels))
+        if len(todo):
+            new = self._classify(pd.Series(uniques[todo], dtype="string"))
+            levels[todo] = new
+            if len(self._cache) + len(todo) > self.max_cache:
+                self._cache.clear()
+            self._cache.update(zip(uniques[todo], new))
+        return pd.Series(levels[codes], index=titles.index, dtype="str")
+
+
+# Bộ phân loại dùng chung (giữ cache giữa các lần gọi trong cùng tiến trình)
+CLASSIFIER = LevelClassifier()
+
+
+def classify_levels(titles: pd.Series) -> pd.Series:
+    return CLASSIFIER.classify(titles)
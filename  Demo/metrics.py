@@ -0,0 +1,251 @@
+import argparse
+import bisect
+import contextlib
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Đo đạc khi chạy (luôn bật): bộ đếm (counter), giá trị hiện tại (gauge), histogram latency và
+# bộ bấm giờ từng bước (stage timer) cho crawler, clean_data, Dashboard và tạo PDF.
+#   - Mỗi lần ghi chỉ là 1 phép cộng trong dict dưới 1 khóa, đủ rẻ để để bật thường xuyên.
+#   - Mỗi bước bấm giờ còn được lưu thành 1 "span" (tên, bước cha, thời điểm bắt đầu, số giây)
+#     để xem thời gian đi vào đâu trong 1 lần chạy (giữ tối đa MAX_SPANS span gần nhất).
+#   - Script chạy 1 lần (crawler, clean_data, export_report) ghi ra 1 file JSON cho mỗi lần chạy:
+#       vnworks_metrics/<tên>-<ngày giờ>.json
+#   - Dashboard (chạy lâu) mở endpoint dạng Prometheus khi có biến môi trường VNWORKS_METRICS_PORT:
+#       VNWORKS_METRICS_PORT=9100 streamlit run dashboard.py   ->   http://localhost:9100/metrics
+# Số liệu tính riêng cho từng process (process con của scheduler.py không gửi về process chính).
+#   python metrics.py                        (xem file metrics của lần chạy gần nhất)
+#   python metrics.py vnworks_metrics/crawl-20240501-101500.json --prometheus
+
+METRICS_DIR = "vnworks_metrics"
+PORT_ENV = "VNWORKS_METRICS_PORT"
+MAX_SPANS = 1000
+
+# Mốc (giây) của histogram: từ vài ms (1 request) tới vài phút (1 bước của pipeline)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# Tên metric -> (loại, mô tả). Chỉ các metric khai báo ở đây mới được ghi.
+METRICS = {
+    "http_requests_total": ("counter", "Số lần gửi request HTTP theo method và mã trạng thái (error = lỗi mạng)"),
+    "http_retries_total": ("counter", "Số lần thử lại request"),
+    "http_failures_total": ("counter", "Số request bỏ cuộc sau khi hết lượt thử hoặc do ngắt mạch"),
+    "http_response_bytes_total": ("counter", "Số byte response đã tải"),
+    "http_request_seconds": ("histogram", "Thời gian 1 lần gửi request (giây)"),
+    "http_requests_per_second": ("gauge", "Số request mỗi giây của client vừa đóng"),
+    "crawl_pages_total": ("counter", "Số trang API đã tải theo kết quả (ok / failed)"),
+    "rows_total": ("counter", "Số dòng đi qua từng bước"),
+    "dedup_ratio": ("gauge", "Tỷ lệ dòng bị bỏ do trùng ở lần làm sạch gần nhất"),
+    "stage_seconds": ("histogram", "Thời gian từng bước (giây)"),
+    "chart_render_seconds": ("histogram", "Thời gian vẽ 1 biểu đồ (giây)"),
+    "chart_cache_total": ("counter", "Số lần lấy ảnh biểu đồ theo kết quả cache (hit / miss)"),
+}
+
+
+def _key(name: str, labels: dict) -> tuple:
+    if name not in METRICS:
+        raise KeyError(f"Metric chưa khai báo trong metrics.METRICS: {name}")
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._values = {}  # (tên, nhãn) -> số (counter / gauge) hoặc [đếm từng mốc..., tổng, số lần]
+            self._spans = deque(maxlen=MAX_SPANS)
+            self.started = time.time()
+
+    # --- GHI ---
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        i = bisect.bisect_left(BUCKETS, value)  # mốc nhỏ nhất >= value (len(BUCKETS) = +Inf)
+        with self._lock:
+            hist = self._values.get(key)
+            if hist is None:
+                hist = self._values[key] = [0] * (len(BUCKETS) + 3)
+            hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    @contextlib.contextmanager
+    def timer(self, stage: str, metric: str = "stage_seconds", **labels):
+        """Bấm giờ 1 khối lệnh: ghi vào histogram `metric` (nhãn stage) và lưu 1 span."""
+        stack = self._local.__dict__.setdefault("stack", [])
+        parent = stack[-1] if stack else None
+        stack.append(stage)
+        start, wall = time.perf_counter(), time.time()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            if metric == "stage_seconds":
+                labels = {"stage": stage, **labels}
+            self.observe(metric, seconds, **labels)
+            with self._lock:
+                self._spans.append({"name": stage, "parent": parent, "start": round(wall - self.started, 6),
+                                    "seconds": round(seconds, 6)})
+
+    # --- ĐỌC / XUẤT ---
+    def snapshot(self) -> dict:
+        """Toàn bộ số liệu dạng dict (ghi được ra JSON)."""
+        with self._lock:
+            values, spans = dict(self._values), list(self._spans)
+        items = []
+        for (name, labels), value in sorted(values.items()):
+            item = {"name": name, "type": METRICS[name][0], "labels": dict(labels)}
+            if isinstance(value, list):
+                item.update({"buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], value[:-2])),
+                             "sum": value[-2], "count": value[-1]})
+            else:
+                item["value"] = value
+            items.append(item)
+        return {"started": self.started, "uptime": time.time() - self.started, "metrics": items, "spans": spans}
+
+    def value(self, name: str, **labels) -> float:
+        """Giá trị của 1 counter / gauge (histogram: số lần ghi), chưa có thì 0."""
+        with self._lock:
+            value = self._values.get(_key(name, labels), 0)
+        return value[-1] if isinstance(value, list) else value
+
+    def total(self, name: str) -> float:
+        """Tổng 1 counter trên mọi nhãn."""
+        with self._lock:
+            return sum(v for (n, _), v in self._values.items() if n == name and not isinstance(v, list))
+
+
+def _labels(labels: dict, extra: dict = None) -> str:
+    pairs = {**labels, **(extra or {})}
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in pairs.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(pairs, escaped)) + "}"
+
+
+def prometheus(snapshot: dict) -> str:
+    """Định dạng text của Prometheus (exposition format 0.0.4) cho 1 snapshot."""
+    lines, declared = [], set()
+    for item in snapshot["metrics"]:
+        name = f"vnworks_{item['name']}"
+        if name not in declared:
+            declared.add(name)
+            lines += [f"# HELP {name} {METRICS[item['name']][1]}", f"# TYPE {name} {item['type']}"]
+        if item["type"] != "histogram":
+            lines.append(f"{name}{_labels(item['labels'])} {item['value']}")
+            continue
+        cumulative = 0
+        for le, count in item["buckets"].items():
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(item['labels'], {'le': le})} {cumulative}")
+        lines.append(f"{name}_sum{_labels(item['labels'])} {item['sum']}")
+        lines.append(f"{name}_count{_labels(item['labels'])} {item['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def stage_summary(snapshot: dict) -> str:
+    """1 dòng tóm tắt thời gian các bước: "crawl.fetch 12.3s, crawl.compact 0.4s"."""
+    stages = [i for i in snapshot["metrics"] if i["name"] == "stage_seconds"]
+    return ", ".join(f"{i['labels']['stage']} {i['sum']:.2f}s" for i in stages)
+
+
+# Registry dùng chung cho toàn tiến trình
+REGISTRY = Registry()
+inc, set_gauge, observe, timer = REGISTRY.inc, REGISTRY.set_gauge, REGISTRY.observe, REGISTRY.timer
+
+
+def save_run(run: str, directory: str = METRICS_DIR, registry: Registry = REGISTRY) -> str:
+    """Ghi số liệu của lần chạy ra METRICS_DIR/<run>-<ngày giờ>.json, trả về đường dẫn file."""
+    snapshot = registry.snapshot()
+    snapshot["run"] = run
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{run}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=1)
+    print(f"📈 Metrics: {stage_summary(snapshot) or 'không có bước nào'} -> {path}")
+    return path
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = prometheus(self.registry.snapshot()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Mở endpoint /metrics (text Prometheus) trên thread nền, trả về server để đóng khi cần."""
+    handler = type("Handler", (_Handler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    print(f"📈 Metrics Prometheus tại http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def serve_from_env():
+    """Mở endpoint nếu có biến môi trường VNWORKS_METRICS_PORT, không thì None."""
+    port = os.environ.get(PORT_ENV)
+    return serve(int(port)) if port else None
+
+
+def latest_run(directory: str = METRICS_DIR):
+    files = glob.glob(os.path.join(directory, "*.json"))
+    return max(files, key=os.path.getmtime) if files else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Xem file metrics của 1 lần chạy")
+    parser.add_argument("path", nargs="?", help="File JSON trong vnworks_metrics/ (mặc định: lần chạy gần nhất)")
+    parser.add_argument("--prometheus", action="store_true", help="In dạng text Prometheus")
+    args = parser.parse_args()
+
+    path = args.path or latest_run()
+    if path is None:
+        print(f"ℹ️ Chưa có file metrics nào trong {METRICS_DIR}/. Chạy crawler.py hoặc clean_data.py trước.")
+    else:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if args.prometheus:
+            print(prometheus(snapshot), end="")
+        else:
+            print(f"📈 {path} ({snapshot.get('run', '?')}, {snapshot['uptime']:.1f} giây)")
+            for item in snapshot["metrics"]:
+                labels = _labels(item["labels"])
+                if item["type"] == "histogram":
+                    avg = item["sum"] / item["count"] if item["count"] else 0
+                    print(f"   {item['name']}{labels}: {item['count']} lần, tổng {item['sum']:.3f}s, "
+                          f"TB {avg * 1000:.1f}ms")
+                else:
+                    print(f"   {item['name']}{labels}: {item['value']:g}")
+            for span in snapshot["spans"][-20:]:
+                indent = "  " if span["parent"] else ""
+                print(f"   ⏱ {indent}{span['name']}: {span['seconds']:.3f}s (bắt đầu +{span['start']:.2f}s)")
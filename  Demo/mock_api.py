@@ -0,0 +1,205 @@
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Server giả lập API tìm kiếm của VietnamWorks (API_URL trong crawler.py)
+# để chạy thử / đo tốc độ crawler mà không cần gọi lên server thật.
+#   python mock_api.py --port 8765 --jobs 5000
+#   python mock_api.py --port 8765 --jobs 5000 --latency 0.2 --error-rate 0.05   (mạng chậm + lỗi)
+#   python crawler.py --api-url http://127.0.0.1:8765/job-search/v1.0/search
+#   python enrich.py --detail-url "http://127.0.0.1:8765/job-search/v1.0/job/{job_id}"
+
+SEARCH_PATH = "/job-search/v1.0/search"
+
+COMPANIES = ["FPT Software", "Viettel", "VNG", "Tiki", "MoMo", "Shopee", "NAB", "KMS Technology", "TMA", "Axon"]
+TITLES = ["Python Developer", "Senior Java Engineer", "Thực tập sinh IT", "IT Manager", "Frontend Developer",
+          "Tech Lead", "DevOps Engineer", "Fresher Tester", "Trưởng nhóm phát triển", "Data Engineer"]
+SKILLS = ["Python", "Java", "JavaScript", "ReactJS", "SQL", "AWS", "Docker", "Kubernetes", "Django", "Git",
+          "NodeJS", "Golang", "C#", ".NET", "Linux", "Spring Boot"]
+SALARIES = ["Thương lượng", "$1000-$2000", "Tới 30 triệu", "Từ $1500", "15-25 triệu"]
+DETAIL_PATH = "/job-search/v1.0/job/"
+CITIES = ["Hồ Chí Minh", "Hà Nội", "Đà Nẵng", "Cần Thơ"]
+LEVELS = ["Thực tập sinh/Sinh viên", "Mới tốt nghiệp", "Nhân viên", "Trưởng nhóm/Giám sát", "Quản lý"]
+BENEFITS = ["Laptop", "Bảo hiểm", "Du lịch", "Thưởng", "Đào tạo", "Chăm sóc sức khỏe"]
+# Mã ngành (jobFunction parentId) giả lập: 5 là CNTT như crawler, các mã khác chỉ để thử nhiều ngành
+JOB_FUNCTION_IDS = [5, 1, 2]
+
+
+def make_job(job_id: int) -> dict:
+    """Sinh 1 job giả với cấu trúc giống response thật (cố định theo job_id)."""
+    rnd = random.Random(job_id)
+    # jobId càng lớn thì tin càng mới (giống thực tế), mỗi tin cách nhau ~10 phút
+    approved = datetime(2024, 1, 1) + timedelta(minutes=job_id * 10 + rnd.randint(0, 9))
+    return {
+        "jobId": job_id,
+        "jobTitle": rnd.choice(TITLES),
+        "companyName": rnd.choice(COMPANIES),
+        "prettySalary": rnd.choice(SALARIES),
+        "skills": [{"skillName": s} for s in rnd.sample(SKILLS, rnd.randint(0, 5))],
+        "alias": f"job-{job_id}",
+        "approvedOn": approved.strftime("%Y-%m-%dT%H:%M:%S+07:00"),
+        "expiredOn": (approved + timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%S+07:00"),
+    }
+
+
+def make_detail(job_id: int) -> dict:
+    """Chi tiết 1 job giả (route DETAIL_PATH + jobId), cố định theo job_id."""
+    job = make_job(job_id)
+    rnd = random.Random(-job_id)
+    return {"data": {
+        "jobId": job_id,
+        "jobTitle": job["jobTitle"],
+        "approvedOn": job["approvedOn"],
+        "jobLevelVI": rnd.choice(LEVELS),
+        "workingLocations": [{"cityName": c} for c in rnd.sample(CITIES, rnd.randint(1, 2))],
+        "benefits": [{"benefitName": b} for b in rnd.sample(BENEFITS, rnd.randint(1, 3))],
+        "jobDescription": f"Mô tả công việc {job['jobTitle']} tại {job['companyName']}.",
+    }}
+
+
+def job_functions(job_id: int) -> set:
+    """Các ngành của 1 job: 1 ngành chính, cứ 4 job có 1 job thuộc thêm ngành kế tiếp."""
+    i = job_id % len(JOB_FUNCTION_IDS)
+    ids = {JOB_FUNCTION_IDS[i]}
+    if job_id % 4 == 0:
+        ids.add(JOB_FUNCTION_IDS[(i + 1) % len(JOB_FUNCTION_IDS)])
+    return ids
+
+
+def parse_function_filter(filters: list):
+    """Lấy parentId từ bộ lọc jobFunction của payload (None nếu không lọc theo ngành)."""
+    for f in filters or []:
+        if f.get("field") == "jobFunction":
+            return json.loads(f["value"])[0]["parentId"]
+    return None
+
+
+@lru_cache(maxsize=64)
+def matching_ids(total_jobs: int, parent_id=None, query: str = "") -> tuple:
+    """jobId (tăng dần) của các job khớp ngành + từ khóa (tiêu đề hoặc kỹ năng)."""
+    ids = range(1, total_jobs + 1)
+    if parent_id is not None:
+        ids = [i for i in ids if parent_id in job_functions(i)]
+    if query:
+        q = query.lower()
+        jobs = (make_job(i) for i in ids)
+        ids = [j["jobId"] for j in jobs
+               if q in j["jobTitle"].lower() or any(q == s["skillName"].lower() for s in j["skills"])]
+    return tuple(ids)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    # Các thuộc tính này được gán lại bởi make_server()
+    total_jobs = 1000
+    latency = 0.0       # Giây, độ trễ trung bình mỗi request (dao động ±50%)
+    error_rate = 0.0    # Tỷ lệ request trả về lỗi 503 (để thử retry / backoff)
+    fail_pages = set()  # Các trang luôn trả về lỗi 503 (để thử crawl dở dang + --resume)
+    throttle = 0        # Số request đầu tiên bị trả về 429 kèm header Retry-After
+    retry_after = 1     # Giá trị header Retry-After (giây) của các response 429
+    lock = threading.Lock()
+
+    def simulate_network(self) -> bool:
+        """Giả lập độ trễ + lỗi ngẫu nhiên. Trả về False nếu request này bị trả lỗi."""
+        if self.latency > 0:
+            time.sleep(self.latency * random.uniform(0.5, 1.5))
+        with self.lock:
+            throttled = self.throttle > 0
+            if throttled:
+                type(self).throttle -= 1
+        if throttled:
+            self.send_response(429)
+            self.send_header("Retry-After", str(self.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return False
+        if self.error_rate > 0 and random.random() < self.error_rate:
+            self.send_error(503)
+            return False
+        return True
+
+    def do_POST(self):
+        if self.path != SEARCH_PATH:
+            self.send_error(404)
+            return
+        if not self.simulate_network():
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        page = int(payload.get("page", 0))
+        hits = int(payload.get("hitsPerPage", 50))
+        if page in self.fail_pages:
+            self.send_error(503)
+            return
+
+        ids = matching_ids(self.total_jobs, parse_function_filter(payload.get("filter")),
+                           payload.get("query", "").strip())
+        # Sắp xếp theo ngày duyệt giảm dần = jobId giảm dần
+        if any(o.get("field") == "approvedOn" and o.get("value") == "desc" for o in payload.get("order", [])):
+            ids = ids[::-1]
+        nb_pages = (len(ids) + hits - 1) // hits
+        data = [make_job(i) for i in ids[page * hits:(page + 1) * hits]]
+        self.send_json({"meta": {"nbHits": len(ids), "nbPages": nb_pages, "page": page}, "data": data})
+
+    def do_GET(self):
+        job_id = self.path[len(DETAIL_PATH):] if self.path.startswith(DETAIL_PATH) else ""
+        if not job_id.isdigit() or not 1 <= int(job_id) <= self.total_jobs:
+            self.send_error(404)
+            return
+        if not self.simulate_network():
+            return
+        self.send_json(make_detail(int(job_id)))
+
+    def send_json(self, obj: dict):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Tắt log mỗi request cho đỡ rối màn hình
+        pass
+
+
+def make_server(port: int = 0, total_jobs: int = 1000, latency: float = 0.0, error_rate: float = 0.0,
+                fail_pages=(), throttle: int = 0, retry_after: float = 1) -> ThreadingHTTPServer:
+    """
+    Tạo server giả lập (port=0 để hệ điều hành tự chọn port trống).
+    Đổi hành vi khi đang chạy qua server.RequestHandlerClass (vd gán fail_pages = set()).
+    """
+    handler = type("Handler", (MockHandler,), {"total_jobs": total_jobs, "latency": latency,
+                                               "error_rate": error_rate, "fail_pages": set(fail_pages),
+                                               "throttle": throttle, "retry_after": retry_after,
+                                               "lock": threading.Lock()})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def start_server(port: int = 0, total_jobs: int = 1000, latency: float = 0.0, error_rate: float = 0.0,
+                 fail_pages=(), throttle: int = 0, retry_after: float = 1):
+    """Chạy server ở thread nền, trả về (server, api_url). Gọi server.shutdown() để dừng."""
+    server = make_server(port, total_jobs, latency, error_rate, fail_pages, throttle, retry_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, real_port = server.server_address[:2]
+    return server, f"http://{host}:{real_port}{SEARCH_PATH}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server giả lập API VietnamWorks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--jobs", type=int, default=1000, help="Tổng số job giả lập")
+    parser.add_argument("--latency", type=float, default=0.0, help="Độ trễ trung bình mỗi request (giây)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Tỷ lệ request trả về lỗi 503 (0-1)")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.jobs, args.latency, args.error_rate)
+    print(f"🧪 Mock API đang chạy tại http://127.0.0.1:{args.port}{SEARCH_PATH} ({args.jobs} jobs)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import chart_cache
+import metrics
+
+# Hàng đợi tạo báo cáo PDF chạy nền cho Dashboard: bấm nút chỉ gửi yêu cầu và nhận mã job,
+# phiên Streamlit không bị chặn trong lúc tạo PDF, trang tự cập nhật tiến độ.
+#   - PDF đã tạo được lưu trên đĩa theo khóa nội dung = hash(phiên bản dữ liệu + bộ lọc):
+#     nhiều người yêu cầu cùng 1 báo cáo thì nhận ngay file có sẵn, không tạo lại.
+#   - Yêu cầu trùng với 1 job đang chạy dùng chung job đó.
+#   - Số job chạy cùng lúc bị giới hạn (MAX_WORKERS), các yêu cầu còn lại xếp hàng.
+
+REPORT_CACHE_DIR = "report_cache"
+MAX_WORKERS = 2        # Số báo cáo tạo cùng lúc
+MAX_REPORTS = 50       # Số file PDF giữ lại trong cache (xóa file ít dùng nhất)
+JOB_TTL = 3600         # Giây giữ thông tin job đã xong trong bộ nhớ
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def report_key(version: str, filters: dict) -> str:
+    return chart_cache.make_key("report", version, filters or {})
+
+
+class ReportJob:
+    def __init__(self, key: str, version: str, filters: dict):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.version = version
+        self.filters = filters
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Đang chờ tới lượt..."
+        self.error = None
+        self.path = None
+        self.finished = None
+
+    @property
+    def pending(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+
+class ReportQueue:
+    def __init__(self, cache_dir: str = REPORT_CACHE_DIR, max_workers: int = MAX_WORKERS,
+                 max_reports: int = MAX_REPORTS):
+        self.cache_dir = cache_dir
+        self.max_reports = max_reports
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self._jobs = {}
+        self._running = {}  # khóa báo cáo -> job đang chờ / đang chạy
+        self._lock = threading.Lock()
+
+    def cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def submit(self, filters: dict = None, version: str = None) -> str:
+        """Gửi yêu cầu tạo báo cáo, trả về mã job (báo cáo có sẵn trong cache thì job xong ngay)."""
+        filters = filters or {}
+        version = version or chart_cache.dataset_version()
+        key = report_key(version, filters)
+        with self._lock:
+            self._prune()
+            if key in self._running:
+                return self._running[key].id
+            job = ReportJob(key, version, filters)
+            self._jobs[job.id] = job
+            path = self.cache_path(key)
+            if os.path.exists(path):
+                os.utime(path)  # đánh dấu vừa dùng (xóa theo kiểu LRU)
+                self._finish(job, path, "Đã có sẵn trong cache.")
+                return job.id
+            self._running[key] = job
+        self._executor.submit(self._run, job)
+        return job.id
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def result(self, job_id: str):
+        """Nội dung PDF (bytes) của job đã xong, None nếu chưa xong / lỗi / file đã bị xóa."""
+        job = self.get(job_id)
+        if job is None or job.status != DONE or not os.path.exists(job.path):
+            return None
+        with open(job.path, "rb") as f:
+            return f.read()
+
+    def _run(self, job: ReportJob):
+        # Import khi chạy job đầu tiên: ReportLab không nạp lúc mở Dashboard
+        from export_report import create_pdf
+
+        def progress(fraction, message):
+            job.progress, job.message = fraction, message
+
+        job.status = RUNNING
+        try:
+            with metrics.timer("report"):
+                pdf = create_pdf(filters=job.filters, version=job.version, progress=progress)
+            if pdf is None:
+                raise RuntimeError("Không tìm thấy dữ liệu sạch để tạo báo cáo.")
+            path = self._store(job.key, pdf)
+            with self._lock:
+                self._finish(job, path, "Đã tạo xong báo cáo.")
+        except Exception as e:
+            traceback.print_exc()
+            with self._lock:
+                job.status, job.error, job.message = FAILED, str(e), "Có lỗi khi tạo file PDF."
+                job.finished = time.time()
+        finally:
+            with self._lock:
+                self._running.pop(job.key, None)
+
+    def _finish(self, job: ReportJob, path: str, message: str):
+        job.status, job.progress, job.message, job.path = DONE, 1.0, message, path
+        job.finished = time.time()
+
+    def _store(self, key: str, pdf: bytes) -> str:
+        """Ghi PDF vào cache (ghi file tạm rồi đổi tên để không ai đọc phải file ghi dở)."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.cache_path(key)
+        tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp, path)
+
+        files = sorted((os.path.join(self.cache_dir, n) for n in os.listdir(self.cache_dir) if n.endswith(".pdf")),
+                       key=os.path.getmtime)
+        for old in files[:max(0, len(files) - self.max_reports)]:
+            os.remove(old)
+        return path
+
+    def _prune(self):
+        now = time.time()
+        for job_id in [j.id for j in self._jobs.values() if j.finished and now - j.finished > JOB_TTL]:
+            del self._jobs[job_id]
+
+
+# Hàng đợi dùng chung cho mọi phiên Dashboard trong tiến trình
+REPORT_QUEUE = ReportQueue()
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# Chuẩn hóa cột lương dạng chữ (prettySalary) thành số, xử lý cả cột bằng str.extract/str.contains
+# thay vì chạy regex từng dòng trong Python. Các dạng được hỗ trợ:
+#   "$1000-$2000", "15-25 triệu", "15 - 25tr", "10.000.000 - 20.000.000 VND"   -> khoảng lương
+#   "Tới 30 triệu", "Up to $2,000", "Lên đến 2000 USD"                          -> chỉ có mức trên
+#   "Từ $1500", "Trên 20 triệu", "From 1,500 USD"                               -> chỉ có mức dưới
+#   "Thương lượng", "Negotiable", "Cạnh tranh"                                   -> không có số (NaN)
+#   "Lương tháng 13", "2 năm kinh nghiệm"                 -> số nhỏ không đơn vị, không phải lương (NaN)
+# Kết quả: salary_min, salary_max (theo đơn vị tiền gốc), currency (USD/VND), salary_vnd_mid.
+
+# Tỷ giá quy đổi USD -> VND cho cột salary_vnd_mid
+USD_TO_VND = 25_000
+
+SALARY_COLUMNS = ["salary_min", "salary_max", "currency", "salary_vnd_mid"]
+
+NUMBER = r"(\d+(?:\.\d+)?)"
+RANGE_PATTERN = NUMBER + r"[^\d]{0,15}?(?:-|–|~|đến|to)[^\d]{0,5}?" + NUMBER
+UP_TO_PATTERN = r"tới|đến|up to|upto|dưới|under|max|<"
+FROM_PATTERN = r"từ|from|trên|over|above|min|>"
+USD_PATTERN = r"\$|usd"
+VND_PATTERN = r"vnd|vnđ|đồng|₫"
+# Chuỗi chỉ có số (vd "20", "15 - 25"): coi là lương dù không ghi đơn vị
+BARE_PATTERN = r"^[\d.\s\-–~]+$"
+# Đơn vị nhân, xét theo thứ tự (tỷ trước triệu trước nghìn)
+UNIT_PATTERNS = [
+    (r"tỷ|billion", 1e9),
+    (r"triệu|million|(?<![a-z])tr\b|\dm\b|\d m\b", 1e6),
+    (r"nghìn|ngàn|\dk\b|\d k\b", 1e3),
+]
+# Lương VND không ghi đơn vị mà số nhỏ (vd "15 - 25") thì hiểu là triệu, nhưng chỉ khi chuỗi
+# chỉ có số hoặc có dấu hiệu là lương (tiền tệ, đơn vị, "từ" / "tới" / "up to"...)
+VND_MILLION_THRESHOLD = 1000
+
+
+def _normalize(text: pd.Series) -> pd.Series:
+    s = text.str.lower().str.strip()
+    # Bỏ dấu phân cách hàng nghìn ("1,000" / "10.000.000"), dấu phẩy còn lại là phần thập phân ("1,5 triệu")
+    s = s.str.replace(r"(?<=\d)[.,](?=\d{3}(?!\d))", "", regex=True)
+    return s.str.replace(r"(?<=\d),(?=\d)", ".", regex=True)
+
+
+def _parse_unique(text: pd.Series) -> pd.DataFrame:
+    s = _normalize(text)
+    rng = s.str.extract(RANGE_PATTERN).astype(float)
+    single = s.str.extract(NUMBER, expand=False).astype(float)
+
+    has_range = rng[0].notna().to_numpy()
+    up_to_word = s.str.contains(UP_TO_PATTERN, regex=True).to_numpy()
+    from_word = s.str.contains(FROM_PATTERN, regex=True).to_numpy()
+    up_to = up_to_word & ~has_range
+    from_ = from_word & ~has_range & ~up_to
+    lo = np.select([has_range, up_to], [rng[0].to_numpy(), np.nan], default=single.to_numpy())
+    hi = np.select([has_range, from_], [rng[1].to_numpy(), np.nan], default=single.to_numpy())
+
+    has_number = single.notna().to_numpy()
+    usd = s.str.contains(USD_PATTERN, regex=True).to_numpy()
+    unit = np.select([s.str.contains(p, regex=True).to_numpy() for p, _ in UNIT_PATTERNS],
+                     [m for _, m in UNIT_PATTERNS], default=1.0)
+    top = np.fmax(lo, hi)
+    implicit = ~usd & (unit == 1.0) & (top < VND_MILLION_THRESHOLD)
+    cue = (usd | (unit != 1.0) | up_to_word | from_word | s.str.contains(VND_PATTERN, regex=True).to_numpy()
+           | s.str.contains(BARE_PATTERN, regex=True).to_numpy())
+    # Số nhỏ không đơn vị và không có dấu hiệu lương ("Lương tháng 13") thì bỏ
+    has_number = has_number & ~(implicit & ~cue)
+    unit = np.where(implicit, 1e6, unit)
+    lo = np.where(has_number, lo * unit, np.nan)
+    hi = np.where(has_number, hi * unit, np.nan)
+
+    mid = np.where(np.isnan(lo), hi, np.where(np.isnan(hi), lo, (lo + hi) / 2))
+    return pd.DataFrame({
+        "salary_min": lo,
+        "salary_max": hi,
+        "currency": pd.Series(np.where(usd, "USD", "VND"), dtype="string").where(has_number),
+        "salary_vnd_mid": mid * np.where(usd, USD_TO_VND, 1.0),
+    })
+
+
+def parse_salary(salary: pd.Series) -> pd.DataFrame:
+    """Tách cột lương dạng chữ thành các cột SALARY_COLUMNS (cùng index với `salary`)."""
+    # Chuỗi lương lặp lại rất nhiều giữa các tin: chỉ parse các giá trị khác nhau rồi ánh xạ lại
+    codes, uniques = pd.factorize(salary.fillna("").astype(str))
+    parsed = _parse_unique(pd.Series(uniques, dtype="string"))
+    result = parsed.take(codes)
+    result.index = salary.index
+    return result
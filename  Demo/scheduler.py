@@ -0,0 +1,197 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+from tqdm import tqdm
+
+import metrics
+import snapshots
+import storage
+from crawler import API_URL, IT_FILTER, fetch_page, read_page, save_seen_index
+from http_client import FetchClient, SharedRateLimiter
+
+# Crawl nhiều ngành / nhiều bộ lọc cùng lúc thay vì chạy crawler.py lần lượt cho từng ngành:
+#   - Mỗi ngành (category) là 1 bộ lọc + từ khóa. Công việc được chia thành các shard (ngành, trang):
+#     trang 0 của mọi ngành chạy trước để biết số trang, sau đó các trang còn lại được đưa vào hàng đợi.
+#   - Các shard chạy trên nhiều process (tải + parse JSON song song), chung 1 giới hạn tốc độ toàn cục.
+#   - Kết quả ghi riêng cho từng ngành (vnworks_it_jobs_<mã ngành>, đủ mọi job của ngành, đúng thứ tự
+#     trang dù các trang tải xong không theo thứ tự), rồi gộp thành vnworks_it_jobs (có thêm cột category)
+#     để clean_data.py chạy tiếp như bình thường.
+#   - Job thuộc nhiều ngành chỉ giữ 1 lần khi gộp, theo thứ tự cố định (ngành như trong cấu hình, rồi
+#     theo trang): job luôn thuộc ngành đứng trước, không phụ thuộc shard nào tải xong trước.
+#   python scheduler.py --categories categories.json --processes 4 --rate 8
+#   python scheduler.py --query python --query java
+
+PROCESSES = 4               # Số process tải song song
+REQUESTS_PER_SECOND = 4.0   # Giới hạn tốc độ chung cho mọi process
+
+# Ngành mặc định. File --categories có dạng {"tên": {"filter": [...], "query": "...", "id": "..."}}
+# ("id" không bắt buộc: mã ngành dùng đặt tên file, chỉ gồm a-z, 0-9, _)
+CATEGORIES = {"it": {"filter": IT_FILTER, "query": "", "id": "it"}}
+ID_PATTERN = re.compile(r"^[0-9a-z_]+$")
+
+
+def category_id(name: str, cfg: dict = None) -> str:
+    """
+    Mã ngành: "id" trong cấu hình, không có thì tạo từ tên (phần chữ dễ đọc + hash của tên đầy đủ),
+    nên 2 tên khác nhau như "C++" và "C#" không bao giờ trùng mã.
+    """
+    if cfg and cfg.get("id"):
+        return cfg["id"]
+    slug = re.sub(r"[^0-9a-z]+", "_", name.lower()).strip("_")
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return f"{slug}_{digest}" if slug else digest
+
+
+def category_dataset(name: str, cfg: dict = None) -> str:
+    """Tên bộ dữ liệu thô của 1 ngành (theo mã ngành)."""
+    return f"{storage.RAW_DATASET}_{category_id(name, cfg)}"
+
+
+def check_categories(categories: dict) -> dict:
+    """Mã ngành phải hợp lệ và không trùng nhau (2 ngành không được ghi chung 1 file)."""
+    owners = {}
+    for name, cfg in categories.items():
+        cid = category_id(name, cfg)
+        if not ID_PATTERN.match(cid):
+            raise ValueError(f"Mã ngành không hợp lệ cho '{name}': {cid!r} (chỉ gồm a-z, 0-9, _)")
+        if cid in owners:
+            raise ValueError(f"Ngành '{owners[cid]}' và '{name}' trùng mã '{cid}'")
+        owners[cid] = name
+    return categories
+
+
+def load_categories(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        categories = json.load(f)
+    return {name: {"filter": cfg.get("filter", []), "query": cfg.get("query", ""), "id": cfg.get("id")}
+            for name, cfg in categories.items()}
+
+
+# --- PHẦN CHẠY TRONG PROCESS CON ---
+_client = None
+_api_url = API_URL
+
+
+def _init_worker(limiter: SharedRateLimiter, api_url: str):
+    global _client, _api_url
+    _client = FetchClient(pool_size=2, limiter=limiter)
+    _api_url = api_url
+
+
+def fetch_shard(category: dict, page: int):
+    """Tải + giải mã 1 shard. Trả về (nbPages, DataFrame các job), lỗi thì (None, None)."""
+    data = fetch_page(page, api_url=_api_url, client=_client,
+                      filters=category["filter"], query=category["query"], parse=read_page)
+    return data if data is not None else (None, None)
+
+
+# --- PHẦN ĐIỀU PHỐI (PROCESS CHÍNH) ---
+def crawl_categories(categories: dict = CATEGORIES, processes: int = PROCESSES,
+                     rate: float = REQUESTS_PER_SECOND, api_url: str = API_URL) -> pd.DataFrame:
+    check_categories(categories)
+    print(f"🚀 Bắt đầu crawl {len(categories)} ngành với {processes} process...")
+    start = time.time()
+    ctx = multiprocessing.get_context("spawn")
+    limiter = SharedRateLimiter(rate, burst=processes, ctx=ctx)
+
+    stats = {name: {"pages": 0, "jobs": 0, "duplicates": 0, "failed": []} for name in categories}
+    writers = {name: storage.TableWriter(category_dataset(name, cfg), schema=storage.CATEGORY_SCHEMA)
+               for name, cfg in categories.items()}
+    # Trang tải xong trước lượt được giữ lại, ghi theo đúng thứ tự trang của từng ngành
+    next_page = {name: 0 for name in categories}
+    ready = {name: {} for name in categories}
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, processes), mp_context=ctx,
+                                 initializer=_init_worker, initargs=(limiter, api_url)) as pool, \
+                tqdm(total=len(categories), desc="Đang crawl dữ liệu") as pbar:
+            pending = {pool.submit(fetch_shard, cfg, 0): (name, 0) for name, cfg in categories.items()}
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name, page = pending.pop(future)
+                        nb_pages, jobs = future.result()
+                        pbar.update(1)
+                        # Metrics của process con không gửi về đây: đếm trang / dòng ở process chính
+                        metrics.inc("crawl_pages_total", result="ok" if jobs is not None else "failed")
+                        if jobs is None:
+                            stats[name]["failed"].append(page)
+                        else:
+                            stats[name]["pages"] += 1
+                        # Trang 0 cho biết số trang: đưa các shard còn lại của ngành vào hàng đợi
+                        if page == 0 and jobs is not None and nb_pages > 1:
+                            pbar.total += nb_pages - 1
+                            pbar.refresh()
+                            for p in range(1, nb_pages):
+                                pending[pool.submit(fetch_shard, categories[name], p)] = (name, p)
+                        # Chỉ process chính ghi dữ liệu nên không cần khóa
+                        ready[name][page] = jobs
+                        while next_page[name] in ready[name]:
+                            jobs = ready[name].pop(next_page[name])
+                            next_page[name] += 1
+                            if jobs is not None and len(jobs):
+                                writers[name].write(jobs.assign(category=name))
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                print("\n⛔ Đã dừng crawl nhiều ngành.")
+                raise
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+    for writer in writers.values():
+        writer.close()
+
+    metrics.observe("stage_seconds", time.time() - start, stage="scheduler.fetch")
+
+    # Gộp các ngành thành 1 bộ dữ liệu thô theo thứ tự cố định (ngành, trang), job trùng jobId
+    # chỉ giữ lần đầu tiên
+    with metrics.timer("scheduler.merge"):
+        seen_ids = set()
+        with storage.TableWriter(storage.RAW_DATASET, schema=storage.CATEGORY_SCHEMA) as merged:
+            for name, cfg in categories.items():
+                for chunk in storage.iter_table(category_dataset(name, cfg)):
+                    ids = chunk["jobId"]
+                    fresh = chunk[~ids.isin(seen_ids) & ~(ids.duplicated() & ids.notna())]
+                    seen_ids.update(fresh["jobId"].dropna().tolist())
+                    merged.write(fresh)
+                    stats[name]["jobs"] += len(fresh)
+                    stats[name]["duplicates"] += len(chunk) - len(fresh)
+        save_seen_index(storage.read_table(storage.RAW_DATASET, columns=["jobId", "approvedOn"]))
+
+    for name, st in stats.items():
+        failed = f", {len(st['failed'])} trang lỗi {sorted(st['failed'])[:10]}" if st["failed"] else ""
+        print(f"   📂 {name}: {st['jobs']} jobs từ {st['pages']} trang "
+              f"({st['duplicates']} job trùng ngành khác){failed}")
+    df = storage.read_table(storage.RAW_DATASET)
+    metrics.inc("rows_total", len(df), stage="crawl")
+    metrics.inc("rows_total", sum(st["duplicates"] for st in stats.values()), stage="crawl_duplicates")
+    with metrics.timer("crawl.snapshot"):
+        snapshots.land_crawl(df)
+    print(f"\n✅ Đã crawl {len(df)} jobs từ {len(categories)} ngành vào file {merged.path}.")
+    print(f"⏱ Thời gian thực hiện: {time.time() - start:.2f} giây.")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl nhiều ngành VietnamWorks song song trên nhiều process")
+    parser.add_argument("--categories", help="File JSON {tên: {filter, query}} (mặc định: ngành CNTT)")
+    parser.add_argument("--query", action="append", default=[],
+                        help="Thêm 1 ngành theo từ khóa tìm kiếm trên toàn bộ tin (dùng nhiều lần được)")
+    parser.add_argument("--processes", type=int, default=PROCESSES, help="Số process tải song song")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND,
+                        help="Số request tối đa mỗi giây (chung cho mọi process)")
+    parser.add_argument("--api-url", default=API_URL, help="URL API (dùng mock_api.py để chạy thử offline)")
+    args = parser.parse_args()
+
+    categories = load_categories(args.categories) if args.categories else {}
+    for q in args.query:
+        categories[q] = {"filter": [], "query": q}
+    crawl_categories(categories or CATEGORIES, processes=args.processes, rate=args.rate, api_url=args.api_url)
+    metrics.save_run("scheduler")
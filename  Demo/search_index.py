@@ -0,0 +1,209 @@
+import argparse
+import contextlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+import jobs_db
+from level_classifier import fold_accents
+
+# Chỉ mục đảo (inverted index) cho ô tìm kiếm của Dashboard: dựng 1 lần cho mỗi phiên bản dữ liệu
+# (clean_data dựng sau khi ghi file SQLite, Dashboard tự dựng lại nếu file chỉ mục cũ hơn).
+#   - Từ khóa: tiêu đề, tên công ty và kỹ năng được bỏ dấu ("Lập trình" -> "lap trinh") rồi tách từ,
+#     giữ nguyên các ký tự của tên công nghệ (c#, c++, node.js).
+#   - Kỹ năng: mỗi mục trong skills_list là 1 khóa riêng (khớp đúng cả tên kỹ năng).
+#   - Mỗi khóa trỏ tới danh sách row (số thứ tự dòng trong jobs_db) đã sắp xếp, lưu kiểu CSR:
+#     vocab đã sắp xếp + offsets + rows, nên tìm theo tiền tố chỉ là 1 khoảng liên tiếp trong vocab.
+#   - Kết quả là bitmap (mảng bool, 1 phần tử / job): AND / OR giữa các từ khóa và với bộ lọc
+#     công ty + khoảng ngày chỉ là phép & / | trên numpy, vài ms cho hàng trăm nghìn job.
+# Cú pháp tìm kiếm: các từ cách nhau bằng khoảng trắng là AND, "OR" (hoặc "|") ngăn các nhóm,
+# từ kết thúc bằng "*" là tìm theo tiền tố. Ví dụ: "senior java*" , "python OR golang".
+#   python search_index.py                 (dựng lại chỉ mục từ vnworks_jobs.sqlite)
+#   python search_index.py "react* OR vue"  (thử 1 câu tìm kiếm)
+
+SEARCH_INDEX_FILE = "vnworks_search_index.npz"
+
+# Từ sau khi bỏ dấu: chữ/số và + # (c++, c#), dấu chấm chỉ giữ khi nằm giữa từ (node.js, asp.net)
+TOKEN_PATTERN = r"[0-9a-z+#]+(?:\.[0-9a-z+#]+)*"
+OR_WORDS = {"or", "|"}
+
+
+def tokenize(text: pd.Series) -> pd.Series:
+    """Danh sách từ (đã bỏ dấu, chữ thường) của từng chuỗi."""
+    return fold_accents(text.fillna("").astype("string")).str.findall(TOKEN_PATTERN)
+
+
+def _pairs(values: pd.Series, rows: np.ndarray, whole: bool = False) -> pd.DataFrame:
+    """Các cặp (token, row). Chỉ tách từ các giá trị khác nhau rồi ánh xạ lại cho từng dòng."""
+    codes, uniques = pd.factorize(values.fillna("").astype(str))
+    uniques = pd.Series(uniques, dtype="string")
+    tokens = fold_accents(uniques).map(lambda t: [t] if t else []) if whole else tokenize(uniques)
+    exploded = tokens.explode().dropna()
+    table = pd.DataFrame({"code": exploded.index.to_numpy(), "token": exploded.to_numpy(dtype=object)})
+    return pd.DataFrame({"code": codes, "row": rows}).merge(table, on="code")[["token", "row"]]
+
+
+def _csr(pairs: pd.DataFrame, prefix: str, n_rows: int) -> dict:
+    """vocab đã sắp xếp + offsets + rows (mỗi khóa 1 danh sách row tăng dần, không trùng)."""
+    codes, vocab = pd.factorize(pairs["token"], sort=True)
+    # Khóa số (mã từ, row): sắp xếp 1 lần là có thứ tự theo từ rồi theo row, sau đó bỏ khóa trùng liền nhau
+    keys = np.sort(codes.astype(np.int64) * max(n_rows, 1) + pairs["row"].to_numpy(dtype=np.int64))
+    keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])] if len(keys) else keys
+    offsets = np.searchsorted(keys // max(n_rows, 1), np.arange(len(vocab) + 1))
+    return {f"{prefix}_vocab": np.asarray(vocab, dtype=str), f"{prefix}_offsets": offsets.astype(np.int64),
+            f"{prefix}_rows": (keys % max(n_rows, 1)).astype(np.int32)}
+
+
+def build_index(db_path: str = jobs_db.DB_FILE, path: str = SEARCH_INDEX_FILE) -> "SearchIndex":
+    """Dựng chỉ mục từ file SQLite của Dashboard (bảng jobs + job_skills) và ghi ra `path`."""
+    start = time.time()
+    with contextlib.closing(sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)) as conn:
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(jobs)")]
+        wanted = [c for c in ["row", "jobTitle", "companyName", "approvedOn"] if c in cols]
+        jobs = pd.read_sql_query(f"SELECT {', '.join(wanted)} FROM jobs ORDER BY row", conn)
+        skills = pd.read_sql_query("SELECT row, skill FROM job_skills", conn)
+    n_rows = int(jobs["row"].max()) + 1 if len(jobs) else 0
+    rows = jobs["row"].to_numpy()
+
+    text = [_pairs(jobs[c], rows) for c in ["jobTitle", "companyName"] if c in jobs]
+    text.append(_pairs(skills["skill"], skills["row"].to_numpy()))
+    arrays = {"n_rows": np.array(n_rows)}
+    arrays.update(_csr(pd.concat(text, ignore_index=True), "term", n_rows))
+    arrays.update(_csr(_pairs(skills["skill"], skills["row"].to_numpy(), whole=True), "skill", n_rows))
+    # Tên hiển thị của từng kỹ năng (theo thứ tự skill_vocab): tên gốc gặp đầu tiên
+    names = skills["skill"].drop_duplicates()
+    labels = pd.Series(names.to_numpy(dtype=object), index=fold_accents(names.astype("string")).to_numpy())
+    labels = labels[~labels.index.duplicated()]
+    arrays["skill_labels"] = np.asarray(labels.reindex(arrays["skill_vocab"]).fillna("").to_numpy(), dtype=str)
+
+    # Cột dùng cho bộ lọc công ty + khoảng ngày và thứ tự hiển thị (mới nhất trước, giống JobsDB.page)
+    company = np.full(n_rows, None, dtype=object)
+    approved = np.full(n_rows, np.datetime64("NaT"), dtype="datetime64[s]")
+    if "companyName" in jobs:
+        company[rows] = jobs["companyName"].to_numpy(dtype=object)
+    if "approvedOn" in jobs:
+        approved[rows] = pd.to_datetime(jobs["approvedOn"], errors="coerce").to_numpy(dtype="datetime64[s]")
+    company_codes, companies = pd.factorize(company)
+    arrays["companies"] = np.asarray(companies, dtype=str)
+    arrays["company_codes"] = company_codes.astype(np.int32)
+    # Ngày / giờ thiếu thành -1: không lọt vào khoảng ngày nào và xếp cuối khi sắp giảm dần (như NULL trong SQLite)
+    missing = np.isnat(approved)
+    arrays["days"] = np.where(missing, -1, approved.astype("datetime64[D]").astype(np.int64))
+    arrays["approved"] = np.where(missing, -1, approved.astype(np.int64))
+
+    np.savez(path, **arrays)
+    print(f"🔎 Đã dựng chỉ mục tìm kiếm: {n_rows} job, {len(arrays['term_vocab'])} từ khóa, "
+          f"{len(arrays['skill_vocab'])} kỹ năng ({time.time() - start:.2f} giây) -> {path}")
+    return SearchIndex(arrays)
+
+
+def is_fresh(path: str = SEARCH_INDEX_FILE, db_path: str = jobs_db.DB_FILE) -> bool:
+    """File chỉ mục đã có và không cũ hơn file SQLite của Dashboard."""
+    return os.path.exists(path) and os.path.exists(db_path) and os.path.getmtime(path) >= os.path.getmtime(db_path)
+
+
+def load_index(path: str = SEARCH_INDEX_FILE, db_path: str = jobs_db.DB_FILE) -> "SearchIndex":
+    """Đọc chỉ mục từ file; chưa có hoặc cũ hơn dữ liệu thì dựng lại."""
+    if not is_fresh(path, db_path):
+        return build_index(db_path, path)
+    with np.load(path, allow_pickle=False) as data:
+        return SearchIndex({k: data[k] for k in data.files})
+
+
+class SearchIndex:
+    def __init__(self, arrays: dict):
+        self.n_rows = int(arrays["n_rows"])
+        self.arrays = arrays
+
+    def empty(self) -> np.ndarray:
+        return np.zeros(self.n_rows, dtype=bool)
+
+    def _lookup(self, field: str, key: str, prefix: bool = False) -> np.ndarray:
+        """Bitmap các job chứa khóa `key` (hoặc khóa bắt đầu bằng `key`) của field term / skill."""
+        vocab, offsets = self.arrays[f"{field}_vocab"], self.arrays[f"{field}_offsets"]
+        lo = np.searchsorted(vocab, key, side="left")
+        hi = np.searchsorted(vocab, key + "\U0010ffff", side="left") if prefix else \
+            np.searchsorted(vocab, key, side="right")
+        mask = self.empty()
+        # Các khóa cùng tiền tố nằm liền nhau nên danh sách row của chúng cũng liền nhau trong mảng rows
+        mask[self.arrays[f"{field}_rows"][offsets[lo]:offsets[hi]]] = True
+        return mask
+
+    def term(self, word: str) -> np.ndarray:
+        """Bitmap cho 1 từ trong câu tìm kiếm (từ có "*" ở cuối thì tìm theo tiền tố)."""
+        prefix = word.endswith("*")
+        tokens = tokenize(pd.Series([word.rstrip("*")]))[0]
+        if not tokens:
+            return ~self.empty()  # Chỉ có ký tự đặc biệt: không giới hạn gì
+        mask = ~self.empty()
+        # Từ bị tách thành nhiều token ("front-end") thì phải chứa tất cả, tiền tố áp cho token cuối
+        for i, token in enumerate(tokens):
+            mask &= self._lookup("term", token, prefix=prefix and i == len(tokens) - 1)
+        return mask
+
+    def search(self, query: str) -> np.ndarray:
+        """Bitmap kết quả của câu tìm kiếm: các nhóm ngăn bởi OR, trong mỗi nhóm các từ là AND."""
+        groups, group = [], []
+        for word in str(query or "").split():
+            if word.lower() in OR_WORDS:
+                groups.append(group)
+                group = []
+            else:
+                group.append(word)
+        groups.append(group)
+        mask = self.empty()
+        for group in (g for g in groups if g):
+            hit = ~self.empty()
+            for word in group:
+                hit &= self.term(word)
+            mask |= hit
+        return mask
+
+    def skill_names(self) -> list:
+        return sorted(self.arrays["skill_labels"].tolist(), key=str.lower)
+
+    def skills(self, names: list, match_all: bool = True) -> np.ndarray:
+        """Bitmap các job có tất cả (match_all) hoặc ít nhất 1 kỹ năng trong `names`."""
+        keys = fold_accents(pd.Series(list(names), dtype="string")).tolist()
+        masks = [self._lookup("skill", k) for k in keys]
+        if not masks:
+            return ~self.empty()
+        return np.logical_and.reduce(masks) if match_all else np.logical_or.reduce(masks)
+
+    def filter(self, companies=None, start=None, end=None) -> np.ndarray:
+        """Bitmap của bộ lọc công ty + khoảng ngày (tính cả 2 đầu mút), giống jobs_db._where."""
+        mask = ~self.empty()
+        if companies:
+            wanted = np.flatnonzero(np.isin(self.arrays["companies"], list(companies)))
+            mask &= np.isin(self.arrays["company_codes"], wanted)
+        if start is not None and end is not None:
+            days = self.arrays["days"]
+            lo, hi = (np.datetime64(pd.Timestamp(d).date(), "D").astype(np.int64) for d in (start, end))
+            mask &= (days >= lo) & (days <= hi)
+        return mask
+
+    def ordered_rows(self, mask: np.ndarray) -> np.ndarray:
+        """Số thứ tự dòng các job trong bitmap, mới nhất trước (cùng thứ tự với JobsDB.page)."""
+        rows = np.flatnonzero(mask)
+        return rows[np.lexsort((rows, -self.arrays["approved"][rows]))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chỉ mục tìm kiếm job (từ khóa + kỹ năng) cho Dashboard")
+    parser.add_argument("query", nargs="?", help="Câu tìm kiếm để thử (bỏ trống thì chỉ dựng chỉ mục)")
+    args = parser.parse_args()
+
+    if not os.path.exists(jobs_db.DB_FILE):
+        print(f"❌ Không tìm thấy file {jobs_db.DB_FILE}. Hãy chạy clean_data.py trước!")
+    elif args.query is None:
+        build_index()
+    else:
+        index = load_index()
+        start = time.perf_counter()
+        rows = index.ordered_rows(index.search(args.query))
+        print(f"🔎 {len(rows)} job khớp \"{args.query}\" ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        if len(rows):
+            print(jobs_db.JobsDB().rows(rows[:10], ["jobTitle", "companyName", "skills"]).to_string(index=False))
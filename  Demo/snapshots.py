@@ -0,0 +1,272 @@
+import argparse
+import contextlib
+import datetime
+import glob
+import os
+import sqlite3
+import time
+import uuid
+
+import pandas as pd
+
+import storage
+
+# Kho lịch sử các lần crawl: mỗi lần crawl xong, danh sách job đang đăng được "nạp" vào kho
+#   - Ảnh chụp (snapshot) chỉ ghi nối, chia thư mục theo ngày crawl:
+#       vnworks_snapshots/crawl_date=2024-05-01/part-<giờ>-<mã>.parquet
+#     trong cùng 1 ngày mỗi jobId chỉ lưu 1 lần (crawl lại trong ngày chỉ ghi thêm job mới).
+#   - Vòng đời từng tin (SQLite): ngày thấy lần đầu, ngày thấy gần nhất, ngày hết hạn.
+#   - Bảng tổng hợp theo ngày crawl: số tin mới, số tin đang đăng (theo công ty) và nhu cầu
+#     từng kỹ năng. Mỗi lần nạp chỉ tính lại các ngày bị ảnh hưởng (thường là đúng ngày vừa nạp),
+#     không quét lại các snapshot cũ, nên biểu đồ xu hướng dài hạn chỉ đọc vài dòng mỗi ngày.
+# Tin được coi là đang đăng ở ngày d nếu đã thấy từ trước (first_seen <= d) và chưa quá
+# max(ngày thấy gần nhất, ngày hết hạn): crawl tăng dần không tải lại tin cũ vẫn đếm đúng.
+#   python snapshots.py                       (tóm tắt kho lịch sử)
+#   python snapshots.py --land --date 2024-05-01   (nạp bù dữ liệu thô hiện có cho 1 ngày)
+#   python snapshots.py --rebuild             (dựng lại SQLite từ các snapshot)
+
+SNAPSHOT_DIR = "vnworks_snapshots"
+HISTORY_DB = "vnworks_history.sqlite"
+
+# Các cột của dữ liệu thô được lưu trong snapshot
+SNAPSHOT_COLUMNS = ["jobId", "jobTitle", "companyName", "salary", "skills", "jobUrl",
+                    "approvedOn", "expiredOn", "category"]
+
+SCHEMA = [
+    # active_until = max(last_seen, expiry): tin còn đếm là đang đăng tới ngày này
+    "CREATE TABLE IF NOT EXISTS postings (job_id INTEGER PRIMARY KEY, companyName TEXT, approved_on TEXT, "
+    "expiry TEXT, first_seen TEXT, last_seen TEXT, active_until TEXT)",
+    "CREATE TABLE IF NOT EXISTS posting_skills (job_id INTEGER, skill TEXT)",
+    "CREATE TABLE IF NOT EXISTS crawls (crawl_date TEXT PRIMARY KEY, jobs INTEGER, new_jobs INTEGER, landed_at REAL)",
+    "CREATE TABLE IF NOT EXISTS daily (day TEXT, companyName TEXT, new_postings INTEGER, active_postings INTEGER)",
+    "CREATE TABLE IF NOT EXISTS daily_skills (day TEXT, skill TEXT, new_postings INTEGER, active_postings INTEGER)",
+    "CREATE INDEX IF NOT EXISTS idx_postings_active ON postings (active_until)",
+    "CREATE INDEX IF NOT EXISTS idx_posting_skills_job ON posting_skills (job_id)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_day ON daily (day, companyName)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_skills_day ON daily_skills (day, skill)",
+]
+
+# Tin đang đăng ở ngày :day
+ACTIVE = "p.first_seen <= :day AND p.active_until >= :day"
+
+
+def today() -> str:
+    return datetime.date.today().isoformat()
+
+
+def _days(values: pd.Series) -> pd.Series:
+    """Chuỗi ngày 'YYYY-MM-DD' theo giờ địa phương ghi trong dữ liệu (giống clean_data), lỗi -> None."""
+    day = pd.to_datetime(values, errors="coerce")
+    if getattr(day.dt, "tz", None) is not None:
+        day = day.dt.tz_localize(None)
+    return day.dt.strftime("%Y-%m-%d").astype(object).where(day.notna(), None)
+
+
+def exists(db_path: str = HISTORY_DB) -> bool:
+    return os.path.exists(db_path)
+
+
+def history_version(db_path: str = HISTORY_DB) -> str:
+    """Phiên bản kho lịch sử (đổi mỗi lần nạp), dùng làm khóa cache của Dashboard."""
+    return str(os.stat(db_path).st_mtime_ns) if os.path.exists(db_path) else "missing"
+
+
+class SnapshotStore:
+    def __init__(self, root: str = SNAPSHOT_DIR, db_path: str = HISTORY_DB):
+        self.root = root
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        for sql in SCHEMA:
+            conn.execute(sql)
+        return conn
+
+    # --- SNAPSHOT THEO NGÀY CRAWL ---
+    def partition_dir(self, crawl_date: str) -> str:
+        return os.path.join(self.root, f"crawl_date={crawl_date}")
+
+    def crawl_dates(self) -> list:
+        return sorted(os.path.basename(d).split("=", 1)[1]
+                      for d in glob.glob(os.path.join(self.root, "crawl_date=*")) if os.path.isdir(d))
+
+    def _parts(self, crawl_date: str) -> list:
+        parts = glob.glob(os.path.join(self.partition_dir(crawl_date), "part-*"))
+        return sorted({os.path.splitext(p)[0] for p in parts})
+
+    def read_partition(self, crawl_date: str, columns: list = None) -> pd.DataFrame:
+        frames = [storage.read_table(p, columns=columns) for p in self._parts(crawl_date)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns or [])
+
+    # --- NẠP 1 LẦN CRAWL ---
+    def land(self, df: pd.DataFrame, crawl_date: str = None, write_partition: bool = True) -> dict:
+        """
+        Nạp danh sách job thấy được ở 1 lần crawl: ghi snapshot của ngày crawl, cập nhật vòng đời
+        từng tin và tính lại bảng tổng hợp của ngày đó. Trả về thống kê {jobs, new_jobs, written}.
+        """
+        crawl_date = crawl_date or today()
+        cols = [c for c in SNAPSHOT_COLUMNS if c in df.columns]
+        jobs = df[cols].copy()
+        jobs["jobId"] = pd.to_numeric(jobs["jobId"], errors="coerce").astype("Int64")
+        jobs = jobs.dropna(subset=["jobId"]).drop_duplicates("jobId").reset_index(drop=True)
+
+        written = 0
+        if write_partition:
+            # Append-only: chỉ ghi các job chưa có trong snapshot của ngày này
+            known = self.read_partition(crawl_date, columns=["jobId"])["jobId"]
+            fresh = jobs[~jobs["jobId"].isin(known)]
+            if len(fresh):
+                os.makedirs(self.partition_dir(crawl_date), exist_ok=True)
+                part = f"part-{time.strftime('%H%M%S')}-{uuid.uuid4().hex[:6]}"
+                storage.write_table(fresh, os.path.join(self.partition_dir(crawl_date), part))
+                written = len(fresh)
+
+        postings = pd.DataFrame({
+            "job_id": jobs["jobId"].astype("int64").to_numpy(),
+            "companyName": jobs["companyName"].astype(object).to_numpy() if "companyName" in jobs else None,
+            "approved_on": _days(jobs["approvedOn"]).to_numpy() if "approvedOn" in jobs else None,
+            "expiry": _days(jobs["expiredOn"]).to_numpy() if "expiredOn" in jobs else None,
+        })
+        skills = pd.DataFrame(columns=["job_id", "skill"])
+        if "skills" in jobs and len(jobs):
+            lists = jobs["skills"].fillna("").astype(str).str.split(", ")
+            skills = pd.DataFrame({"job_id": postings["job_id"].repeat(lists.str.len()).to_numpy(),
+                                   "skill": lists.explode().str.strip().to_numpy()})
+            skills = skills[skills["skill"].fillna("") != ""].drop_duplicates()
+
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TEMP TABLE landing (job_id INTEGER PRIMARY KEY, companyName TEXT, "
+                         "approved_on TEXT, expiry TEXT)")
+            conn.execute("CREATE TEMP TABLE landing_skills (job_id INTEGER, skill TEXT)")
+            postings.to_sql("landing", conn, if_exists="append", index=False)
+            skills.to_sql("landing_skills", conn, if_exists="append", index=False)
+            new_jobs = conn.execute("SELECT COUNT(*) FROM landing l WHERE NOT EXISTS "
+                                    "(SELECT 1 FROM postings p WHERE p.job_id = l.job_id)").fetchone()[0]
+            # Tin thấy lại sau 1 quãng vắng thành "đang đăng" cả ở các ngày crawl trong quãng đó
+            gap = conn.execute("SELECT MIN(p.active_until) FROM postings p JOIN landing l ON l.job_id = p.job_id "
+                               "WHERE p.active_until < :day", {"day": crawl_date}).fetchone()[0]
+            # Ngày thấy lần đầu / gần nhất chỉ lùi / tiến (nạp bù ngày cũ vẫn đúng)
+            conn.execute("""
+                INSERT INTO postings (job_id, companyName, approved_on, expiry, first_seen, last_seen, active_until)
+                SELECT job_id, companyName, approved_on, expiry, :day, :day, MAX(:day, COALESCE(expiry, :day))
+                FROM landing WHERE true
+                ON CONFLICT (job_id) DO UPDATE SET
+                    companyName = excluded.companyName,
+                    approved_on = excluded.approved_on,
+                    expiry = excluded.expiry,
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen),
+                    active_until = MAX(MAX(last_seen, excluded.last_seen), COALESCE(excluded.expiry, ''))
+            """, {"day": crawl_date})
+            conn.execute("DELETE FROM posting_skills WHERE job_id IN (SELECT job_id FROM landing)")
+            conn.execute("INSERT INTO posting_skills SELECT job_id, skill FROM landing_skills")
+            conn.execute("INSERT OR REPLACE INTO crawls VALUES (?, ?, ?, ?)",
+                         (crawl_date, len(postings), new_jobs, time.time()))
+
+            # Tính lại ngày vừa nạp, các ngày sau nó (nạp bù ngày cũ làm đổi first_seen) và các ngày
+            # nằm trong quãng vắng ở trên; crawl hằng ngày bình thường chỉ tính lại đúng 1 ngày
+            days = [d for (d,) in conn.execute("SELECT crawl_date FROM crawls WHERE crawl_date >= :day "
+                                               "OR crawl_date > :gap ORDER BY crawl_date",
+                                               {"day": crawl_date, "gap": gap or crawl_date})]
+            for day in days:
+                self._aggregate_day(conn, day)
+        return {"jobs": len(postings), "new_jobs": new_jobs, "written": written}
+
+    @staticmethod
+    def _aggregate_day(conn: sqlite3.Connection, day: str):
+        """Tính lại bảng tổng hợp của 1 ngày crawl (chỉ đọc các tin đang đăng ngày đó qua index)."""
+        params = {"day": day}
+        conn.execute("DELETE FROM daily WHERE day = :day", params)
+        conn.execute(f"INSERT INTO daily SELECT :day, p.companyName, SUM(p.first_seen = :day), COUNT(*) "
+                     f"FROM postings p WHERE {ACTIVE} GROUP BY p.companyName", params)
+        conn.execute("DELETE FROM daily_skills WHERE day = :day", params)
+        conn.execute(f"INSERT INTO daily_skills SELECT :day, s.skill, SUM(p.first_seen = :day), COUNT(*) "
+                     f"FROM postings p JOIN posting_skills s ON s.job_id = p.job_id WHERE {ACTIVE} "
+                     f"GROUP BY s.skill", params)
+
+    def rebuild(self) -> int:
+        """Dựng lại SQLite (vòng đời + bảng tổng hợp) từ các snapshot, theo thứ tự ngày crawl."""
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        dates = self.crawl_dates()
+        for crawl_date in dates:
+            self.land(self.read_partition(crawl_date), crawl_date, write_partition=False)
+        return len(dates)
+
+    # --- TRUY VẤN ---
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        with contextlib.closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def lifecycle(self, job_ids: pd.Series) -> pd.DataFrame:
+        """Vòng đời các tin: jobId, first_seen, last_seen, expiry (datetime), tin chưa có trong kho bị bỏ qua."""
+        ids = pd.DataFrame({"job_id": pd.to_numeric(job_ids, errors="coerce").dropna().astype("int64").unique()})
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute("CREATE TEMP TABLE wanted (job_id INTEGER PRIMARY KEY)")
+            ids.to_sql("wanted", conn, if_exists="append", index=False)
+            out = pd.read_sql_query("SELECT p.job_id AS jobId, first_seen, last_seen, expiry FROM postings p "
+                                    "JOIN wanted w ON w.job_id = p.job_id", conn)
+        out["jobId"] = out["jobId"].astype("Int64")
+        for col in ["first_seen", "last_seen", "expiry"]:
+            out[col] = pd.to_datetime(out[col], errors="coerce")
+        return out
+
+    def trend(self, companies=None, start=None, end=None) -> pd.DataFrame:
+        """Số tin mới / đang đăng theo ngày crawl (lọc công ty + khoảng ngày), index là ngày."""
+        clauses, params = [], []
+        if companies:
+            clauses.append(f"companyName IN ({', '.join('?' * len(companies))})")
+            params += list(companies)
+        if start is not None and end is not None:
+            clauses.append("day BETWEEN ? AND ?")
+            params += [str(start), str(end)]
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        df = self._query(f"SELECT day, SUM(new_postings) AS new_postings, SUM(active_postings) AS active_postings "
+                         f"FROM daily{where} GROUP BY day ORDER BY day", params)
+        return df.set_index(pd.DatetimeIndex(df.pop("day"), name="day"))
+
+    def skill_trend(self, top: int = 5, start=None, end=None) -> pd.DataFrame:
+        """Số tin đang đăng yêu cầu từng kỹ năng theo ngày crawl, cho `top` kỹ năng nhiều nhất ở ngày cuối."""
+        where, params = "", []
+        if start is not None and end is not None:
+            where, params = " WHERE day BETWEEN ? AND ?", [str(start), str(end)]
+        df = self._query(f"SELECT day, skill, active_postings FROM daily_skills{where}", params)
+        if df.empty:
+            return pd.DataFrame()
+        wide = df.pivot_table(index="day", columns="skill", values="active_postings", aggfunc="sum",
+                              fill_value=0)
+        wide.index = pd.DatetimeIndex(wide.index, name="day")
+        return wide[wide.iloc[-1].sort_values(ascending=False, kind="stable").index[:top]]
+
+    def crawls(self) -> pd.DataFrame:
+        return self._query("SELECT crawl_date, jobs, new_jobs FROM crawls ORDER BY crawl_date")
+
+
+def land_crawl(df: pd.DataFrame, crawl_date: str = None) -> dict:
+    """Nạp kết quả 1 lần crawl vào kho lịch sử mặc định và in thống kê."""
+    if df is None or df.empty or "jobId" not in df.columns:
+        return None
+    crawl_date = crawl_date or today()
+    stats = SnapshotStore().land(df, crawl_date)
+    print(f"🗂️ Lịch sử: nạp {stats['jobs']} job ngày {crawl_date} ({stats['new_jobs']} tin mới, "
+          f"ghi {stats['written']} dòng snapshot).")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kho lịch sử các lần crawl (snapshot + vòng đời tin + xu hướng)")
+    parser.add_argument("--land", action="store_true", help="Nạp dữ liệu thô hiện có như 1 lần crawl")
+    parser.add_argument("--date", help="Ngày crawl khi nạp (YYYY-MM-DD, mặc định hôm nay)")
+    parser.add_argument("--rebuild", action="store_true", help="Dựng lại SQLite từ các snapshot")
+    args = parser.parse_args()
+
+    store = SnapshotStore()
+    if args.land:
+        land_crawl(storage.read_table(storage.RAW_DATASET), args.date)
+    if args.rebuild:
+        print(f"♻️ Đã dựng lại lịch sử từ {store.rebuild()} ngày crawl.")
+    if not exists():
+        print("ℹ️ Chưa có lịch sử. Chạy crawler.py (hoặc snapshots.py --land) trước.")
+    else:
+        print(store.crawls().to_string(index=False))
+        print(store.trend().tail(10))
@@ -0,0 +1,255 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Lớp lưu trữ dùng chung cho crawler, clean_data, dashboard và export_report.
+# Mặc định dùng Parquet (giữ nguyên kiểu datetime / list, đọc bằng memory-map, ghi theo từng
+# row group khi dữ liệu tới). Máy không cài pyarrow thì tự quay về CSV như trước.
+# Excel không còn được ghi tự động, chỉ xuất khi cần bằng export_excel().
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+STORAGE_FORMAT = "parquet" if pq is not None else "csv"
+ROW_GROUP_SIZE = 50_000   # Số dòng tối đa mỗi row group khi ghi dạng stream
+
+# Tên các bộ dữ liệu (không kèm đuôi file)
+RAW_DATASET = "vnworks_it_jobs"
+CLEAN_DATASET = "vnworks_it_jobs_clean"
+
+EXTENSIONS = {"parquet": ".parquet", "csv": ".csv"}
+
+# Các cột kiểu list. Parquet lưu dạng list<string> thật; CSV lưu dạng chuỗi nối bằng dấu phân cách
+# (không dùng repr của Python nên không bao giờ phải ast.literal_eval khi đọc lại)
+LIST_COLUMNS = {"skills_list": ", "}
+
+# Schema cố định cho dữ liệu thô, để các row group ghi theo từng trang luôn cùng kiểu
+RAW_SCHEMA = pa.schema([
+    ("jobId", pa.int64()),
+    ("jobTitle", pa.string()),
+    ("companyName", pa.string()),
+    ("salary", pa.string()),
+    ("skills", pa.string()),
+    ("jobUrl", pa.string()),
+    ("approvedOn", pa.string()),
+    ("expiredOn", pa.string()),
+]) if pa is not None else None
+# Dữ liệu thô crawl theo nhiều ngành (scheduler.py): thêm cột category
+CATEGORY_SCHEMA = RAW_SCHEMA.append(pa.field("category", pa.string())) if pa is not None else None
+# Dữ liệu sạch (clean_data.py): kiểu của mọi cột có thể có, để chunk đầu toàn NaN / list rỗng
+# không làm sai kiểu cả file (vd skills_list thành list<null>). Chỉ dùng các cột có trong dữ liệu.
+CLEAN_SCHEMA = pa.schema([
+    ("jobId", pa.int64()),
+    ("jobTitle", pa.string()),
+    ("companyName", pa.string()),
+    ("salary", pa.string()),
+    ("skills", pa.string()),
+    ("jobUrl", pa.string()),
+    ("approvedOn", pa.timestamp("us")),
+    ("expiredOn", pa.timestamp("us")),
+    ("category", pa.string()),
+    ("city", pa.string()),
+    ("jobLevel", pa.string()),
+    ("benefits", pa.string()),
+    ("description", pa.string()),
+    ("salary_min", pa.float64()),
+    ("salary_max", pa.float64()),
+    ("currency", pa.string()),
+    ("salary_vnd_mid", pa.float64()),
+    ("skills_list", pa.list_(pa.string())),
+    ("days_open", pa.int64()),
+    ("jobLevel_processed", pa.string()),
+    ("first_seen", pa.timestamp("us")),
+    ("last_seen", pa.timestamp("us")),
+    ("days_listed", pa.int64()),
+]) if pa is not None else None
+
+
+def path_for(name: str, fmt: str = None) -> str:
+    return name + EXTENSIONS[fmt or STORAGE_FORMAT]
+
+
+def find_path(name: str):
+    """Đường dẫn file đang có của bộ dữ liệu (ưu tiên định dạng mặc định), None nếu chưa có."""
+    for fmt in [STORAGE_FORMAT] + [f for f in EXTENSIONS if f != STORAGE_FORMAT]:
+        if fmt == "parquet" and pq is None:
+            continue
+        path = path_for(name, fmt)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def exists(name: str) -> bool:
+    return find_path(name) is not None
+
+
+def read_table(name: str, columns: list = None) -> pd.DataFrame:
+    """Đọc bộ dữ liệu. Ném FileNotFoundError nếu chưa có file."""
+    path = find_path(name)
+    if path is None:
+        raise FileNotFoundError(path_for(name))
+    if path.endswith(".parquet"):
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return _split_list_columns(pd.read_csv(path, usecols=columns))
+
+
+def iter_table(name: str, chunk_size: int = ROW_GROUP_SIZE, columns: list = None):
+    """Đọc bộ dữ liệu theo từng phần tối đa `chunk_size` dòng (không nạp cả file vào bộ nhớ)."""
+    path = find_path(name)
+    if path is None:
+        raise FileNotFoundError(path_for(name))
+    if path.endswith(".parquet"):
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        for df in pd.read_csv(path, usecols=columns, chunksize=chunk_size):
+            yield _split_list_columns(df)
+
+
+def _split_list_columns(df: pd.DataFrame) -> pd.DataFrame:
+    for col, sep in LIST_COLUMNS.items():
+        if col in df.columns:
+            df[col] = [x.split(sep) if x else [] for x in df[col].fillna("").astype(str)]
+    return df
+
+
+def explode_skills(skills_list: pd.Series) -> pd.DataFrame:
+    """
+    Bảng dài (row, skill) từ 1 cột list đang có trong bộ nhớ. `row` là index của dòng gốc,
+    `skill` là Categorical (mã category chính là skill_id, categories là từ điển kỹ năng).
+    """
+    s = skills_list.explode()
+    s = s[s.notna() & (s != "")]
+    return pd.DataFrame({"row": s.index.to_numpy(), "skill": pd.Categorical(s.to_numpy())})
+
+
+def read_skills(name: str, column: str = "skills_list") -> pd.DataFrame:
+    """
+    Đọc cột kỹ năng thành bảng dài (row, skill) như explode_skills, với Parquet thì tách list
+    hoàn toàn bằng pyarrow (không lặp Python theo từng dòng).
+    """
+    path = find_path(name)
+    if path is None:
+        raise FileNotFoundError(path_for(name))
+    if not path.endswith(".parquet"):
+        return explode_skills(read_table(name, columns=[column])[column])
+
+    col = pq.read_table(path, columns=[column], memory_map=True).column(column).combine_chunks()
+    rows = pc.list_parent_indices(col).to_numpy()
+    values = pc.list_flatten(col)
+    keep = pc.and_(pc.is_valid(values), pc.not_equal(values, "")).to_numpy(zero_copy_only=False)
+    skills = values.dictionary_encode().to_pandas()
+    return pd.DataFrame({"row": rows[keep], "skill": skills[keep]}).reset_index(drop=True)
+
+
+def write_table(df: pd.DataFrame, name: str, fmt: str = None) -> str:
+    """Ghi cả DataFrame một lần. Trả về đường dẫn file đã ghi."""
+    with TableWriter(name, fmt=fmt) as writer:
+        writer.write(df)
+    return writer.path
+
+
+class TableWriter:
+    """
+    Ghi bộ dữ liệu theo từng phần (stream): gọi write() mỗi khi có thêm dòng, dữ liệu được
+    gom lại và ghi xuống thành từng row group. File chỉ thay thế file cũ khi close() thành công.
+    """
+
+    def __init__(self, name: str, fmt: str = None, schema=None, row_group_size: int = ROW_GROUP_SIZE):
+        self.fmt = fmt or STORAGE_FORMAT
+        self.path = path_for(name, self.fmt)
+        self.tmp_path = self.path + ".tmp"
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._buffer = []
+        self._buffered = 0
+        self._writer = None
+        self._header = True
+
+    def write(self, df: pd.DataFrame):
+        if df is None or df.empty:
+            return
+        self._buffer.append(df)
+        self._buffered += len(df)
+        self.rows += len(df)
+        if self._buffered >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        df = pd.concat(self._buffer, ignore_index=True) if len(self._buffer) > 1 else self._buffer[0]
+        self._buffer, self._buffered = [], 0
+
+        if self.fmt == "parquet":
+            if self._writer is None and self.schema is not None:
+                # Giữ thứ tự cột của dữ liệu; cột không có trong schema thì để pyarrow tự suy kiểu
+                self.schema = pa.schema([self.schema.field(c) if c in self.schema.names
+                                         else pa.Schema.from_pandas(df[[c]], preserve_index=False).field(c)
+                                         for c in df.columns])
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            if self._writer is None:
+                self.schema = table.schema
+                self._writer = pq.ParquetWriter(self.tmp_path, self.schema)
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            list_cols = [c for c in LIST_COLUMNS if c in df.columns]
+            if list_cols:
+                df = df.copy()
+                for col in list_cols:
+                    df[col] = df[col].map(lambda v: LIST_COLUMNS[col].join(v) if _is_list(v) else v)
+            df.to_csv(self.tmp_path, mode="w" if self._header else "a", header=self._header,
+                      index=False, encoding="utf-8-sig" if self._header else "utf-8")
+        self._header = False
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+        elif self._header:
+            # Không có dòng nào, vẫn tạo file rỗng
+            if self.fmt == "parquet":
+                pq.write_table(pa.Table.from_pandas(pd.DataFrame(), schema=self.schema, preserve_index=False),
+                               self.tmp_path)
+            else:
+                pd.DataFrame().to_csv(self.tmp_path, index=False, encoding="utf-8-sig")
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _is_list(value) -> bool:
+    return isinstance(value, (list, tuple, np.ndarray))
+
+
+def export_excel(name: str, output: str = None) -> str:
+    """Xuất bộ dữ liệu ra file Excel (chậm với dữ liệu lớn, chỉ chạy khi cần)."""
+    output = output or name + ".xlsx"
+    df = read_table(name)
+    # Excel không lưu được list, đổi thành chuỗi "a, b, c"
+    for col in df.columns:
+        if df[col].dtype == object and df[col].map(_is_list).any():
+            df[col] = df[col].map(lambda v: ", ".join(map(str, v)) if _is_list(v) else v)
+    df.to_excel(output, index=False)
+    print(f"📗 Đã xuất file Excel: {output}")
+    return output
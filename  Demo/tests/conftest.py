@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# Các module nằm phẳng trong thư mục dự án (import crawler, mock_api...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics  # noqa: E402
+import mock_api  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Mỗi test chạy trong thư mục tạm riêng (các file dữ liệu ghi ra không đụng tới dữ liệu thật)."""
+    monkeypatch.chdir(tmp_path)
+    metrics.REGISTRY.reset()
+    return tmp_path
+
+
+@pytest.fixture
+def mock_server():
+    """Gọi mock_server(**tùy chọn của mock_api.start_server) -> (server, api_url); tự dừng sau test."""
+    servers = []
+
+    def start(**kwargs):
+        server, url = mock_api.start_server(**kwargs)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
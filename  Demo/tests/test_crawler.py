@@ -0,0 +1,79 @@
+import os
+import time
+
+import pytest
+
+import crawler
+import metrics
+from checkpoint import CHECKPOINT_FILE
+from http_client import FetchClient
+
+
+def fetch_ids_in_order(url: str, nb_pages: int) -> list:
+    """jobId của từng trang tải lần lượt (1 thread), để so với kết quả crawl song song."""
+    with FetchClient() as client:
+        ids = []
+        for page in range(nb_pages):
+            _, jobs = crawler.fetch_page(page, api_url=url, client=client, parse=crawler.read_page)
+            ids += jobs["jobId"].tolist()
+    return ids
+
+
+def test_crawl_all_keeps_page_order(mock_server):
+    # Độ trễ ngẫu nhiên để các trang tải song song xong không theo thứ tự
+    _, url = mock_server(total_jobs=1500, latency=0.02)
+    df = crawler.crawl_all(max_workers=8, rate=0, api_url=url)
+
+    nb_pages = int(metrics.REGISTRY.value("crawl_pages_total", result="ok"))
+    assert nb_pages > 8
+    # Trang 0 chỉ tải 1 lần (nbPages lấy luôn từ trang đầu)
+    assert metrics.REGISTRY.total("http_requests_total") == nb_pages
+    assert df["jobId"].tolist() == fetch_ids_in_order(url, nb_pages)
+
+
+def test_resume_fetches_only_missing_pages(mock_server):
+    server, url = mock_server(total_jobs=1500, fail_pages={2, 5})
+    first = crawler.crawl_all(max_workers=4, rate=0, api_url=url)
+    assert os.path.exists(CHECKPOINT_FILE)
+
+    server.RequestHandlerClass.fail_pages = set()
+    metrics.REGISTRY.reset()
+    df = crawler.crawl_all(max_workers=4, rate=0, api_url=url, resume=True)
+
+    # Lần --resume chỉ tải lại 2 trang lỗi, kết quả giống 1 lần crawl trọn vẹn
+    assert metrics.REGISTRY.total("http_requests_total") == 2
+    nb_pages = (len(df) + 49) // 50
+    assert df["jobId"].tolist() == fetch_ids_in_order(url, nb_pages)
+    assert len(first) == len(df) - 100
+    assert not os.path.exists(CHECKPOINT_FILE)
+
+
+def test_retry_after_on_429(mock_server):
+    _, url = mock_server(total_jobs=100, throttle=1, retry_after=1)
+    with FetchClient() as client:
+        start = time.perf_counter()
+        data = crawler.fetch_page(0, api_url=url, client=client)
+        elapsed = time.perf_counter() - start
+        stats = client.summary()
+
+    assert data["data"]
+    assert stats["retries"] == 1 and stats["failures"] == 0
+    # Chờ đúng Retry-After (backoff lần đầu chỉ tối đa BACKOFF_BASE = 0.5s)
+    assert elapsed >= 0.9
+    assert metrics.REGISTRY.value("http_requests_total", method="POST", status=429) == 1
+    assert metrics.REGISTRY.value("http_retries_total") == 1
+
+
+def test_retry_after_is_capped(mock_server):
+    _, url = mock_server(total_jobs=100, throttle=1, retry_after=86400)
+    with FetchClient(retry_after_max=0.1) as client:
+        start = time.perf_counter()
+        data = crawler.fetch_page(0, api_url=url, client=client)
+    assert data is not None
+    assert time.perf_counter() - start < 5
+
+
+def test_max_retries_must_be_positive(mock_server):
+    _, url = mock_server(total_jobs=100)
+    with FetchClient() as client, pytest.raises(ValueError):
+        client.post_json(url, {"page": 0}, max_retries=0)
@@ -0,0 +1,44 @@
+import json
+
+import crawler
+import enrich
+import metrics
+import mock_api
+import storage
+
+
+def detail_url(search_url: str) -> str:
+    return search_url.replace(mock_api.SEARCH_PATH, mock_api.DETAIL_PATH + "{job_id}")
+
+
+def test_second_run_is_served_from_cache(mock_server):
+    _, url = mock_server(total_jobs=300)
+    raw = crawler.crawl_all(max_workers=4, rate=0, api_url=url)
+
+    metrics.REGISTRY.reset()
+    first = enrich.enrich_dataset(detail_url=detail_url(url), max_workers=4, rate=0)
+    assert metrics.REGISTRY.value("http_requests_total", method="GET", status=200) == len(raw)
+    # Mọi job đều có đủ các cột chi tiết, đúng với response của server
+    assert first[enrich.DETAIL_COLUMNS].ne("").all().all()
+    job_id = int(first["jobId"].iloc[0])
+    expected = enrich.parse_detail(mock_api.make_detail(job_id))
+    assert first.iloc[0][enrich.DETAIL_COLUMNS].to_dict() == {c: expected[c] for c in enrich.DETAIL_COLUMNS}
+
+    metrics.REGISTRY.reset()
+    second = enrich.enrich_dataset(detail_url=detail_url(url), max_workers=4, rate=0)
+    assert metrics.REGISTRY.total("http_requests_total") == 0
+    assert second.equals(storage.read_table(storage.RAW_DATASET))
+    assert second[["jobId"] + enrich.DETAIL_COLUMNS].equals(first[["jobId"] + enrich.DETAIL_COLUMNS])
+
+
+def test_empty_details_are_not_counted(mock_server, capsys):
+    _, url = mock_server(total_jobs=100)
+    raw = crawler.crawl_all(max_workers=4, rate=0, api_url=url)
+    # Response chi tiết rỗng của 1 job nằm sẵn trong cache
+    job_id, approved = str(raw["jobId"].iloc[0]), str(raw["approvedOn"].iloc[0])
+    with enrich.DetailCache() as cache:
+        cache.put_many([(job_id, approved, json.dumps({"data": {"jobId": int(job_id)}}))])
+
+    capsys.readouterr()
+    enrich.enrich_dataset(detail_url=detail_url(url), max_workers=4, rate=0)
+    assert f"cho {len(raw) - 1}/{len(raw)} job" in capsys.readouterr().out
@@ -0,0 +1,99 @@
+import json
+import re
+import urllib.request
+
+import pytest
+
+import crawler
+import metrics
+from http_client import CircuitBreaker, FetchClient, RateLimiter
+
+# 1 dòng mẫu của định dạng text Prometheus: tên{nhãn="giá trị",...} số
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_prometheus(text: str) -> dict:
+    """Đọc text Prometheus thành {(tên, nhãn): giá trị}, kiểm tra HELP / TYPE khai báo trước các mẫu."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert kind in ("counter", "gauge", "histogram")
+            types[name] = kind
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"Dòng không đúng định dạng: {line!r}"
+        name, labels, value = match.group(1), match.group(2) or "", float(match.group(3))
+        assert re.sub(r"_(bucket|sum|count)$", "", name) in types or name in types
+        samples[name, tuple(sorted(LABEL.findall(labels)))] = value
+    return samples
+
+
+@pytest.fixture
+def crawl_client(monkeypatch):
+    """Client của lần crawl (để so với metrics); ngưỡng ngắt mạch cao để lỗi giả lập không làm ngắt mạch."""
+    clients = []
+
+    def make_client(max_workers, rate):
+        client = FetchClient(pool_size=max_workers, limiter=RateLimiter(rate, burst=max_workers),
+                             breaker=CircuitBreaker(threshold=10_000))
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(crawler, "make_client", make_client)
+    return clients
+
+
+def test_crawl_metrics_match_client_summary(mock_server, crawl_client):
+    _, url = mock_server(total_jobs=2000, error_rate=0.15)
+    crawler.crawl_all(max_workers=4, rate=0, api_url=url)
+    stats = crawl_client[0].summary()
+
+    registry = metrics.REGISTRY
+    by_status = {int(item["labels"]["status"]): item["value"] for item in registry.snapshot()["metrics"]
+                 if item["name"] == "http_requests_total"}
+    assert stats["retries"] > 0
+    # Mỗi request gửi 1 lần + 1 lần cho mỗi lượt thử lại; lần cuối của request bỏ cuộc cũng là 503
+    assert sum(by_status.values()) == stats["requests"] + stats["retries"]
+    assert by_status[200] == stats["requests"] - stats["failures"]
+    assert by_status.get(503, 0) == stats["retries"] + stats["failures"]
+    assert registry.value("http_retries_total") == stats["retries"]
+    assert registry.value("http_failures_total") == stats["failures"]
+    assert registry.value("crawl_pages_total", result="ok") == by_status[200]
+    assert registry.value("http_request_seconds", method="POST") == sum(by_status.values())
+
+    # File JSON của lần chạy + text Prometheus đọc lại được và cùng số liệu
+    with open(metrics.save_run("crawl"), encoding="utf-8") as f:
+        saved = json.load(f)
+    samples = parse_prometheus(metrics.prometheus(saved))
+    assert samples["vnworks_http_retries_total", ()] == stats["retries"]
+    assert samples["vnworks_http_requests_total", (("method", "POST"), ("status", "200"))] == by_status[200]
+    buckets = [v for (name, labels), v in samples.items()
+               if name == "vnworks_http_request_seconds_bucket" and ("method", "POST") in labels]
+    assert buckets == sorted(buckets)
+    assert buckets[-1] == samples["vnworks_http_request_seconds_count", (("method", "POST"),)]
+
+
+def test_prometheus_endpoint(mock_server):
+    _, url = mock_server(total_jobs=100, throttle=1, retry_after=0)
+    with FetchClient() as client:
+        crawler.fetch_page(0, api_url=url, client=client)
+    with metrics.timer("test.stage"):
+        pass
+
+    server = metrics.serve(0, host="127.0.0.1")
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as r:
+            assert r.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            samples = parse_prometheus(r.read().decode("utf-8"))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert samples["vnworks_http_requests_total", (("method", "POST"), ("status", "429"))] == 1
+    assert samples["vnworks_http_retries_total", ()] == 1
+    assert samples["vnworks_stage_seconds_count", (("stage", "test.stage"),)] == 1
@@ -0,0 +1,27 @@
+import pytest
+
+import crawler
+import mock_api
+import scheduler
+import storage
+
+
+def test_merge_order_is_fixed(mock_server):
+    # Độ trễ ngẫu nhiên để các shard tải xong không theo thứ tự; "all" chứa mọi job của "it"
+    _, url = mock_server(total_jobs=1200, latency=0.02)
+    categories = {"all": {"filter": [], "query": ""}, "it": {"filter": crawler.IT_FILTER, "query": ""}}
+    runs = [scheduler.crawl_categories(categories, processes=3, rate=0, api_url=url) for _ in range(2)]
+
+    assert runs[0][["jobId", "category"]].equals(runs[1][["jobId", "category"]])
+    assert not runs[0]["jobId"].duplicated().any()
+    assert (runs[0]["category"] == "all").all()
+    # File của từng ngành giữ đủ job của ngành, đúng thứ tự trang
+    it = storage.read_table(scheduler.category_dataset("it", categories["it"]))
+    assert it["jobId"].tolist() == list(mock_api.matching_ids(1200, 5))
+
+
+def test_category_ids_do_not_collide():
+    assert scheduler.category_dataset("C++") != scheduler.category_dataset("C#")
+    assert scheduler.category_dataset("it", scheduler.CATEGORIES["it"]) == f"{storage.RAW_DATASET}_it"
+    with pytest.raises(ValueError):
+        scheduler.check_categories({"a": {"id": "x"}, "b": {"id": "x"}})